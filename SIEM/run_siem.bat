@@ -6,7 +6,7 @@ REM Check if Python is installed
 python --version >nul 2>&1
 if %errorlevel% neq 0 (
     echo ERROR: Python is not installed or not in PATH
-    echo Please install Python 3.8 or higher
+    echo Please install Python 3.9 or higher
     pause
     exit /b 1
 )
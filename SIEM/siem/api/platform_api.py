@@ -11,7 +11,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.logger import setup_logger
-from indexer.models import LogEntry, Alert
+from indexer.rollups import ROLLUP_DIMENSIONS
+from processors.structured_data import split_param_key
 
 class PlatformAPI:
     """REST API for SIEM platform management"""
@@ -26,6 +27,7 @@ class PlatformAPI:
         """
         self.config = config
         self.db_manager = db_manager
+        self.storage = db_manager.storage
         self.logger = setup_logger(__name__)
         
         # Create Flask app
@@ -63,44 +65,71 @@ class PlatformAPI:
                 offset = int(request.args.get('offset', 0))
                 severity = request.args.get('severity')
                 source_ip = request.args.get('source_ip')
+                template_id = request.args.get('template_id')
                 start_date = request.args.get('start_date')
                 end_date = request.args.get('end_date')
+                event_start = request.args.get('event_start')
+                event_end = request.args.get('event_end')
+                archive = request.args.get('archive')
+                sd_filters = request.args.getlist('sd')  # 'sd_id.name=value', repeatable
                 
-                with self.db_manager.get_db_session() as session:
-                    query = session.query(LogEntry)
+                # Structured-data filters only use indexed params, where the backend indexes them
+                indexed = self.storage.sd_index
+                sd_params = []
+                for sd_filter in sd_filters:
+                    key, _, value = sd_filter.partition('=')
+                    try:
+                        sd_id, name = split_param_key(key)
+                    except ValueError as e:
+                        return jsonify({'error': str(e)}), 400
+                    if indexed is not None and (sd_id, name) not in indexed:
+                        return jsonify({'error': f"Structured data param {key} is not indexed"}), 400
+                    sd_params.append((sd_id, name, value))
                     
-                    # Apply filters
-                    if severity:
-                        query = query.filter(LogEntry.severity == int(severity))
-                    if source_ip:
-                        query = query.filter(LogEntry.source_ip == source_ip)
-                    if start_date:
-                        start = datetime.fromisoformat(start_date)
-                        query = query.filter(LogEntry.received_at >= start)
-                    if end_date:
-                        end = datetime.fromisoformat(end_date)
-                        query = query.filter(LogEntry.received_at <= end)
-                        
-                    # Get total count
-                    total = query.count()
-                    
-                    # Apply pagination
-                    logs = query.order_by(LogEntry.received_at.desc())\
-                               .offset(offset)\
-                               .limit(limit)\
-                               .all()
-                               
-                    return jsonify({
-                        'logs': [log.to_dict() for log in logs],
-                        'total': total,
-                        'limit': limit,
-                        'offset': offset
-                    })
+                total, logs = self.storage.query_logs(
+                    offset, limit,
+                    start=datetime.fromisoformat(start_date) if start_date else None,
+                    end=datetime.fromisoformat(end_date) if end_date else None,
+                    severity=int(severity) if severity else None,
+                    source_ip=source_ip,
+                    template_id=int(template_id) if template_id else None,
+                    event_start=datetime.fromisoformat(event_start) if event_start else None,
+                    event_end=datetime.fromisoformat(event_end) if event_end else None,
+                    sd_params=sd_params,
+                    archive=archive.lower() == 'true' if archive is not None else None
+                )
+                
+                return jsonify({
+                    'logs': logs,
+                    'total': total,
+                    'limit': limit,
+                    'offset': offset
+                })
                     
             except Exception as e:
                 self.logger.error(f"Error fetching logs: {e}")
                 return jsonify({'error': str(e)}), 500
                 
+        @self.app.route('/api/templates', methods=['GET'])
+        def get_templates():
+            """Get learned message templates, most frequent first"""
+            try:
+                limit = int(request.args.get('limit', 100))
+                offset = int(request.args.get('offset', 0))
+                
+                total, templates = self.storage.get_templates(offset, limit)
+                
+                return jsonify({
+                    'templates': templates,
+                    'total': total,
+                    'limit': limit,
+                    'offset': offset
+                })
+                    
+            except Exception as e:
+                self.logger.error(f"Error fetching templates: {e}")
+                return jsonify({'error': str(e)}), 500
+                
         @self.app.route('/api/alerts', methods=['GET'])
         def get_alerts():
             """Get security alerts"""
@@ -111,31 +140,18 @@ class PlatformAPI:
                 acknowledged = request.args.get('acknowledged')
                 severity = request.args.get('severity')
                 
-                with self.db_manager.get_db_session() as session:
-                    query = session.query(Alert)
-                    
-                    # Apply filters
-                    if acknowledged is not None:
-                        ack_value = 1 if acknowledged.lower() == 'true' else 0
-                        query = query.filter(Alert.acknowledged == ack_value)
-                    if severity:
-                        query = query.filter(Alert.severity == severity)
-                        
-                    # Get total count
-                    total = query.count()
-                    
-                    # Apply pagination
-                    alerts = query.order_by(Alert.created_at.desc())\
-                                 .offset(offset)\
-                                 .limit(limit)\
-                                 .all()
-                                 
-                    return jsonify({
-                        'alerts': [alert.to_dict() for alert in alerts],
-                        'total': total,
-                        'limit': limit,
-                        'offset': offset
-                    })
+                total, alerts = self.storage.get_alerts(
+                    offset, limit,
+                    acknowledged=acknowledged.lower() == 'true' if acknowledged is not None else None,
+                    severity=severity
+                )
+                
+                return jsonify({
+                    'alerts': alerts,
+                    'total': total,
+                    'limit': limit,
+                    'offset': offset
+                })
                     
             except Exception as e:
                 self.logger.error(f"Error fetching alerts: {e}")
@@ -148,105 +164,116 @@ class PlatformAPI:
                 data = request.get_json()
                 acknowledged_by = data.get('acknowledged_by', 'system')
                 
-                with self.db_manager.get_db_session() as session:
-                    alert = session.query(Alert).filter(Alert.id == alert_id).first()
-                    
-                    if not alert:
-                        return jsonify({'error': 'Alert not found'}), 404
-                        
-                    alert.acknowledged = 1
-                    alert.acknowledged_by = acknowledged_by
-                    alert.acknowledged_at = datetime.utcnow()
+                alert = self.storage.acknowledge_alert(alert_id, acknowledged_by)
+                if alert is None:
+                    return jsonify({'error': 'Alert not found'}), 404
                     
-                    session.commit()
-                    
-                    return jsonify({
-                        'message': 'Alert acknowledged',
-                        'alert': alert.to_dict()
-                    })
+                return jsonify({
+                    'message': 'Alert acknowledged',
+                    'alert': alert
+                })
                     
             except Exception as e:
                 self.logger.error(f"Error acknowledging alert: {e}")
                 return jsonify({'error': str(e)}), 500
                 
+        @self.app.route('/api/alerts/<int:alert_id>', methods=['DELETE'])
+        def delete_alert(alert_id):
+            """Delete an alert"""
+            try:
+                if not self.storage.delete_alert(alert_id):
+                    return jsonify({'error': 'Alert not found'}), 404
+                    
+                return jsonify({'message': 'Alert deleted'})
+                
+            except Exception as e:
+                self.logger.error(f"Error deleting alert: {e}")
+                return jsonify({'error': str(e)}), 500
+                
         @self.app.route('/api/stats/overview', methods=['GET'])
         def get_overview_stats():
-            """Get system overview statistics"""
+            """
+            Get system overview statistics
+            
+            total_logs counts the stored log entries. With rollups, the 24h
+            counts come from the per-minute rollups (the window starts at the
+            minute 24 hours ago); without them, log_entries is counted.
+            """
             try:
-                with self.db_manager.get_db_session() as session:
-                    # Get time range
-                    now = datetime.utcnow()
-                    last_24h = now - timedelta(hours=24)
-                    last_7d = now - timedelta(days=7)
-                    
-                    # Total logs
-                    total_logs = session.query(LogEntry).count()
-                    logs_24h = session.query(LogEntry)\
-                                     .filter(LogEntry.received_at >= last_24h)\
-                                     .count()
-                                     
-                    # Total alerts
-                    total_alerts = session.query(Alert).count()
-                    alerts_24h = session.query(Alert)\
-                                      .filter(Alert.created_at >= last_24h)\
-                                      .count()
-                                      
-                    # Unacknowledged alerts
-                    unack_alerts = session.query(Alert)\
-                                         .filter(Alert.acknowledged == 0)\
-                                         .count()
-                                         
-                    # Severity distribution
-                    severity_dist = {}
-                    for i in range(8):
-                        count = session.query(LogEntry)\
-                                      .filter(LogEntry.severity == i)\
-                                      .filter(LogEntry.received_at >= last_24h)\
-                                      .count()
-                        severity_dist[i] = count
-                        
-                    return jsonify({
-                        'total_logs': total_logs,
-                        'logs_24h': logs_24h,
-                        'total_alerts': total_alerts,
-                        'alerts_24h': alerts_24h,
-                        'unacknowledged_alerts': unack_alerts,
-                        'severity_distribution': severity_dist,
-                        'timestamp': now.isoformat()
-                    })
+                # Get time range
+                now = datetime.utcnow()
+                last_24h = now - timedelta(hours=24)
+                last_7d = now - timedelta(days=7)
+                
+                total_logs, logs_24h, severity_dist = self.storage.count_logs(last_24h)
+                total_alerts, alerts_24h, unack_alerts = self.storage.count_alerts(last_24h)
+                
+                return jsonify({
+                    'total_logs': total_logs,
+                    'logs_24h': logs_24h,
+                    'total_alerts': total_alerts,
+                    'alerts_24h': alerts_24h,
+                    'unacknowledged_alerts': unack_alerts,
+                    'severity_distribution': severity_dist,
+                    'timestamp': now.isoformat()
+                })
                     
             except Exception as e:
                 self.logger.error(f"Error fetching stats: {e}")
                 return jsonify({'error': str(e)}), 500
                 
+        @self.app.route('/api/stats/top', methods=['GET'])
+        def get_top_values():
+            """Most frequent values of severity, source_ip, hostname or process, from the rollups"""
+            try:
+                dimension = request.args.get('dimension', 'source_ip')
+                if dimension not in ROLLUP_DIMENSIONS:
+                    return jsonify({'error': f"dimension must be one of {', '.join(ROLLUP_DIMENSIONS)}"}), 400
+                    
+                hours = float(request.args.get('hours', 24))
+                limit = int(request.args.get('limit', 10))
+                since = datetime.utcnow() - timedelta(hours=hours)
+                
+                top = self.storage.top_values(dimension, since, limit)
+                if top is None:
+                    return jsonify({'error': 'Rollups are not enabled (database.rollups)'}), 400
+                    
+                return jsonify({
+                    'dimension': dimension,
+                    'hours': hours,
+                    'values': [{'value': value, 'count': count} for value, count in top]
+                })
+                
+            except Exception as e:
+                self.logger.error(f"Error fetching top values: {e}")
+                return jsonify({'error': str(e)}), 500
+                
         @self.app.route('/api/search', methods=['POST'])
         def search_logs():
-            """Search logs with advanced filtering"""
+            """
+            Search logs with advanced filtering
+            
+            With the full-text index, 'query' is a list of terms that must all
+            match: "quoted phrases" and prefix* terms are supported, and
+            'order' is 'time' (newest first, the default) or 'rank' (bm25).
+            Without it, 'query' is a substring of message or raw_message.
+            """
             try:
                 data = request.get_json()
                 search_query = data.get('query', '')
                 limit = int(data.get('limit', 100))
-                
-                with self.db_manager.get_db_session() as session:
-                    query = session.query(LogEntry)
+                order = data.get('order', 'time')
+                if order not in ('time', 'rank'):
+                    return jsonify({'error': "order must be 'time' or 'rank'"}), 400
                     
-                    # Search in message and raw_message
-                    if search_query:
-                        query = query.filter(
-                            (LogEntry.message.contains(search_query)) |
-                            (LogEntry.raw_message.contains(search_query))
-                        )
-                        
-                    # Get results
-                    results = query.order_by(LogEntry.received_at.desc())\
-                                  .limit(limit)\
-                                  .all()
-                                  
-                    return jsonify({
-                        'results': [log.to_dict() for log in results],
-                        'count': len(results),
-                        'query': search_query
-                    })
+                results, order = self.storage.search_logs(search_query, limit, order)
+                
+                return jsonify({
+                    'results': results,
+                    'count': len(results),
+                    'query': search_query,
+                    'order': order
+                })
                     
             except Exception as e:
                 self.logger.error(f"Error searching logs: {e}")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Archive Benchmark
+Archiving throughput, bytes per event and query latency of the cold block archive
+
+Events are spread over --days days ending today, and everything older
+than half of them is archived from the main database. Sizes compare the
+archive with the SQLite bytes the same rows took (table plus indexes).
+
+Run from the siem directory:
+    python benchmarks/bench_archive.py [--rows 100000] [--days 10]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from api.platform_api import PlatformAPI
+from indexer.db_manager import DatabaseManager
+from bench_indexer import build_events
+from bench_shards import spread
+
+def sqlite_bytes(engine):
+    """Bytes in use by a database (excluding free pages)"""
+    with engine.connect() as conn:
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+        page_size = conn.execute(text("PRAGMA page_size")).scalar()
+        pages = conn.execute(text("PRAGMA page_count")).scalar() - conn.execute(text("PRAGMA freelist_count")).scalar()
+    return page_size * pages
+    
+def query_ms(client, url, repeat):
+    """Median latency of an API call and its last response"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        times.append(time.perf_counter() - start)
+    assert response.status_code == 200, response.get_json()
+    return statistics.median(times) * 1e3, response.get_json()
+    
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--rows', type=int, default=100000)
+    arg_parser.add_argument('--days', type=int, default=10)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    first_day = today - timedelta(days=args.days - 1)
+    hot_days = args.days - args.days // 2
+    oldest_day = f"/api/logs?limit=100&start_date={first_day.isoformat()}&end_date={(first_day + timedelta(days=1)).isoformat()}"
+    
+    for codec in ('zlib', 'lzma'):
+        with tempfile.TemporaryDirectory() as directory:
+            config = {'database': {
+                'path': os.path.join(directory, 'siem.db'),
+                'sqlite': {'profile': 'tuned'},
+                'archive': {'enabled': True, 'directory': os.path.join(directory, 'archive'),
+                            'hot_days': hot_days, 'codec': codec}
+            }, 'api': {}}
+            db_manager = DatabaseManager(config, None)
+            client = PlatformAPI(config, db_manager).app.test_client()
+            events = build_events(args.rows, args.seed)
+            spread(events, first_day, args.days)
+            for i in range(0, len(events), 2000):
+                db_manager._process_batch(events[i:i + 2000])
+                
+            before = sqlite_bytes(db_manager.storage.engine)
+            start = time.perf_counter()
+            archived = db_manager.storage.archive_old_logs(today + timedelta(hours=12))
+            elapsed = time.perf_counter() - start
+            freed = before - sqlite_bytes(db_manager.storage.engine)
+            stats = db_manager.storage.archive.get_stats()
+            
+            # First call decompresses the day's blocks, later ones hit the block cache
+            db_manager.storage.archive.cache.clear()
+            cold_ms, _ = query_ms(client, oldest_day, 1)
+            warm_ms, result = query_ms(client, oldest_day, 10)
+            
+            print(f"{codec:<5} archived {archived:,} events at {archived / elapsed:>8,.0f} events/s  "
+                  f"{stats['bytes'] / archived:6.1f} B/event archived vs {freed / archived:6.1f} B/event in SQLite  "
+                  f"oldest-day query {cold_ms:6.1f} ms cold, {warm_ms:6.1f} ms cached ({result['total']} rows)")
+                  
+if __name__ == '__main__':
+    main()
\ No newline at end of file
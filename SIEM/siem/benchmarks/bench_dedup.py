@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Dedup Benchmark
+Deduplicator cost per event, and what a full-speed replay collapses
+
+A sender repeats the same line three times in two seconds, once an hour.
+Replayed as fast as possible with received_at taken from the headers,
+every hourly burst must still become one event plus one repeat summary:
+the window follows received_at, not the replay's own clock.
+
+Run from the siem directory:
+    python benchmarks/bench_dedup.py [--bursts 2000]
+"""
+
+import argparse
+import calendar
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.log_parser import LogParser
+from utils.log_event import RawEvent
+
+LINE = "<38>{timestamp} kali-test sshd[5678]: Failed password for invalid user admin from 192.168.1.100 port 22 ssh2"
+
+def build_replay(bursts, received_at):
+    """Three copies of a line within two seconds, one burst per hour"""
+    start = calendar.timegm((2026, 3, 1, 0, 0, 0))
+    events = []
+    for burst in range(bursts):
+        for offset in range(3):
+            tm = time.gmtime(start + burst * 3600 + offset)
+            timestamp = f"{calendar.month_abbr[tm.tm_mon]} {tm.tm_mday:>2} {tm.tm_hour:02}:{tm.tm_min:02}:{tm.tm_sec:02}"
+            line = LINE.format(timestamp=timestamp).encode()
+            events.append(RawEvent(line, '10.9.9.9', 514, received_at, 'file'))
+    return events
+    
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--bursts', type=int, default=2000)
+    args = arg_parser.parse_args()
+    
+    config = {'syslog': {}, 'parser': {'dedup': {'enabled': True, 'window': 5.0}}}
+    received_at = time.time_ns()
+    
+    plain = LogParser({'syslog': {}, 'parser': {}}, None, None)
+    plain.received_at_from_event = True
+    start = time.perf_counter()
+    plain._parse_batch(build_replay(args.bursts, received_at))
+    baseline = time.perf_counter() - start
+    
+    parser = LogParser(config, None, None)
+    parser.received_at_from_event = True
+    start = time.perf_counter()
+    parsed = parser._parse_batch(build_replay(args.bursts, received_at)) + parser.flush()
+    deduplicated = time.perf_counter() - start
+    
+    lines = args.bursts * 3
+    print(f"parse          {baseline * 1e6 / lines:8.2f} us/line")
+    print(f"parse + dedup  {deduplicated * 1e6 / lines:8.2f} us/line  "
+          f"({lines:,} lines -> {len(parsed):,} events, {parser.deduplicator.stats})")
+          
+    # One first occurrence and one summary of two repeats per hourly burst
+    assert len(parsed) == 2 * args.bursts, len(parsed)
+    assert sorted(event.repeat_count for event in parsed) == [1] * args.bursts + [2] * args.bursts
+    assert sum(event.repeat_count for event in parsed) == lines
+    
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Event Memory Benchmark
+Per-event memory and queue footprint of pipeline events at 10k queued events
+
+Events are built by the real collector and parser code. "Queued" is the
+memory retained by a list holding the events (what a queue.Queue holds);
+"pickled" is what a parser process ships to the indexer per event.
+
+Run from the siem directory:
+    python benchmarks/bench_event_memory.py [--events 10000] [--hosts 50]
+"""
+
+import argparse
+import gc
+import pickle
+import random
+import tracemalloc
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collectors.syslog_collector import SyslogCollector
+from processors.log_parser import LogParser
+
+PROGRAMS = ['sshd', 'sudo', 'systemd', 'cron', 'kernel', 'nginx']
+
+def build_datagrams(count, hosts, seed):
+    """(datagram, addr) pairs from a fleet of hosts"""
+    rng = random.Random(seed)
+    datagrams = []
+    for i in range(count):
+        host = rng.randrange(hosts)
+        line = (
+            f"<{rng.randint(0, 191)}>Jun  5 20:55:{rng.randint(0, 59):02} host{host} "
+            f"{rng.choice(PROGRAMS)}[{rng.randint(1, 99999)}]: request {i} from 10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)} done"
+        )
+        # A fresh address string per datagram, as recvfrom returns
+        datagrams.append((line.encode(), (f"10.1.0.{host}", 514)))
+    return datagrams
+    
+def retained(build):
+    """Bytes still allocated by build() while its result is alive"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, result
+    
+def report(stage, events, size):
+    """Print per-event retained and pickled size for one queue"""
+    pickled = sum(len(pickle.dumps(events[i:i + 500], pickle.HIGHEST_PROTOCOL)) for i in range(0, len(events), 500))
+    print(f"{stage:<18} {size / 1024:>9,.0f} KiB queued  {size / len(events):>6,.0f} B/event  "
+          f"{pickled / len(events):>6,.0f} B/event pickled  ({type(events[0]).__name__})")
+          
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--events', type=int, default=10000)
+    arg_parser.add_argument('--hosts', type=int, default=50)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    config = {'syslog': {}, 'parser': {'extractors': {'enabled': True}}}
+    datagrams = build_datagrams(args.events, args.hosts, args.seed)
+    collector = SyslogCollector(config, None)
+    parser = LogParser(config, None, None)
+    
+    # collector_to_parser holds raw events
+    size, raw_events = retained(lambda: [event for data, addr in datagrams for event in collector._build_messages(data, addr)])
+    report('collector_to_parser', raw_events, size)
+    
+    # parser_to_indexer (and indexer_to_rules) hold parsed events
+    size, parsed_events = retained(lambda: parser._parse_batch(raw_events))
+    report('parser_to_indexer', parsed_events, size)
+    
+if __name__ == '__main__':
+    main()
\ No newline at end of file
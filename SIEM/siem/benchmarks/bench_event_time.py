@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Event Time Benchmark
+Cost of timestamp normalization with and without the per-second memo
+
+Run from the siem directory:
+    python benchmarks/bench_event_time.py [--lines 200000] [--lines-per-second 2000]
+"""
+
+import argparse
+import calendar
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.event_time import EventTimeNormalizer
+
+def build_stream(lines, lines_per_second):
+    """(timestamp, received_at) pairs as a busy collector would see them"""
+    start = calendar.timegm((2024, 12, 31, 23, 50, 0))
+    stream = []
+    for i in range(lines):
+        second = start + i // lines_per_second
+        tm = time.gmtime(second)
+        timestamp = f"{calendar.month_abbr[tm.tm_mon]} {tm.tm_mday:>2} {tm.tm_hour:02}:{tm.tm_min:02}:{tm.tm_sec:02}"
+        stream.append((timestamp, second * 10**9 + 5 * 10**8))
+    return stream
+    
+def measure(func, stream):
+    """Return (nanoseconds per line, results)"""
+    start = time.perf_counter_ns()
+    results = [func(timestamp, received_at) for timestamp, received_at in stream]
+    return (time.perf_counter_ns() - start) / len(stream), results
+    
+def check_iso_timestamps():
+    """RFC 5424 timestamps that fromisoformat rejects before Python 3.11 still parse"""
+    normalizer = EventTimeNormalizer({})
+    second = calendar.timegm((2003, 10, 11, 22, 14, 15)) * 10**9
+    expected = {
+        '2003-10-11T22:14:15Z': second,
+        '2003-10-11T22:14:15.003Z': second + 3 * 10**6,
+        '2003-10-11T22:14:15.5Z': second + 5 * 10**8,
+        '2003-10-11T22:14:15.00003+00:00': second + 30 * 10**3,
+        '2003-10-11T22:14:15.123456789Z': second + 123456 * 10**3,
+        '2003-10-11T15:14:15.5-07:00': second + 5 * 10**8,
+    }
+    for timestamp, value in expected.items():
+        assert normalizer._parse_iso(timestamp) == value, timestamp
+        
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--lines', type=int, default=200000)
+    arg_parser.add_argument('--lines-per-second', type=int, default=2000)
+    args = arg_parser.parse_args()
+    
+    # The stream crosses New Year, so the year inference is exercised too
+    stream = build_stream(args.lines, args.lines_per_second)
+    
+    # Baseline: parse every timestamp, as without the memo
+    uncached, expected = measure(EventTimeNormalizer({})._parse_bsd, stream)
+    memoized = EventTimeNormalizer({})
+    cached, results = measure(memoized.normalize, stream)
+    
+    assert results == expected, "memoized results differ"
+    assert all(value // 10**9 == received_at // 10**9 for value, (_, received_at) in zip(results, stream))
+    
+    print(f"uncached: {uncached:8.0f} ns/line")
+    print(f"memoized: {cached:8.0f} ns/line ({uncached / cached:.1f}x), {memoized.get_stats()}")
+    
+    check_iso_timestamps()
+    
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Field Extractor Benchmark
+Cost of extracting fields once in the parser vs rescanning text in every rule
+
+Run from the siem directory:
+    python benchmarks/bench_extractors.py [--messages 100000] [--seed 0]
+"""
+
+import argparse
+import random
+import re
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.log_parser import LogParser
+from utils.log_event import RawEvent
+
+LINES = [
+    "sshd[{pid}]: Failed password for invalid user {user} from 10.0.{a}.{b} port {port} ssh2",
+    "sshd[{pid}]: Failed publickey for {user} from 10.0.{a}.{b} port {port} ssh2",
+    "sshd[{pid}]: Accepted publickey for {user} from 10.0.{a}.{b} port {port} ssh2: RSA SHA256:abc",
+    "sshd[{pid}]: Connection closed by 10.0.{a}.{b} port {port} [preauth]",
+    "sudo[{pid}]: {user} : TTY=pts/{a} ; PWD=/home/{user} ; USER=root ; COMMAND=/usr/bin/apt update",
+    "systemd[1]: nginx.service: Main process exited, code=exited, status={a}/FAILURE",
+    "kernel: [{pid}.{port}] eth0: link up, 1000Mbps, full-duplex",
+    "cron[{pid}]: ({user}) CMD (/usr/local/bin/backup.sh)",
+]
+USERS = ['root', 'admin', 'alice', 'bob', 'www-data', 'postgres']
+
+# What SSH_BRUTE_FORCE did before it switched to extracted fields
+MESSAGE_PATTERN = re.compile("(Failed password|Failed publickey|Invalid user)", re.IGNORECASE)
+FIELD_VALUES = frozenset(['auth_failure', 'invalid_user'])
+
+def build_batch(count, rng):
+    """Collector-style messages drawn from LINES"""
+    return [RawEvent(
+        ("<38>Jun  5 20:55:00 host1 " + rng.choice(LINES).format(
+            pid=rng.randint(1, 99999), user=rng.choice(USERS), a=rng.randint(0, 255),
+            b=rng.randint(1, 254), port=rng.randint(1024, 65535))).encode(),
+        '10.1.0.1',
+        514,
+        time.time_ns(),
+        'syslog'
+    ) for _ in range(count)]
+    
+def measure(func, items):
+    """Return (nanoseconds per item, results)"""
+    start = time.perf_counter_ns()
+    results = [func(item) for item in items]
+    return (time.perf_counter_ns() - start) / len(items), results
+    
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--messages', type=int, default=100000)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    batch = build_batch(args.messages, random.Random(args.seed))
+    config = {'syslog': {}, 'parser': {'extractors': {'enabled': True}}}
+    plain = LogParser({'syslog': {}}, None, None)
+    extracting = LogParser(config, None, None)
+    
+    start = time.perf_counter_ns()
+    plain._parse_batch(batch)
+    plain_ns = (time.perf_counter_ns() - start) / len(batch)
+    start = time.perf_counter_ns()
+    events = extracting._parse_batch(batch)
+    extracting_ns = (time.perf_counter_ns() - start) / len(batch)
+    
+    # Both forms of the rule must select the same events
+    pattern_ns, by_pattern = measure(lambda event: bool(MESSAGE_PATTERN.search(event['message'])), events)
+    fields_ns, by_fields = measure(lambda event: (event.fields or {}).get('event') in FIELD_VALUES, events)
+    assert by_pattern == by_fields, "field condition selects different events than the message pattern"
+    
+    print(f"parse:        {plain_ns:8.0f} ns/msg, with extractors {extracting_ns:8.0f} ns/msg "
+          f"(+{extracting_ns - plain_ns:.0f}), {extracting.field_extractor.get_stats()}")
+    print(f"rule check:   message_pattern {pattern_ns:6.0f} ns/msg, fields {fields_ns:6.0f} ns/msg "
+          f"({sum(by_fields)} matches)")
+          
+if __name__ == '__main__':
+    main()
\ No newline at end of file
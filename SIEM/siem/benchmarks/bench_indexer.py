@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Indexer Benchmark
+Sustained rows/s of per-row ORM inserts vs bulk INSERT ... RETURNING
+
+The ORM row reproduces the old indexer (one LogEntry object per message,
+batches of 10). The bulk rows call DatabaseManager._process_batch with
+fixed batch sizes, and "adaptive" runs the indexer thread itself, fed as
+fast as the queue takes events. Every run checks that each event's db_id
+points at its own row.
+
+Run from the siem directory:
+    python benchmarks/bench_indexer.py [--rows 50000]
+"""
+
+import argparse
+import os
+import queue
+import random
+import tempfile
+import time
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+from indexer.db_manager import DatabaseManager
+from indexer.models import LogEntry
+from processors.log_parser import LogParser
+from utils.log_event import RawEvent
+
+LINES = [
+    "<38>Jun  5 20:55:00 host{h} sshd[{n}]: Failed password for invalid user admin from 10.0.{a}.{b} port {n} ssh2",
+    "<86>Jun  5 20:55:00 host{h} sudo[{n}]: alice : TTY=pts/{a} ; PWD=/home/alice ; USER=root ; COMMAND=/bin/ls",
+    "<30>Jun  5 20:55:00 host{h} systemd[1]: nginx.service: Main process exited, code=exited, status={a}/FAILURE",
+    "<13>1 2024-06-05T20:55:00.123Z host{h} app {n} ID47 [origin ip=\"10.0.{a}.{b}\"] request {n} served",
+]
+
+def build_events(count, seed):
+    """Parsed LogEvents, each with a unique raw message"""
+    rng = random.Random(seed)
+    config = {'syslog': {}, 'parser': {'extractors': {'enabled': True}}}
+    parser = LogParser(config, None, None)
+    raw = [RawEvent(
+        rng.choice(LINES).format(h=rng.randrange(50), n=i, a=rng.randrange(256), b=rng.randrange(1, 255)).encode(),
+        '10.1.0.1',
+        514,
+        time.time_ns(),
+        'syslog'
+    ) for i in range(count)]
+    return parser._parse_batch(raw)
+    
+def new_manager(directory, name, input_queue=None):
+    """DatabaseManager on a fresh database file"""
+    config = {'database': {
+        'path': os.path.join(directory, f'{name}.db'),
+        'structured_data': {'index_params': ['origin.ip']}
+    }}
+    return DatabaseManager(config, input_queue)
+    
+def check_ids(db_manager, events):
+    """Every event's db_id must be the row holding its raw message"""
+    with db_manager.storage.get_db_session() as session:
+        rows = dict(session.execute(select(LogEntry.id, LogEntry.raw_message)).all())
+    assert len(rows) == len(events), f"{len(rows)} rows for {len(events)} events"
+    for event in events:
+        assert rows[event.db_id] == event.raw_message, f"db_id {event.db_id} points at another row"
+        
+def orm_insert(db_manager, events):
+    """The old indexer: one ORM object per message, batches of 10"""
+    for i in range(0, len(events), 10):
+        batch = events[i:i + 10]
+        with db_manager.storage.get_db_session() as session:
+            entries = [LogEntry(**db_manager.storage._log_entry_row(event)) for event in batch]
+            session.add_all(entries)
+            session.flush()
+            for event, entry in zip(batch, entries):
+                event.db_id = entry.id
+                
+def bulk_insert(db_manager, events, batch_size):
+    """_process_batch with a fixed batch size"""
+    for i in range(0, len(events), batch_size):
+        db_manager._process_batch(events[i:i + batch_size])
+        
+def adaptive_insert(db_manager, events):
+    """The indexer thread, fed in parser-sized lists as fast as it accepts them"""
+    db_manager.start()
+    for i in range(0, len(events), 100):
+        db_manager.input_queue.put(events[i:i + 100])
+    while db_manager.get_stats()['rows_indexed'] < len(events):
+        time.sleep(0.005)
+    
+def report(label, elapsed, count, extra=''):
+    print(f"{label:<14} {count / elapsed:>9,.0f} rows/s  {elapsed * 1e6 / count:7.1f} us/row  {extra}")
+    
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--rows', type=int, default=50000)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        runs = [('orm x10', lambda m, e: orm_insert(m, e))]
+        for batch_size in (10, 100, 1000):
+            runs.append((f'bulk x{batch_size}', lambda m, e, size=batch_size: bulk_insert(m, e, size)))
+            
+        for label, run in runs:
+            events = build_events(args.rows, args.seed)
+            db_manager = new_manager(directory, label.replace(' ', '_'))
+            start = time.perf_counter()
+            run(db_manager, events)
+            report(label, time.perf_counter() - start, len(events))
+            check_ids(db_manager, events)
+            
+        events = build_events(args.rows, args.seed)
+        db_manager = new_manager(directory, 'adaptive', queue.Queue(maxsize=10000))
+        start = time.perf_counter()
+        adaptive_insert(db_manager, events)
+        elapsed = time.perf_counter() - start
+        db_manager.stop()
+        stats = db_manager.get_stats()
+        report('adaptive', elapsed, len(events), f"{stats['batches']} batches, final batch size {stats['batch_size']}")
+        check_ids(db_manager, events)
+        
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Parser Dispatch Benchmark
+Per-format cost of trying every pattern in turn versus sniffed/hinted dispatch
+
+Run from the siem directory:
+    python benchmarks/bench_parser_dispatch.py [--iterations 200000]
+"""
+
+import argparse
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.log_parser import LogParser
+
+SAMPLES = {
+    'standard': "<38>Jun  5 20:55:00 kali-test sshd[5678]: Failed password for invalid user admin from 192.168.1.100 port 22 ssh2",
+    'rfc3164': "<13>Jun  5 20:55:00 fw01 kernel: [1234.5678] DROPPED IN=eth0 OUT= SRC=10.0.0.5 DST=10.0.0.1 PROTO=TCP DPT=22",
+    'rfc5424': "<165>1 2024-06-05T20:55:00.123Z mymachine.example.com evntslog - ID47 [exampleSDID@32473 iut=\"3\"] BOMAn application event",
+    'none': "Jun  5 20:55:00 host message without a priority header",
+}
+
+def sequential_match(raw_msg):
+    """Original dispatch: try every pattern in declaration order"""
+    for pattern_name, pattern in LogParser.PATTERNS.items():
+        match = pattern.match(raw_msg)
+        if match:
+            return pattern_name, match.groupdict()
+    return None, None
+    
+def measure(func, raw_msg, iterations):
+    """Return nanoseconds per call"""
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        func(raw_msg)
+    return (time.perf_counter_ns() - start) / iterations
+    
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--iterations', type=int, default=200000)
+    args = arg_parser.parse_args()
+    
+    parser = LogParser({'syslog': {}}, None, None)
+    
+    print(f"{'format':<10} {'sequential':>12} {'sniffed':>12} {'hinted':>12} {'speedup':>8}")
+    for name, raw_msg in SAMPLES.items():
+        # Both paths must agree on the result
+        expected = sequential_match(raw_msg)
+        actual = parser._match_message(raw_msg, '10.0.0.1')
+        assert expected == actual, f"{name}: {expected} != {actual}"
+        
+        sequential = measure(sequential_match, raw_msg, args.iterations)
+        sniffed = measure(parser._match_message, raw_msg, args.iterations)
+        hinted = measure(lambda line: parser._match_message(line, '10.0.0.1'), raw_msg, args.iterations)
+        print(
+            f"{name:<10} {sequential:>9.0f} ns {sniffed:>9.0f} ns {hinted:>9.0f} ns "
+            f"{sequential / min(sniffed, hinted):>7.2f}x"
+        )
+        
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Parser Pool Benchmark
+Throughput of ParserPool for several worker counts, checking per-source ordering
+
+With fewer cores than workers the pool only adds IPC overhead; the parent CPU
+per message shows the rate the pool can reach when every worker has a core.
+
+Run from the siem directory:
+    python benchmarks/bench_parser_pool.py [--messages 200000] [--sources 64] [--workers 1 2 4]
+"""
+
+import argparse
+import multiprocessing
+import queue
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.log_parser import LogParser
+from processors.parser_pool import ParserPool
+from utils.log_event import RawEvent
+
+def build_batches(count, sources, batch_size=256):
+    """Collector-style batches; each message carries its per-source sequence number"""
+    batches = []
+    batch = []
+    for i in range(count):
+        source = i % sources
+        batch.append(RawEvent(
+            f"<38>Jun  5 20:55:00 host{source} sshd[5678]: Failed password seq={i // sources}".encode(),
+            f"10.0.{source // 256}.{source % 256}",
+            514,
+            time.time_ns(),
+            'syslog'
+        ))
+        if len(batch) == batch_size:
+            batches.append(batch)
+            batch = []
+    if batch:
+        batches.append(batch)
+    return batches
+    
+def check_order(events):
+    """Assert every source's events arrived in sequence"""
+    last_seq = {}
+    for event in events:
+        seq = int(event['message'].rsplit('=', 1)[1])
+        assert seq == last_seq.get(event['source_ip'], -1) + 1, f"{event['source_ip']} out of order at seq {seq}"
+        last_seq[event['source_ip']] = seq
+        
+def run_single(batches):
+    """Baseline: one in-process LogParser"""
+    parser = LogParser({'syslog': {}}, None, None)
+    start = time.perf_counter()
+    for batch in batches:
+        parser._parse_batch(batch)
+    return time.perf_counter() - start
+    
+def run_pool(batches, count, workers):
+    """
+    Push every batch through a ParserPool and wait for all parsed events
+    
+    Returns:
+        (wall seconds, CPU seconds spent in this process)
+    """
+    config = {'syslog': {}, 'parser': {'workers': workers}}
+    input_queue = queue.Queue(maxsize=10000)
+    output_queue = multiprocessing.Queue(maxsize=10000)
+    pool = ParserPool(config, input_queue, output_queue)
+    pool.start()
+    
+    events = []
+    start = time.perf_counter()
+    start_cpu = time.process_time()
+    for batch in batches:
+        input_queue.put(batch)
+        # Keep the output queue drained so the workers never block
+        while not output_queue.empty():
+            events.extend(output_queue.get())
+    while len(events) < count:
+        events.extend(output_queue.get())
+    elapsed = time.perf_counter() - start
+    parent_cpu = time.process_time() - start_cpu
+    
+    pool.stop()
+    check_order(events)
+    return elapsed, parent_cpu
+    
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--messages', type=int, default=200000)
+    arg_parser.add_argument('--sources', type=int, default=64)
+    arg_parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = arg_parser.parse_args()
+    
+    batches = build_batches(args.messages, args.sources)
+    print(f"{multiprocessing.cpu_count()} CPUs, {args.messages} messages from {args.sources} sources")
+    
+    elapsed = run_single(batches)
+    print(f"{'LogParser':<18} {args.messages / elapsed:>12,.0f} msg/s")
+    
+    for workers in args.workers:
+        elapsed, parent_cpu = run_pool(batches, args.messages, workers)
+        # Dispatch and (un)pickling in the parent bound the pool once there are enough cores
+        print(
+            f"{f'ParserPool({workers})':<18} {args.messages / elapsed:>12,.0f} msg/s  "
+            f"parent CPU {parent_cpu / args.messages * 1e6:.2f} us/msg "
+            f"(ceiling {args.messages / parent_cpu:,.0f} msg/s), per-source order OK"
+        )
+        
+if __name__ == '__main__':
+    main()
\ No newline at end of file
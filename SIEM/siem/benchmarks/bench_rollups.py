@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Rollup Benchmark
+/api/stats/overview latency as log_entries grows, COUNT(*) queries vs per-minute rollups
+
+The same events go to two databases, one with rollups and one without,
+in --steps equal steps spread over the last 24 hours. After each step the
+overview is timed on both, along with what the rollups cost the indexer.
+
+Run from the siem directory:
+    python benchmarks/bench_rollups.py [--rows 400000] [--steps 4]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.platform_api import PlatformAPI
+from indexer.db_manager import DatabaseManager
+from bench_indexer import build_events
+from bench_shards import spread
+
+def overview_ms(client, repeat=10):
+    """Median latency of /api/stats/overview and its last response"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get('/api/stats/overview')
+        times.append(time.perf_counter() - start)
+    assert response.status_code == 200, response.get_json()
+    return statistics.median(times) * 1e3, response.get_json()
+    
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--rows', type=int, default=400000)
+    arg_parser.add_argument('--steps', type=int, default=4)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    events = build_events(args.rows, args.seed)
+    spread(events, datetime.utcnow() - timedelta(hours=23), 1)
+    step = args.rows // args.steps
+    
+    with tempfile.TemporaryDirectory() as directory:
+        sides = {}
+        for rollups in (False, True):
+            config = {'database': {
+                'path': os.path.join(directory, f'rollups-{rollups}.db'),
+                'sqlite': {'profile': 'tuned'},
+                'rollups': {'enabled': rollups}
+            }, 'api': {}}
+            db_manager = DatabaseManager(config, None)
+            sides[rollups] = (db_manager, PlatformAPI(config, db_manager).app.test_client())
+            
+        for end in range(step, step * args.steps + 1, step):
+            line = f"{end:>9,} rows"
+            for rollups, (db_manager, client) in sides.items():
+                start = time.perf_counter()
+                for i in range(end - step, end, 2000):
+                    db_manager._process_batch(events[i:min(i + 2000, end)])
+                rate = step / (time.perf_counter() - start)
+                latency, result = overview_ms(client, 3 if not rollups else 10)
+                label = 'rollups' if rollups else 'COUNT(*)'
+                line += f"   {label:<8} overview {latency:7.1f} ms (ingest {rate:>7,.0f} rows/s, logs_24h {result['logs_24h']:,})"
+            print(line)
+            
+if __name__ == '__main__':
+    main()
\ No newline at end of file
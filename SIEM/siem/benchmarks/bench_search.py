@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Search Benchmark
+/api/search latency with LIKE scans vs the FTS5 index, and the index's ingest and size cost
+
+The same database is searched through an API with the full-text index and
+one without it (LIKE '%q%' on message and raw_message). For these
+token-aligned queries both must return the same newest 100 rows.
+
+Run from the siem directory:
+    python benchmarks/bench_search.py [--rows 200000]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from api.platform_api import PlatformAPI
+from indexer.db_manager import DatabaseManager
+from bench_indexer import build_events
+
+# (full-text query, equivalent substring for LIKE)
+QUERIES = [
+    ('"10.0.7.77"', '10.0.7.77'),
+    ('"Failed password"', 'Failed password'),
+    ('"nginx.service: Main process exited"', 'nginx.service: Main process exited'),
+    ('COMMAND=/bin/ls', 'COMMAND=/bin/ls'),
+    ('segfault', 'segfault'),
+]
+
+def search(client, query, order='time', repeat=5):
+    """Median latency of a search and its result ids"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.post('/api/search', json={'query': query, 'limit': 100, 'order': order})
+        times.append(time.perf_counter() - start)
+    assert response.status_code == 200, response.get_json()
+    return statistics.median(times) * 1e3, [result['id'] for result in response.get_json()['results']]
+    
+def ingest(directory, name, events, full_text):
+    """Index events with or without the full-text index; return (manager, rows/s, bytes)"""
+    config = {'database': {
+        'path': os.path.join(directory, f'{name}.db'),
+        'sqlite': {'profile': 'tuned'},
+        'full_text': {'enabled': full_text}
+    }, 'api': {}}
+    db_manager = DatabaseManager(config, None)
+    start = time.perf_counter()
+    for i in range(0, len(events), 2000):
+        db_manager._process_batch(events[i:i + 2000])
+    rate = len(events) / (time.perf_counter() - start)
+    with db_manager.storage.engine.connect() as conn:
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    return config, db_manager, rate, os.path.getsize(config['database']['path'])
+    
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--rows', type=int, default=200000)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        _, _, plain_rate, plain_bytes = ingest(directory, 'plain', build_events(args.rows, args.seed), False)
+        config, db_manager, fts_rate, fts_bytes = ingest(directory, 'fts', build_events(args.rows, args.seed), True)
+        print(f"ingest: {plain_rate:,.0f} rows/s without index, {fts_rate:,.0f} rows/s with "
+              f"({plain_bytes / 1048576:.1f} -> {fts_bytes / 1048576:.1f} MiB)")
+              
+        fts_client = PlatformAPI(config, db_manager).app.test_client()
+        like_manager = DatabaseManager(dict(config, database=dict(config['database'], full_text={'enabled': False})), None)
+        like_client = PlatformAPI(config, like_manager).app.test_client()
+        
+        for fts_query, like_query in QUERIES:
+            like_ms, like_ids = search(like_client, like_query, repeat=2)
+            fts_ms, fts_ids = search(fts_client, fts_query)
+            rank_ms, _ = search(fts_client, fts_query, 'rank')
+            assert like_ids == fts_ids, f"{fts_query}: full-text results differ from LIKE"
+            print(f"{fts_query:<40} LIKE {like_ms:8.1f} ms   FTS5 by time {fts_ms:7.1f} ms   by rank {rank_ms:7.1f} ms")
+            
+if __name__ == '__main__':
+    main()
\ No newline at end of file
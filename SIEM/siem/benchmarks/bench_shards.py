@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Shard Benchmark
+One log_entries table vs per-day shard files: ingest, range queries and retention
+
+Events are spread evenly over --days days ending today. Retention removes
+the older half: DELETE + VACUUM on the single database, shard file
+deletion with shards.
+
+Run from the siem directory:
+    python benchmarks/bench_shards.py [--rows 100000] [--days 10]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+from api.platform_api import PlatformAPI
+from indexer.db_manager import DatabaseManager
+from indexer.shards import EPOCH
+from bench_indexer import build_events
+
+def spread(events, first_day, days):
+    """Give events increasing received_at over the days"""
+    step = days * 86400 * 10**9 // len(events)
+    base = (first_day - EPOCH) // timedelta(microseconds=1) * 1000
+    for i, event in enumerate(events):
+        event.received_at = base + i * step
+        
+def query_ms(client, url, repeat=20):
+    """Median latency of an API call"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url)
+        times.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_json()
+    return statistics.median(times) * 1e3
+    
+def db_bytes(db_manager, directory):
+    """Bytes of every database file under directory, after folding the WAL back in"""
+    engines = [db_manager.storage.engine]
+    if db_manager.storage.shards is not None:
+        engines += db_manager.storage.shards.engines_for_range()
+    for engine in engines:
+        with engine.connect() as conn:
+            conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(directory) for name in names
+    )
+    
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--rows', type=int, default=100000)
+    arg_parser.add_argument('--days', type=int, default=10)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    first_day = today - timedelta(days=args.days - 1)
+    cutoff = first_day + timedelta(days=args.days // 2)
+    last_day = f"/api/logs?limit=100&start_date={today.isoformat()}&end_date={(today + timedelta(days=1)).isoformat()}"
+    
+    for sharded in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            config = {'database': {
+                'path': os.path.join(directory, 'siem.db'),
+                'sqlite': {'profile': 'tuned'},
+                'structured_data': {'index_params': ['origin.ip']},
+                'shards': {'enabled': sharded, 'directory': os.path.join(directory, 'shards')}
+            }, 'api': {}}
+            db_manager = DatabaseManager(config, None)
+            client = PlatformAPI(config, db_manager).app.test_client()
+            events = build_events(args.rows, args.seed)
+            spread(events, first_day, args.days)
+            
+            start = time.perf_counter()
+            for i in range(0, len(events), 2000):
+                db_manager._process_batch(events[i:i + 2000])
+            ingest = len(events) / (time.perf_counter() - start)
+            
+            range_ms = query_ms(client, last_day)
+            all_ms = query_ms(client, '/api/logs?limit=100')
+            before = db_bytes(db_manager, directory)
+            
+            start = time.perf_counter()
+            if sharded:
+                db_manager.storage.shards.retention = timedelta(days=args.days - args.days // 2)
+                db_manager.storage.shards.apply_retention(now=today + timedelta(days=1))
+            else:
+                with db_manager.storage.engine.begin() as conn:
+                    conn.execute(text(
+                        "DELETE FROM log_sd_params WHERE log_entry_id IN "
+                        "(SELECT id FROM log_entries WHERE received_at < :cutoff)"
+                    ), {'cutoff': cutoff})
+                    conn.execute(text("DELETE FROM log_entries WHERE received_at < :cutoff"), {'cutoff': cutoff})
+                with db_manager.storage.engine.connect() as conn:
+                    conn.execute(text("VACUUM"))
+            retention_ms = (time.perf_counter() - start) * 1e3
+            
+            remaining = client.get('/api/logs?limit=1').get_json()['total']
+            label = 'sharded' if sharded else 'single'
+            print(f"{label:<8} ingest {ingest:>8,.0f} rows/s  last-day query {range_ms:6.1f} ms  "
+                  f"unbounded query {all_ms:6.1f} ms  retention {retention_ms:8.1f} ms "
+                  f"({before / 1048576:.1f} -> {db_bytes(db_manager, directory) / 1048576:.1f} MiB, {remaining} rows left)")
+                  
+if __name__ == '__main__':
+    main()
\ No newline at end of file
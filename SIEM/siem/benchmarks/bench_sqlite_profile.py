@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+SQLite Profile Benchmark
+Ingest rate and API latency with concurrent readers, default vs tuned pragmas
+
+For each profile the indexer thread is fed as fast as it accepts events
+while reader threads call /api/logs and /api/stats/overview through the
+Flask test client. Reader errors (e.g. "database is locked") are counted. The commit rate
+row indexes one event per transaction, as an idle indexer does, which is
+where the per-commit fsync shows.
+Databases are created in --dir (default: a temporary directory), which
+should be on the disk the SIEM runs on, since fsync cost is what differs.
+
+Run from the siem directory:
+    python benchmarks/bench_sqlite_profile.py [--rows 50000] [--readers 2]
+"""
+
+import argparse
+import os
+import queue
+import tempfile
+import threading
+import time
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.platform_api import PlatformAPI
+from indexer.db_manager import DatabaseManager
+from bench_indexer import build_events
+
+ENDPOINTS = ['/api/logs?limit=50', '/api/stats/overview']
+
+def reader(client, stop, latencies, errors):
+    """Call the API endpoints in turn until stop is set"""
+    i = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = client.get(ENDPOINTS[i % len(ENDPOINTS)])
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            errors.append(response.get_json().get('error'))
+        i += 1
+        
+def run(directory, profile, events, readers):
+    """Index events under one profile with readers running; return the results"""
+    config = {
+        'database': {'path': os.path.join(directory, f'{profile}_{readers}.db'), 'sqlite': {'profile': profile}},
+        'api': {}
+    }
+    db_manager = DatabaseManager(config, queue.Queue(maxsize=10000))
+    client = PlatformAPI(config, db_manager).app.test_client()
+    
+    stop = threading.Event()
+    latencies, errors = [], []
+    threads = [threading.Thread(target=reader, args=(client, stop, latencies, errors)) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+        
+    db_manager.start()
+    start = time.perf_counter()
+    for i in range(0, len(events), 100):
+        db_manager.input_queue.put(events[i:i + 100])
+    while db_manager.get_stats()['rows_indexed'] < len(events):
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    
+    stop.set()
+    for thread in threads:
+        thread.join()
+    db_manager.stop()
+    return len(events) / elapsed, sorted(latencies), errors
+    
+def commit_rate(directory, profile, events):
+    """Transactions/s when every event is its own batch"""
+    config = {'database': {'path': os.path.join(directory, f'{profile}_commits.db'), 'sqlite': {'profile': profile}}}
+    db_manager = DatabaseManager(config, None)
+    start = time.perf_counter()
+    for event in events:
+        db_manager._process_batch([event])
+    return len(events) / (time.perf_counter() - start)
+    
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--rows', type=int, default=50000)
+    arg_parser.add_argument('--readers', type=int, default=2)
+    arg_parser.add_argument('--dir', help='directory for the benchmark databases')
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    with tempfile.TemporaryDirectory(dir=args.dir) as directory:
+        for profile in ('default', 'tuned'):
+            for readers in (0, args.readers):
+                rate, latencies, errors = run(directory, profile, build_events(args.rows, args.seed), readers)
+                line = f"{profile:<8} readers={readers}  ingest {rate:>8,.0f} rows/s"
+                if latencies:
+                    p50 = latencies[len(latencies) // 2] * 1e3
+                    p95 = latencies[int(len(latencies) * 0.95)] * 1e3
+                    line += (f"  api {len(latencies):>5} requests  p50 {p50:6.1f} ms  p95 {p95:6.1f} ms  "
+                             f"max {latencies[-1] * 1e3:7.1f} ms  {len(errors)} errors")
+                print(line)
+                
+            rate = commit_rate(directory, profile, build_events(min(args.rows, 2000), args.seed))
+            print(f"{profile:<8} 1-row batches  {rate:>8,.0f} commits/s")
+            
+if __name__ == '__main__':
+    main()
\ No newline at end of file
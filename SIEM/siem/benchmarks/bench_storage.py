@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Storage Backend Benchmark
+The same workload against every storage backend: append, scan, queries, search, counts and alert CRUD
+
+Each backend in STORAGE_BACKENDS gets the same events (spread over the
+last 24 hours) and is driven through the StorageBackend interface alone,
+so a new backend only needs an entry in BACKEND_CONFIGS. Every backend
+must return the same totals for the filtered queries.
+
+Run from the siem directory:
+    python benchmarks/bench_storage.py [--rows 100000] [--alerts 5000]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indexer.db_manager import STORAGE_BACKENDS
+from bench_indexer import build_events
+from bench_shards import spread
+
+# database configuration per backend; rows is the benchmark's --rows
+BACKEND_CONFIGS = {
+    'sqlite': lambda directory, rows: {
+        'path': os.path.join(directory, 'storage.db'),
+        'sqlite': {'profile': 'tuned'},
+        'full_text': {'enabled': True},
+        'rollups': {'enabled': True},
+        'alert_writer': {'enabled': True}
+    },
+    'memory': lambda directory, rows: {
+        'memory': {'capacity': rows}
+    },
+    'segment': lambda directory, rows: {
+        'path': os.path.join(directory, 'segment.db'),
+        'sqlite': {'profile': 'tuned'},
+        'rollups': {'enabled': True},
+        'alert_writer': {'enabled': True},
+        'segments': {'directory': os.path.join(directory, 'segments')}
+    }
+}
+
+def timed(func, repeat=5):
+    """Median latency of func() in ms and its last result"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1e3, result
+    
+def run(name, storage, events, alerts, now):
+    """Drive one backend through the workload; return the query totals"""
+    storage.start()
+    try:
+        start = time.perf_counter()
+        for i in range(0, len(events), 2000):
+            storage.append_logs(events[i:i + 2000])
+        elapsed = time.perf_counter() - start
+        print(f"{name:<8} append          {len(events) / elapsed:>12,.0f} rows/s")
+        
+        start = time.perf_counter()
+        scanned = sum(1 for _ in storage.scan_logs())
+        print(f"{name:<8} scan            {scanned / (time.perf_counter() - start):>12,.0f} rows/s")
+        
+        queries = {
+            'newest 100': {},
+            'severity=6': {'severity': 6},
+            'last hour': {'start': now - timedelta(hours=1)},
+            'page 500': {'offset': 50000}
+        }
+        totals = {}
+        for label, filters in queries.items():
+            latency, (total, _) = timed(lambda: storage.query_logs(limit=100, **filters))
+            totals[label] = total
+            print(f"{name:<8} query {label:<10} {latency:9.2f} ms  ({total:,} matching)")
+            
+        latency, (results, _) = timed(lambda: storage.search_logs('nginx'))
+        print(f"{name:<8} search          {latency:9.2f} ms  ({len(results)} results)")
+        latency, _ = timed(lambda: storage.count_logs(now - timedelta(hours=24)))
+        print(f"{name:<8} count_logs      {latency:9.2f} ms")
+        latency, _ = timed(lambda: storage.top_values('source_ip', now - timedelta(hours=24)))
+        print(f"{name:<8} top_values      {latency:9.2f} ms")
+        
+        alert = {'rule_id': 'BENCH', 'rule_name': 'Bench', 'severity': 'high', 'description': 'benchmark alert'}
+        start = time.perf_counter()
+        ids = [future.result() for future in [storage.submit_alert(alert) for _ in range(alerts)]]
+        create_rate = alerts / (time.perf_counter() - start)
+        start = time.perf_counter()
+        for alert_id in ids[:1000]:
+            storage.acknowledge_alert(alert_id, 'bench')
+        ack_rate = min(alerts, 1000) / (time.perf_counter() - start)
+        list_ms, (total, _) = timed(lambda: storage.get_alerts(acknowledged=False))
+        start = time.perf_counter()
+        for alert_id in ids[:1000]:
+            storage.delete_alert(alert_id)
+        delete_rate = min(alerts, 1000) / (time.perf_counter() - start)
+        print(f"{name:<8} alerts          create {create_rate:,.0f}/s, acknowledge {ack_rate:,.0f}/s, "
+              f"delete {delete_rate:,.0f}/s, list {list_ms:.2f} ms ({total:,} unacknowledged)")
+        return totals
+    finally:
+        storage.stop()
+        
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--rows', type=int, default=100000)
+    arg_parser.add_argument('--alerts', type=int, default=5000)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    # Every backend sees the same received_at times
+    now = datetime.utcnow()
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, create_backend in STORAGE_BACKENDS.items():
+            events = build_events(args.rows, args.seed)
+            spread(events, now - timedelta(hours=23), 1)
+            config = {'database': BACKEND_CONFIGS[name](directory, args.rows)}
+            results[name] = run(name, create_backend(config), events, args.alerts, now)
+            
+    assert len({tuple(totals.items()) for totals in results.values()}) == 1, results
+    
+if __name__ == '__main__':
+    main()
\ No newline at end of file
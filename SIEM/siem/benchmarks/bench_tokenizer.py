@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tokenizer Benchmark
+Checks the hand-written syslog tokenizer against the regexes and compares throughput
+
+Run from the siem directory:
+    python benchmarks/bench_tokenizer.py [--lines 200000] [--seed 0]
+"""
+
+import argparse
+import random
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from processors.log_parser import LogParser
+from processors.syslog_tokenizer import tokenize_syslog
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+PROGRAMS = ['sshd', 'sudo', 'systemd', 'cron', 'audit', 'nginx', 'postfix/smtpd']
+WORDS = ['Failed', 'password', 'for', 'user', 'root', 'from', '10.0.0.5', 'port', '22', 'ssh2',
+         'session', 'opened', 'closed', 'COMMAND=/bin/bash', 'uid=0', '[1234.5678]', 'key="v a"']
+STRUCTURED_DATA = ['-', '[origin ip="10.0.0.5"]', '[origin ip="10.0.0.5" software="rsyslogd 8"]',
+                   '[exampleSDID@32473 iut="3" eventSource="Application Log"][meta sequenceId="7"]',
+                   '[meta text="a ] b"]', '[meta text="quoted \\"x\\" \\] here"]', '[meta]', '[meta x="1"]tail',
+                   '[unterminated a="1"', '[meta a="open]']
+         
+def random_message(rng):
+    """Message body of 1 to 200 words"""
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 200)))
+    
+def random_line(rng):
+    """One syslog line; a few percent are deliberately odd"""
+    pri = rng.randint(0, 191)
+    stamp = f"{rng.choice(MONTHS)} {rng.randint(1, 31):>2} {rng.randint(0, 23):02}:{rng.randint(0, 59):02}:{rng.randint(0, 59):02}"
+    host = f"host{rng.randint(1, 50)}"
+    kind = rng.random()
+    
+    if kind < 0.45:
+        line = f"<{pri}>{stamp} {host} {rng.choice(PROGRAMS)}[{rng.randint(1, 99999)}]: {random_message(rng)}"
+    elif kind < 0.75:
+        line = f"<{pri}>{stamp} {host} {rng.choice(PROGRAMS)}: {random_message(rng)}"
+    elif kind < 0.95:
+        line = (
+            f"<{pri}>1 2024-06-05T20:55:{rng.randint(0, 59):02}.123Z {host} {rng.choice(PROGRAMS)} "
+            f"{rng.randint(1, 9999)} ID{rng.randint(1, 99)} {rng.choice(STRUCTURED_DATA)} {random_message(rng)}"
+        )
+    else:
+        odd = [
+            f"<{pri}>{stamp}\t{host} cron[1]: tab separated",
+            f"<{pri}>{stamp} hôst sshd[1]: non-ASCII hostname",
+            f"<{pri}>{stamp} {host} multi word tag: no colon-free tag",
+            f"<{pri}>{stamp} {host}  [7]: whitespace process name",
+            f"{stamp} {host} message without a priority",
+            f"<{pri}>not a syslog header at all",
+        ]
+        line = rng.choice(odd)
+    return line
+    
+def regex_parse(raw_msg):
+    """Original parsing: try every pattern in turn and build a groupdict"""
+    for pattern_name, pattern in LogParser.PATTERNS.items():
+        match = pattern.match(raw_msg)
+        if match:
+            return pattern_name, match.groupdict()
+    return None, None
+    
+def measure(func, lines):
+    """Return lines per second"""
+    start = time.perf_counter()
+    for line in lines:
+        func(line)
+    return len(lines) / (time.perf_counter() - start)
+    
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--lines', type=int, default=200000)
+    arg_parser.add_argument('--seed', type=int, default=0)
+    args = arg_parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    lines = [random_line(rng) for _ in range(args.lines)]
+    parsers = {
+        'parser': LogParser({'syslog': {}}, None, None),
+        'parser (tokenize_bsd)': LogParser({'syslog': {}, 'parser': {'tokenize_bsd': True}}, None, None)
+    }
+    
+    # Differential check: whatever the tokenizer accepts must equal the regex result
+    handled = 0
+    for line in lines:
+        expected = regex_parse(line)
+        result = tokenize_syslog(line)
+        if result is not None:
+            handled += 1
+            assert result == expected, f"{line!r}: {result} != {expected}"
+        for parser in parsers.values():
+            assert parser._match_message(line, '10.0.0.1') == expected, line
+    print(f"Differential check passed on {len(lines)} lines ({handled / len(lines):.1%} tokenized)")
+    
+    # Throughput per header format
+    by_format = {}
+    for line in lines:
+        by_format.setdefault(regex_parse(line)[0] or 'none', []).append(line)
+        
+    print(f"{'format':<10} {'regex':>12} {'tokenizer':>12} {'parser':>12} {'parser (bsd)':>14}  lines/s")
+    for pattern_name, subset in sorted(by_format.items()):
+        rates = [measure(regex_parse, subset), measure(tokenize_syslog, subset)]
+        for parser in parsers.values():
+            rates.append(measure(lambda line: parser._match_message(line, '10.0.0.1'), subset))
+        print(f"{pattern_name:<10} {rates[0]:>12,.0f} {rates[1]:>12,.0f} {rates[2]:>12,.0f} {rates[3]:>14,.0f}")
+        
+if __name__ == '__main__':
+    main()
\ No newline at end of file
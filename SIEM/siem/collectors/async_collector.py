@@ -0,0 +1,234 @@
+"""
+Async Syslog Collector Module
+Serves UDP and TCP syslog (RFC 6587 framing) from a single asyncio event loop
+"""
+
+import asyncio
+import queue
+import threading
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collectors.syslog_collector import SyslogCollector
+
+class SyslogUDPProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol that hands every datagram to the collector"""
+    
+    def __init__(self, collector):
+        self.collector = collector
+        
+    def datagram_received(self, data, addr):
+        """Forward a received datagram to the collector"""
+        self.collector._handle_datagram(data, addr)
+        
+    def error_received(self, exc):
+        """Log socket errors (e.g. ICMP port unreachable)"""
+        self.collector.logger.debug(f"UDP error: {exc}")
+        
+class AsyncSyslogCollector(SyslogCollector):
+    """Collects syslog over UDP and TCP without a thread per connection"""
+    
+    def __init__(self, config, message_queue):
+        """
+        Initialize the async syslog collector
+        
+        Args:
+            config: Configuration dictionary
+            message_queue: Queue to send messages to processor
+        """
+        super().__init__(config, message_queue)
+        self.loop = None
+        self.stop_event = None
+        self.connections = set()
+        
+        # stop() may run before _serve has created stop_event
+        self.stop_requested = threading.Event()
+        
+        self.stats.update({
+            'tcp_connections': 0,
+            'tcp_connections_rejected': 0,
+            'tcp_frames': 0,
+            'messages_dropped': 0,
+            'backpressure_waits': 0
+        })
+        
+    def start(self):
+        """Start the collector (blocks until stopped)"""
+        self.running = True
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._serve())
+        except Exception as e:
+            self.logger.error(f"Failed to start async syslog collector: {e}")
+            raise
+        finally:
+            self.loop.close()
+            
+    def stop(self):
+        """Stop the collector"""
+        self.running = False
+        self.stop_requested.set()
+        if self.loop and self.stop_event and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.stop_event.set)
+        self.logger.info("Syslog collector stopped")
+        
+    async def _serve(self):
+        """Bind the UDP and TCP listeners and wait for shutdown"""
+        syslog_config = self.config['syslog']
+        host = syslog_config['host']
+        udp_port = syslog_config['port']
+        tcp_port = syslog_config.get('tcp_port')
+        reuse_port = syslog_config.get('reuse_port') or None
+        max_frame_size = syslog_config.get('max_frame_size', 65536)
+        
+        self.stop_event = asyncio.Event()
+        if self.stop_requested.is_set():
+            self.stop_event.set()
+            
+        transport, _ = await self.loop.create_datagram_endpoint(
+            lambda: SyslogUDPProtocol(self),
+            local_addr=(host, udp_port),
+            reuse_port=reuse_port
+        )
+        self.logger.info(f"Syslog collector started on {host}:{udp_port}/udp")
+        
+        server = None
+        if tcp_port:
+            server = await asyncio.start_server(
+                self._handle_connection,
+                host,
+                tcp_port,
+                reuse_port=reuse_port,
+                limit=max_frame_size
+            )
+            self.logger.info(f"Syslog collector started on {host}:{tcp_port}/tcp")
+            
+        try:
+            await self.stop_event.wait()
+        finally:
+            transport.close()
+            if server:
+                server.close()
+            for task in list(self.connections):
+                task.cancel()
+            if self.connections:
+                await asyncio.gather(*self.connections, return_exceptions=True)
+                
+    def _handle_datagram(self, data, addr):
+        """Queue the messages of one UDP datagram without blocking the loop"""
+        self.stats['datagrams_received'] += 1
+        if not data:
+            return
+            
+        messages = self._build_messages(data, addr)
+        if not messages:
+            return
+            
+        queued = 0
+        try:
+            if self.config['syslog'].get('batch_mode', False):
+                self.message_queue.put_nowait(messages)
+                queued = len(messages)
+            else:
+                for message in messages:
+                    self.message_queue.put_nowait(message)
+                    queued += 1
+        except queue.Full:
+            # UDP has no flow control; count what we could not queue
+            self.stats['messages_dropped'] += len(messages) - queued
+            
+        self.stats['messages_enqueued'] += queued
+        if queued == len(messages):
+            self.stats['datagrams_enqueued'] += 1
+        
+    async def _handle_connection(self, reader, writer):
+        """Read framed messages from one TCP connection"""
+        max_connections = self.config['syslog'].get('max_tcp_connections', 10000)
+        if len(self.connections) >= max_connections:
+            self.stats['tcp_connections_rejected'] += 1
+            writer.close()
+            return
+            
+        task = asyncio.current_task()
+        self.connections.add(task)
+        self.stats['tcp_connections'] += 1
+        addr = writer.get_extra_info('peername')[:2]
+        
+        try:
+            while self.running:
+                frame, split_lines = await self._read_frame(reader)
+                if frame is None:
+                    break
+                    
+                self.stats['tcp_frames'] += 1
+                messages = self._build_messages(frame, addr, split_lines=split_lines)
+                if messages:
+                    await self._enqueue(messages)
+                    
+        except asyncio.CancelledError:
+            pass
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            self.logger.debug(f"TCP connection from {addr[0]}:{addr[1]} closed: {e}")
+        except ValueError as e:
+            self.logger.warning(f"Framing error from {addr[0]}:{addr[1]}: {e}")
+        finally:
+            self.connections.discard(task)
+            writer.close()
+            
+    async def _read_frame(self, reader):
+        """
+        Read one RFC 6587 frame
+        
+        Octet-counted frames start with the message length ("123 <34>...");
+        anything else is non-transparent framing terminated by LF.
+        
+        Args:
+            reader: asyncio.StreamReader of the connection
+            
+        Returns:
+            (frame bytes, split_lines) tuple, or (None, False) at end of stream
+        """
+        first = await reader.read(1)
+        if not first:
+            return None, False
+            
+        if first.isdigit():
+            # Octet counting: MSG-LEN SP SYSLOG-MSG
+            header = first + await reader.readuntil(b' ')
+            length = int(header[:-1])
+            if length > self.config['syslog'].get('max_frame_size', 65536):
+                raise ValueError(f"frame of {length} bytes exceeds max_frame_size")
+            return await reader.readexactly(length), False
+            
+        # Non-transparent framing: SYSLOG-MSG LF
+        try:
+            return first + await reader.readuntil(b'\n'), True
+        except asyncio.IncompleteReadError as e:
+            # Sender closed without a trailing newline
+            return first + e.partial, True
+            
+    async def _enqueue(self, messages):
+        """
+        Queue messages from a TCP connection, applying backpressure
+        
+        While the parser queue is full the connection is simply not read,
+        so TCP flow control slows the sender down instead of dropping data.
+        """
+        if self.config['syslog'].get('batch_mode', False):
+            items = [messages]
+        else:
+            items = messages
+            
+        for item in items:
+            delay = 0.001
+            while True:
+                try:
+                    self.message_queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    self.stats['backpressure_waits'] += 1
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 0.1)
+                    
+        self.stats['messages_enqueued'] += len(messages)
\ No newline at end of file
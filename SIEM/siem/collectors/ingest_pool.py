@@ -0,0 +1,147 @@
+"""
+Ingest Pool Module
+Runs several collector+parser worker processes on the same UDP port (SO_REUSEPORT)
+"""
+
+import copy
+import multiprocessing
+import queue
+import signal
+import socket
+import threading
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger
+
+def _run_ingest_worker(config, worker_id, output_queue, stop_event):
+    """
+    Worker process entry point
+    
+    Args:
+        config: Configuration dictionary (already adjusted for worker mode)
+        worker_id: Index of this worker
+        output_queue: multiprocessing.Queue shared with the indexer
+        stop_event: multiprocessing.Event set by the pool to stop the worker
+    """
+    # The parent process owns shutdown handling
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    from collectors.syslog_collector import create_collector
+    from collectors.spill_queue import create_spill_queue
+    from processors.log_parser import create_parser
+    
+    logger = setup_logger(f"{__name__}.worker{worker_id}")
+    
+    # Collector and parser talk over an in-process queue; only parsed
+    # batches cross the process boundary
+    if config.get('spill', {}).get('enabled', False):
+        # Each worker journals into its own directory
+        config['spill']['directory'] = os.path.join(config['spill'].get('directory', 'spill'), f"worker{worker_id}")
+        collector_to_parser = create_spill_queue(config, maxsize=10000)
+    else:
+        collector_to_parser = queue.Queue(maxsize=10000)
+    parser = create_parser(config, collector_to_parser, output_queue)
+    collector = create_collector(config, collector_to_parser)
+    
+    def stop_on_event():
+        # Stopping the collector returns from collector.start() below
+        stop_event.wait()
+        collector.stop()
+        
+    stopper = threading.Thread(target=stop_on_event)
+    stopper.daemon = True
+    stopper.start()
+    
+    parser.start()
+    logger.info(f"Ingest worker {worker_id} started (pid {os.getpid()})")
+    
+    try:
+        collector.start()
+    finally:
+        # Forwards the last batch and pending dedup summaries to the indexer
+        parser.stop()
+        if hasattr(collector_to_parser, 'close'):
+            collector_to_parser.close()
+        
+class IngestPool:
+    """Runs N collector+parser processes bound to the same UDP port"""
+    
+    def __init__(self, config, output_queue):
+        """
+        Initialize the ingest pool
+        
+        Args:
+            config: Configuration dictionary
+            output_queue: multiprocessing.Queue to send parsed batches to indexer
+        """
+        self.config = config
+        self.output_queue = output_queue
+        self.logger = setup_logger(__name__)
+        self.running = False
+        self.workers = []
+        self.stop_event = multiprocessing.Event()
+        self.num_workers = config['syslog'].get('workers', 1)
+        
+    def _worker_config(self):
+        """Build the configuration used by every worker process"""
+        worker_config = copy.deepcopy(self.config)
+        
+        # Workers always share the port and forward whole batches
+        worker_config['syslog']['reuse_port'] = True
+        worker_config['syslog']['batch_mode'] = True
+        
+        return worker_config
+        
+    def start(self):
+        """Start the worker processes and block until stopped"""
+        worker_config = self._worker_config()
+        self.stop_event.clear()
+        self.running = True
+        
+        for worker_id in range(self.num_workers):
+            process = multiprocessing.Process(
+                target=_run_ingest_worker,
+                args=(worker_config, worker_id, self.output_queue, self.stop_event),
+                name=f"siem-ingest-{worker_id}"
+            )
+            process.daemon = True
+            process.start()
+            self.workers.append(process)
+            
+        self.logger.info(
+            f"Ingest pool started with {self.num_workers} workers on "
+            f"{self.config['syslog']['host']}:{self.config['syslog']['port']}"
+        )
+        
+        # Block like SyslogCollector.start so the orchestrator keeps its main thread
+        while self.running:
+            for process in self.workers:
+                process.join(timeout=1)
+                if self.running and not process.is_alive():
+                    raise RuntimeError(f"Ingest worker {process.name} exited with code {process.exitcode}")
+                    
+    def stop(self):
+        """Stop all worker processes, terminating only those that do not exit"""
+        self.running = False
+        
+        # Workers flush their parser before exiting; terminating a process
+        # that is writing to output_queue can corrupt it
+        self.stop_event.set()
+        for process in self.workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                self.logger.warning(f"Ingest worker {process.name} did not stop, terminating it")
+                process.terminate()
+                process.join(timeout=1)
+        self.workers = []
+        self.logger.info("Ingest pool stopped")
+        
+def reuse_port_supported():
+    """Return True if the platform supports SO_REUSEPORT"""
+    return hasattr(socket, 'SO_REUSEPORT')
+    
+def create_ingest_pool(config, output_queue):
+    """Factory function to create an ingest pool"""
+    return IngestPool(config, output_queue)
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Rate Limiter Module
+Per-source token buckets with sampling, kept in a bounded LRU
+"""
+
+import time
+from collections import OrderedDict
+
+class TokenBucket:
+    """Token bucket state for a single source"""
+    
+    __slots__ = ('tokens', 'updated', 'excess')
+    
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+        self.excess = 0
+        
+class SourceRateLimiter:
+    """Limits how many messages each source_ip may put on the parser queue"""
+    
+    def __init__(self, config):
+        """
+        Initialize the rate limiter
+        
+        Args:
+            config: rate_limit configuration dictionary
+        """
+        self.rate = float(config.get('rate', 1000))
+        self.burst = float(config.get('burst', self.rate * 2))
+        self.max_sources = config.get('max_sources', 100000)
+        
+        # Keep every Nth message over the limit so floods stay visible
+        sample_ratio = config.get('sample_ratio', 0.0)
+        self.sample_every = int(round(1 / sample_ratio)) if sample_ratio > 0 else 0
+        
+        self.buckets = OrderedDict()
+        self.stats = {
+            'rate_limited': 0,
+            'sampled': 0,
+            'sources_tracked': 0,
+            'sources_evicted': 0
+        }
+        
+    def filter(self, source_ip, messages):
+        """
+        Drop the messages of a source that exceed its bucket
+        
+        Args:
+            source_ip: Address the messages came from
+            messages: List of RawEvents from one read
+            
+        Returns:
+            List of admitted messages
+        """
+        now = time.monotonic()
+        bucket = self.buckets.get(source_ip)
+        
+        if bucket is None:
+            bucket = TokenBucket(self.burst, now)
+            self.buckets[source_ip] = bucket
+            if len(self.buckets) > self.max_sources:
+                # Least recently seen source goes first
+                self.buckets.popitem(last=False)
+                self.stats['sources_evicted'] += 1
+        else:
+            self.buckets.move_to_end(source_ip)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+            
+        count = len(messages)
+        if bucket.tokens >= count:
+            bucket.tokens -= count
+            return messages
+            
+        allowed = int(bucket.tokens)
+        bucket.tokens -= allowed
+        admitted = messages[:allowed]
+        
+        for message in messages[allowed:]:
+            bucket.excess += 1
+            if self.sample_every and bucket.excess % self.sample_every == 0:
+                message.sampled = True
+                admitted.append(message)
+                self.stats['sampled'] += 1
+            else:
+                self.stats['rate_limited'] += 1
+                
+        return admitted
+        
+    def get_stats(self):
+        """Return limiter counters"""
+        stats = dict(self.stats)
+        stats['sources_tracked'] = len(self.buckets)
+        return stats
+        
+def create_rate_limiter(config):
+    """Factory function to create a rate limiter (None when disabled)"""
+    rate_config = config['syslog'].get('rate_limit', {})
+    if not rate_config.get('enabled', False):
+        return None
+    return SourceRateLimiter(rate_config)
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+Spill Queue Module
+Bounded in-memory queue that overflows to an append-only on-disk segment journal
+"""
+
+import os
+import pickle
+import queue
+import struct
+import threading
+import time
+import sys
+from collections import deque
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger
+
+# Record header: payload length + spill time (ns)
+RECORD_HEADER = struct.Struct('>IQ')
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.spill'
+
+class SpillQueue:
+    """
+    Drop-in replacement for queue.Queue that never blocks producers
+    
+    Items go to the in-memory queue while it has room. Once it is full,
+    items are appended to journal segments on disk, and every later item
+    follows them there until the journal has been replayed, so ordering
+    is preserved. Consumers refill the memory queue from the journal as
+    they drain it.
+    """
+    
+    def __init__(self, config, maxsize=10000):
+        """
+        Initialize the spill queue
+        
+        Args:
+            config: Configuration dictionary
+            maxsize: Capacity of the in-memory queue
+        """
+        spill_config = config.get('spill', {})
+        self.directory = spill_config.get('directory', 'spill')
+        self.segment_size = spill_config.get('segment_size', 64 * 1024 * 1024)
+        self.replay_batch = spill_config.get('replay_batch', 1000)
+        self.logger = setup_logger(__name__)
+        
+        self.memory = queue.Queue(maxsize=maxsize)
+        self.lock = threading.Lock()
+        
+        # Journal state
+        self.segments = deque()
+        self.next_segment = 0
+        self.write_file = None
+        self.read_file = None
+        self.journal_records = 0
+        self.journal_bytes = 0
+        self.oldest_spilled_ns = None
+        
+        self.stats = {
+            'spilled': 0,
+            'replayed': 0
+        }
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self._recover()
+        
+    def put(self, item, block=True, timeout=None):
+        """Queue an item, spilling to disk instead of blocking when full"""
+        with self.lock:
+            if self.journal_records == 0:
+                try:
+                    self.memory.put_nowait(item)
+                    return
+                except queue.Full:
+                    pass
+            self._append(item)
+            
+    def put_nowait(self, item):
+        """Queue an item without blocking"""
+        self.put(item, block=False)
+        
+    def get(self, block=True, timeout=None):
+        """Remove and return the next item (raises queue.Empty on timeout)"""
+        if self.journal_records:
+            self._refill()
+        item = self.memory.get(block, timeout)
+        if self.journal_records:
+            self._refill()
+        return item
+        
+    def get_nowait(self):
+        """Remove and return the next item without blocking"""
+        return self.get(block=False)
+        
+    def qsize(self):
+        """Number of items held in memory and on disk"""
+        return self.memory.qsize() + self.journal_records
+        
+    def empty(self):
+        """Return True if no items are queued"""
+        return self.qsize() == 0
+        
+    def full(self):
+        """A spill queue is never full"""
+        return False
+        
+    def get_stats(self):
+        """Return journal size and replay lag"""
+        with self.lock:
+            lag_seconds = 0.0
+            if self.oldest_spilled_ns is not None:
+                lag_seconds = (time.time_ns() - self.oldest_spilled_ns) / 1e9
+            return {
+                'memory_items': self.memory.qsize(),
+                'journal_records': self.journal_records,
+                'journal_bytes': self.journal_bytes,
+                'journal_segments': len(self.segments),
+                'lag_seconds': lag_seconds,
+                'spilled': self.stats['spilled'],
+                'replayed': self.stats['replayed']
+            }
+            
+    def close(self):
+        """Flush and close journal files (unreplayed segments stay on disk)"""
+        with self.lock:
+            if self.write_file:
+                self.write_file.close()
+                self.write_file = None
+            if self.read_file:
+                self.read_file.close()
+                self.read_file = None
+                
+    def _segment_path(self, number):
+        """Path of a journal segment"""
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{number:010d}{SEGMENT_SUFFIX}")
+        
+    def _append(self, item):
+        """Append one item to the tail segment (lock held)"""
+        if self.write_file is None or self.write_file.tell() >= self.segment_size:
+            self._roll_segment()
+            
+        payload = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time_ns()
+        self.write_file.write(RECORD_HEADER.pack(len(payload), now))
+        self.write_file.write(payload)
+        
+        if self.journal_records == 0:
+            self.oldest_spilled_ns = now
+            self.logger.warning("Parser queue full, spilling to disk journal")
+            
+        self.journal_records += 1
+        self.journal_bytes += RECORD_HEADER.size + len(payload)
+        self.stats['spilled'] += 1
+        
+    def _roll_segment(self):
+        """Start a new tail segment (lock held)"""
+        if self.write_file:
+            self.write_file.close()
+        path = self._segment_path(self.next_segment)
+        self.next_segment += 1
+        self.write_file = open(path, 'ab')
+        self.segments.append(path)
+        
+    def _refill(self):
+        """Move journaled items back into the memory queue while it has room"""
+        with self.lock:
+            moved = 0
+            while self.journal_records and moved < self.replay_batch and not self.memory.full():
+                item = self._read_record()
+                if item is None:
+                    break
+                self.memory.put_nowait(item)
+                moved += 1
+                
+            self.stats['replayed'] += moved
+            if moved and self.journal_records == 0:
+                self._reset_journal()
+                self.logger.info("Disk journal fully replayed")
+                
+    def _read_record(self):
+        """Read the next record from the head segment (lock held)"""
+        while self.segments:
+            head = self.segments[0]
+            if self.read_file is None:
+                self.read_file = open(head, 'rb')
+                
+            # Make buffered writes to the same segment visible to the reader
+            if self.write_file and len(self.segments) == 1:
+                self.write_file.flush()
+                
+            header = self.read_file.read(RECORD_HEADER.size)
+            if len(header) == RECORD_HEADER.size:
+                length, spilled_ns = RECORD_HEADER.unpack(header)
+                payload = self.read_file.read(length)
+                self.journal_records -= 1
+                self.journal_bytes -= RECORD_HEADER.size + length
+                self.oldest_spilled_ns = spilled_ns
+                return pickle.loads(payload)
+                
+            if len(self.segments) == 1:
+                # Caught up with the writer
+                return None
+                
+            # Head segment exhausted; delete it and move on
+            self.read_file.close()
+            self.read_file = None
+            os.remove(self.segments.popleft())
+            
+        return None
+        
+    def _reset_journal(self):
+        """Delete all segments once everything has been replayed (lock held)"""
+        if self.read_file:
+            self.read_file.close()
+            self.read_file = None
+        if self.write_file:
+            self.write_file.close()
+            self.write_file = None
+        while self.segments:
+            os.remove(self.segments.popleft())
+        self.journal_bytes = 0
+        self.oldest_spilled_ns = None
+        
+    def _recover(self):
+        """Pick up segments left behind by a previous run"""
+        names = sorted(
+            name for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        
+        for name in names:
+            path = os.path.join(self.directory, name)
+            self.segments.append(path)
+            self.next_segment = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1
+            
+            size = os.path.getsize(path)
+            offset = 0
+            with open(path, 'rb') as f:
+                while True:
+                    header = f.read(RECORD_HEADER.size)
+                    if len(header) < RECORD_HEADER.size:
+                        break
+                    length, _ = RECORD_HEADER.unpack(header)
+                    if offset + RECORD_HEADER.size + length > size:
+                        break
+                    f.seek(length, os.SEEK_CUR)
+                    offset += RECORD_HEADER.size + length
+                    self.journal_records += 1
+                    self.journal_bytes += RECORD_HEADER.size + length
+                    
+            # Drop a record torn by a crash mid-write
+            if offset < size:
+                self.logger.warning(f"Truncating partial record at end of {path}")
+                os.truncate(path, offset)
+                
+        if self.journal_records:
+            self.logger.info(f"Recovered {self.journal_records} journaled items from {self.directory}")
+            # New items must queue behind the recovered ones
+            self._roll_segment()
+            
+def create_spill_queue(config, maxsize=10000):
+    """Factory function to create a spill queue"""
+    return SpillQueue(config, maxsize)
\ No newline at end of file
@@ -4,15 +4,18 @@ Receives syslog messages via UDP and forwards them to the processor
 """
 
 import socket
+import select
 import threading
 import queue
 import json
-from datetime import datetime
+import time
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.logger import setup_logger
+from utils.log_event import RawEvent
+from collectors.rate_limiter import create_rate_limiter
 
 class SyslogCollector:
     """Collects syslog messages from network devices"""
@@ -31,6 +34,17 @@ class SyslogCollector:
         self.running = False
         self.socket = None
         
+        # Ingestion counters (datagrams read off the socket vs. handed to the parser)
+        self.stats = {
+            'datagrams_received': 0,
+            'datagrams_enqueued': 0,
+            'messages_enqueued': 0,
+            'batches_enqueued': 0
+        }
+        
+        # Optional per-source token buckets
+        self.rate_limiter = create_rate_limiter(config)
+        
     def start(self):
         """Start the syslog collector"""
         try:
@@ -38,6 +52,11 @@ class SyslogCollector:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             
+            # Let several worker processes bind the same port; the kernel
+            # load-balances datagrams between them by source address
+            if self.config['syslog'].get('reuse_port', False):
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            
             # Bind to configured address and port
             bind_address = (
                 self.config['syslog']['host'],
@@ -49,7 +68,11 @@ class SyslogCollector:
             self.logger.info(f"Syslog collector started on {bind_address[0]}:{bind_address[1]}")
             
             # Start collection loop
-            self._collect_messages()
+            if self.config['syslog'].get('batch_mode', False):
+                self.socket.setblocking(False)
+                self._collect_batches()
+            else:
+                self._collect_messages()
             
         except Exception as e:
             self.logger.error(f"Failed to start syslog collector: {e}")
@@ -62,6 +85,43 @@ class SyslogCollector:
             self.socket.close()
         self.logger.info("Syslog collector stopped")
         
+    def get_stats(self):
+        """Return a snapshot of the ingestion counters"""
+        stats = dict(self.stats)
+        if self.rate_limiter:
+            stats.update(self.rate_limiter.get_stats())
+        return stats
+        
+    def _build_messages(self, data, addr, split_lines=True):
+        """
+        Split a datagram into message dictionaries
+        
+        Args:
+            data: Raw datagram bytes
+            addr: (host, port) tuple of the sender
+            split_lines: Treat every line as a separate message
+            
+        Returns:
+            List of RawEvents, one per non-empty line. The raw message
+            stays undecoded bytes and received_at is integer nanoseconds
+            since the epoch; the parser decodes on demand.
+        """
+        received_at = time.time_ns()
+        source_ip = sys.intern(addr[0])
+        
+        lines = data.splitlines() if split_lines else [data.rstrip(b'\r\n')]
+        
+        messages = []
+        for line in lines:
+            if line.strip():
+                messages.append(RawEvent(line, source_ip, addr[1], received_at, 'syslog'))
+                
+        # Excess messages from chatty sources are counted, not queued
+        if self.rate_limiter and messages:
+            messages = self.rate_limiter.filter(source_ip, messages)
+            
+        return messages
+        
     def _collect_messages(self):
         """Main collection loop"""
         buffer_size = self.config['syslog']['buffer_size']
@@ -70,36 +130,23 @@ class SyslogCollector:
             try:
                 # Receive data
                 data, addr = self.socket.recvfrom(buffer_size)
+                self.stats['datagrams_received'] += 1
                 
                 if not data:
                     continue
                     
-                # Decode and process message
-                try:
-                    decoded_data = data.decode(
-                        self.config['syslog'].get('encoding', 'utf-8'),
-                        errors='ignore'
-                    )
-                    
-                    # Split multiple messages if present
-                    for line in decoded_data.splitlines():
-                        if line.strip():
-                            # Create message object
-                            message = {
-                                'raw_message': line,
-                                'source_ip': addr[0],
-                                'source_port': addr[1],
-                                'received_at': datetime.utcnow().isoformat(),
-                                'collector_type': 'syslog'
-                            }
-                            
-                            # Send to processor via queue
-                            self.message_queue.put(message)
-                            self.logger.debug(f"Received message from {addr[0]}:{addr[1]}")
-                            
-                except UnicodeDecodeError as e:
-                    self.logger.warning(f"Failed to decode message from {addr}: {e}")
-                    
+                # Split into raw events; the parser decodes them
+                messages = self._build_messages(data, addr)
+                
+                for message in messages:
+                    # Send to processor via queue
+                    self.message_queue.put(message)
+                    self.logger.debug(f"Received message from {addr[0]}:{addr[1]}")
+                
+                if messages:
+                    self.stats['datagrams_enqueued'] += 1
+                    self.stats['messages_enqueued'] += len(messages)
+                
             except socket.timeout:
                 # Timeout is normal, just continue
                 continue
@@ -108,6 +155,64 @@ class SyslogCollector:
                 if self.running:
                     self.logger.error(f"Error in collection loop: {e}")
                     
+    def _collect_batches(self):
+        """
+        Batched collection loop
+        
+        Waits for the socket to become readable, then drains every datagram
+        already queued in the kernel (up to max_batch_size) and hands the
+        resulting messages to the parser as a single list.
+        """
+        buffer_size = self.config['syslog']['buffer_size']
+        max_batch_size = self.config['syslog'].get('max_batch_size', 1024)
+        
+        while self.running:
+            try:
+                # Sleep until at least one datagram is waiting
+                readable, _, _ = select.select([self.socket], [], [], 1.0)
+                if not readable:
+                    continue
+                    
+                batch = []
+                datagrams = 0
+                enqueued = 0
+                
+                # Drain the socket without blocking
+                while datagrams < max_batch_size:
+                    try:
+                        data, addr = self.socket.recvfrom(buffer_size)
+                    except (BlockingIOError, InterruptedError):
+                        break
+                    except ConnectionResetError:
+                        # Windows reports ICMP port unreachable on UDP sockets
+                        continue
+                        
+                    datagrams += 1
+                    if not data:
+                        continue
+                        
+                    messages = self._build_messages(data, addr)
+                    if messages:
+                        batch.extend(messages)
+                        enqueued += 1
+                        
+                self.stats['datagrams_received'] += datagrams
+                
+                if batch:
+                    # One put per wakeup instead of one per message
+                    self.message_queue.put(batch)
+                    self.stats['datagrams_enqueued'] += enqueued
+                    self.stats['messages_enqueued'] += len(batch)
+                    self.stats['batches_enqueued'] += 1
+                    self.logger.debug(f"Received batch of {len(batch)} messages from {datagrams} datagrams")
+                    
+            except Exception as e:
+                if self.running:
+                    self.logger.error(f"Error in collection loop: {e}")
+                    
 def create_collector(config, message_queue):
     """Factory function to create a syslog collector"""
+    if config['syslog'].get('mode', 'udp') == 'asyncio':
+        from collectors.async_collector import AsyncSyslogCollector
+        return AsyncSyslogCollector(config, message_queue)
     return SyslogCollector(config, message_queue) 
\ No newline at end of file
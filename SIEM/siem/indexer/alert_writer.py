@@ -0,0 +1,186 @@
+"""
+Alert Writer Module
+Saves rule engine alerts in batches on a writer thread, one commit per batch
+"""
+
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger
+from indexer.models import Alert
+
+# alert_data keys written to the alerts table; every row of a batch has all of them
+ALERT_COLUMNS = ('rule_id', 'rule_name', 'severity', 'description', 'log_entry_id', 'source_ip', 'destination_ip')
+
+class AlertWriter:
+    """
+    Group-commit writer for alerts
+    
+    Submitted alerts wait in a queue, each with a Future for its id. The
+    writer takes everything waiting (up to max_batch), inserts it with one
+    INSERT ... RETURNING and commits once, so alerts raised while a commit
+    is running share the next one. An idle writer commits a lone alert
+    straight away.
+    """
+    
+    def __init__(self, config, engine):
+        """
+        Initialize the alert writer
+        
+        Args:
+            config: alert_writer configuration dictionary
+            engine: Engine of the main database
+        """
+        self.engine = engine
+        self.max_batch = config.get('max_batch', 1000)
+        self.save_timeout = config.get('save_timeout', 30)
+        self.queue_timeout = config.get('queue_timeout', 1.0)
+        self.queue = queue.Queue(maxsize=config.get('max_queue', 10000))
+        self.logger = setup_logger(__name__)
+        self.running = False
+        self.worker_thread = None
+        
+        # Guards running; never held while waiting on the queue
+        self.lock = threading.Lock()
+        
+        # RETURNING gives each row's id in parameter order
+        alerts = Alert.__table__
+        self.insert_alerts = alerts.insert().returning(alerts.c.id, sort_by_parameter_order=True)
+        
+        self.stats = {
+            'alerts_written': 0,
+            'batches': 0,
+            'errors': 0
+        }
+        
+    def start(self):
+        """Start the writer thread"""
+        self.running = True
+        self.worker_thread = threading.Thread(target=self._write_alerts)
+        self.worker_thread.daemon = True
+        self.worker_thread.start()
+        
+    def stop(self):
+        """Stop the writer once the queued alerts are saved"""
+        with self.lock:
+            self.running = False
+        if self.worker_thread:
+            self.worker_thread.join(timeout=5)
+            
+    def submit(self, alert_data):
+        """
+        Queue an alert for the next batch
+        
+        Waits up to queue_timeout seconds while max_queue alerts are already
+        waiting, then writes the alert itself. Before start() (or after
+        stop()) the alert is written immediately.
+        
+        Args:
+            alert_data: Alert dictionary (see ALERT_COLUMNS)
+            
+        Returns:
+            Future resolving to the alert id, or None if it could not be saved
+        """
+        row = {column: alert_data.get(column) for column in ALERT_COLUMNS}
+        row['created_at'] = datetime.utcnow()
+        future = Future()
+        with self.lock:
+            running = self.running
+        if running:
+            try:
+                self.queue.put((row, future), timeout=self.queue_timeout)
+            except queue.Full:
+                self._write_batch([(row, future)])
+                return future
+            if not self.running:
+                # stop() came between the check and the put, and the writer
+                # may have drained the queue already: save what is left
+                self._flush_queued()
+            return future
+        self._write_batch([(row, future)])
+        return future
+        
+    def save(self, alert_data):
+        """
+        Queue an alert and wait for it to be written
+        
+        Args:
+            alert_data: Alert dictionary (see ALERT_COLUMNS)
+            
+        Returns:
+            Alert id, or None if it could not be saved within save_timeout seconds
+        """
+        try:
+            return self.submit(alert_data).result(timeout=self.save_timeout)
+        except FutureTimeout:
+            self.logger.error(f"Alert not saved within {self.save_timeout}s: {alert_data.get('rule_name')}")
+            return None
+            
+    def _write_alerts(self):
+        """Main writer loop"""
+        while self.running:
+            try:
+                batch = [self.queue.get(timeout=1)]
+            except queue.Empty:
+                continue
+            self._drain(batch)
+            self._write_batch(batch)
+            
+        # Save what was queued before stop()
+        self._flush_queued()
+        
+    def _flush_queued(self):
+        """Write every queued alert"""
+        while True:
+            batch = []
+            self._drain(batch)
+            if not batch:
+                break
+            self._write_batch(batch)
+            
+    def _drain(self, batch):
+        """Add already queued alerts to the batch without waiting"""
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+                
+    def _write_batch(self, batch):
+        """Insert a batch in one transaction and resolve its futures"""
+        try:
+            with self.engine.begin() as conn:
+                ids = conn.execute(self.insert_alerts, [row for row, _ in batch]).scalars().all()
+            self.stats['alerts_written'] += len(batch)
+            self.stats['batches'] += 1
+            self.logger.debug(f"Saved batch of {len(batch)} alerts")
+        except Exception as e:
+            # Retry one by one, so one bad alert does not lose the whole batch
+            if len(batch) > 1:
+                for item in batch:
+                    self._write_batch([item])
+                return
+            self.logger.error(f"Error saving alert: {e}")
+            self.stats['errors'] += 1
+            ids = [None]
+            
+        for (_, future), alert_id in zip(batch, ids):
+            future.set_result(alert_id)
+            
+    def get_stats(self):
+        """Return writer statistics"""
+        stats = dict(self.stats)
+        stats['queued'] = self.queue.qsize()
+        return stats
+        
+def create_alert_writer(config, engine):
+    """Factory function to create the alert writer (None when disabled)"""
+    writer_config = config['database'].get('alert_writer', {})
+    if not writer_config.get('enabled', False):
+        return None
+    return AlertWriter(writer_config, engine)
\ No newline at end of file
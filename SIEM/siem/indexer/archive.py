@@ -0,0 +1,326 @@
+"""
+Log Archive Module
+Compressed append-only block files for logs past the hot window, with a time index
+"""
+
+import json
+import lzma
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import select, Table, Column, Integer, MetaData
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger
+from indexer.models import LogEntry
+
+EPOCH = datetime(1970, 1, 1)
+
+# Sidecar index record: block file, offset, compressed length, event count,
+# min/max received_at (us since the epoch), min/max log entry id, codec
+INDEX_RECORD = struct.Struct('>IQIIqqqqB')
+BlockRecord = namedtuple('BlockRecord', 'file offset length count min_time max_time min_id max_id codec')
+
+INDEX_FILE = 'index.dat'
+BLOCK_PREFIX = 'blocks-'
+BLOCK_SUFFIX = '.dat'
+
+# codec name -> (index code, compress, decompress)
+CODECS = {
+    'zlib': (1, zlib.compress, zlib.decompress),
+    'lzma': (2, lzma.compress, lzma.decompress)
+}
+DECOMPRESS = {code: decompress for code, _, decompress in CODECS.values()}
+
+# Columns parsed back from JSON text, as LogEntry.to_dict() does
+JSON_COLUMNS = ('template_params', 'fields')
+
+# Ids archived by one archive_from call, for deleting exactly those rows
+ARCHIVED_IDS = Table('archived_ids', MetaData(), Column('id', Integer, primary_key=True), prefixes=['TEMPORARY'])
+
+def to_micros(value):
+    """Microseconds since the epoch of a naive UTC datetime"""
+    return (value - EPOCH) // timedelta(microseconds=1)
+    
+def to_iso(value):
+    """Fixed-width ISO string, so archived timestamps compare as strings"""
+    return value.isoformat(timespec='microseconds') if value is not None else None
+    
+class LogArchive:
+    """
+    Cold storage for log entries
+    
+    Rows are written oldest first in blocks of block_events, each a
+    compressed JSON document of column names and row values. The sidecar
+    index is small enough to keep in memory, so a query only decompresses
+    the blocks whose received_at range it overlaps. Blocks are appended
+    before their index record, so a crash can leave unindexed bytes at the
+    end of a block file but never an index record without its block.
+    """
+    
+    def __init__(self, config):
+        """
+        Initialize the archive
+        
+        Args:
+            config: archive configuration dictionary
+        """
+        self.directory = config.get('directory', 'archive')
+        self.block_events = config.get('block_events', 4096)
+        self.file_size = config.get('file_size', 256 * 1024 * 1024)
+        self.hot_window = timedelta(days=config.get('hot_days', 30))
+        self.check_interval = config.get('check_interval', 300)
+        self.codec = config.get('codec', 'zlib')
+        if self.codec not in CODECS:
+            raise ValueError(f"Unknown archive codec {self.codec!r}, expected one of {sorted(CODECS)}")
+        self.logger = setup_logger(__name__)
+        
+        self.lock = threading.Lock()
+        self.records = []
+        self.write_file = None
+        self.write_number = 0
+        
+        # Recently decompressed blocks, for paging through the same range
+        self.cache = OrderedDict()
+        self.cache_size = config.get('cache_blocks', 8)
+        
+        self.stats = {
+            'blocks_written': 0,
+            'events_archived': 0,
+            'blocks_read': 0
+        }
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self._load_index()
+        
+    def _load_index(self):
+        """Read the sidecar index, ignoring a partially written last record"""
+        path = os.path.join(self.directory, INDEX_FILE)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            usable = len(data) - len(data) % INDEX_RECORD.size
+            self.records = [BlockRecord(*fields) for fields in INDEX_RECORD.iter_unpack(data[:usable])]
+            
+        if self.records:
+            self.write_number = max(record.file for record in self.records)
+        self.logger.info(f"Archive at {self.directory}: {len(self.records)} blocks")
+        
+    def _block_path(self, number):
+        """Path of a block file"""
+        return os.path.join(self.directory, f"{BLOCK_PREFIX}{number:010d}{BLOCK_SUFFIX}")
+        
+    def archived_through(self, low, high):
+        """Highest archived log entry id in [low, high), or low - 1 if none"""
+        with self.lock:
+            return max((record.max_id for record in self.records if low <= record.min_id < high), default=low - 1)
+            
+    def newest_time(self):
+        """Latest archived received_at as a naive UTC datetime, or None"""
+        with self.lock:
+            if not self.records:
+                return None
+            return EPOCH + timedelta(microseconds=max(record.max_time for record in self.records))
+            
+    def archive_from(self, conn, condition=None, id_range=(0, 1 << 32), id_table=None):
+        """
+        Copy log_entries rows into the archive, oldest id first
+        
+        Without a condition every row in id_range is archived, so rows up to
+        the highest id already archived there are skipped and running this
+        again after a crash does not duplicate them. With a condition that
+        watermark does not hold (ids and received_at need not be in the
+        same order), so all matching rows are archived and the caller must
+        delete exactly the ones listed in id_table, in the same transaction
+        (a crash before it commits archives those rows again).
+        
+        Args:
+            conn: Connection to a database holding log_entries
+            condition: Optional extra WHERE clause
+            id_range: (low, high) ids of the database being archived
+            id_table: Optional table (such as ARCHIVED_IDS) that receives
+                the id of every archived row
+                
+        Returns:
+            (rows archived, highest id archived or None)
+        """
+        table = LogEntry.__table__
+        low, high = id_range
+        query = select(table).where(table.c.id < high)
+        if condition is None:
+            query = query.where(table.c.id > self.archived_through(low, high))
+        else:
+            query = query.where(table.c.id >= low, condition)
+            
+        result = conn.execute(query.order_by(table.c.id))
+        columns = list(result.keys())
+        archived = 0
+        max_id = None
+        while True:
+            rows = result.fetchmany(self.block_events)
+            if not rows:
+                break
+            self.write_block(columns, rows)
+            if id_table is not None:
+                conn.execute(id_table.insert(), [{'id': row.id} for row in rows])
+            archived += len(rows)
+            max_id = rows[-1].id
+        return archived, max_id
+        
+    def write_block(self, columns, rows):
+        """
+        Append one block and its index record
+        
+        Args:
+            columns: Column names
+            rows: Row tuples in columns order (datetimes are stored as ISO strings)
+        """
+        id_index = columns.index('id')
+        received_index = columns.index('received_at')
+        received = [row[received_index] for row in rows if row[received_index] is not None]
+        values = [[to_iso(value) if isinstance(value, datetime) else value for value in row] for row in rows]
+        
+        code, compress, _ = CODECS[self.codec]
+        payload = compress(json.dumps({'columns': columns, 'rows': values}, separators=(',', ':')).encode())
+        
+        with self.lock:
+            if self.write_file is None or self.write_file.tell() >= self.file_size:
+                if self.write_file is not None:
+                    self.write_file.close()
+                self.write_number += 1
+                self.write_file = open(self._block_path(self.write_number), 'ab')
+                
+            offset = self.write_file.tell()
+            self.write_file.write(payload)
+            self.write_file.flush()
+            os.fsync(self.write_file.fileno())
+            
+            record = BlockRecord(
+                self.write_number, offset, len(payload), len(rows),
+                to_micros(min(received)) if received else 0,
+                to_micros(max(received)) if received else 0,
+                rows[0][id_index], rows[-1][id_index], code
+            )
+            with open(os.path.join(self.directory, INDEX_FILE), 'ab') as index:
+                index.write(INDEX_RECORD.pack(*record))
+                index.flush()
+                os.fsync(index.fileno())
+            self.records.append(record)
+            
+        self.stats['blocks_written'] += 1
+        self.stats['events_archived'] += len(rows)
+        
+    def read_block(self, record):
+        """
+        Rows of a block as dicts of stored values, oldest first
+        
+        Args:
+            record: BlockRecord from the index
+        """
+        key = (record.file, record.offset)
+        with self.lock:
+            rows = self.cache.get(key)
+            if rows is not None:
+                self.cache.move_to_end(key)
+                return rows
+                
+        with open(self._block_path(record.file), 'rb') as f:
+            f.seek(record.offset)
+            block = json.loads(DECOMPRESS[record.codec](f.read(record.length)))
+        columns = block['columns']
+        rows = [dict(zip(columns, values)) for values in block['rows']]
+        
+        with self.lock:
+            self.cache[key] = rows
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        self.stats['blocks_read'] += 1
+        return rows
+        
+    def query(self, start=None, end=None, match=None, offset=0, limit=100):
+        """
+        Page through archived rows, newest block first
+        
+        Args:
+            start: Optional naive UTC datetime, inclusive
+            end: Optional naive UTC datetime, inclusive
+            match: Optional predicate on a stored row dict (ISO timestamps,
+                JSON columns still as text)
+            offset: Matching rows to skip
+            limit: Maximum rows to return
+            
+        Returns:
+            (matching row count, list of row dicts in LogEntry.to_dict() form)
+        """
+        start_us = to_micros(start) if start else None
+        end_us = to_micros(end) if end else None
+        start_iso = to_iso(start) if start else None
+        end_iso = to_iso(end) if end else None
+        
+        with self.lock:
+            records = [
+                record for record in self.records
+                if (start_us is None or record.max_time >= start_us) and (end_us is None or record.min_time <= end_us)
+            ]
+        records.sort(key=lambda record: (record.max_time, record.max_id), reverse=True)
+        
+        total = 0
+        page = []
+        for record in records:
+            inside = (start_us is None or record.min_time >= start_us) and (end_us is None or record.max_time <= end_us)
+            # Whole blocks outside the page are counted from the index alone
+            if inside and match is None and (total + record.count <= offset or len(page) >= limit):
+                total += record.count
+                continue
+                
+            for row in reversed(self.read_block(record)):
+                received_at = row['received_at']
+                if start_iso and (received_at is None or received_at < start_iso):
+                    continue
+                if end_iso and (received_at is None or received_at > end_iso):
+                    continue
+                if match is not None and not match(row):
+                    continue
+                if offset <= total < offset + limit:
+                    page.append(self._to_dict(row))
+                total += 1
+        return total, page
+        
+    def _to_dict(self, row):
+        """Stored row -> LogEntry.to_dict() form"""
+        result = dict(row)
+        for column in JSON_COLUMNS:
+            if result.get(column):
+                result[column] = json.loads(result[column])
+        for column in ('event_time', 'received_at', 'parsed_at', 'indexed_at'):
+            if result.get(column):
+                result[column] = datetime.fromisoformat(result[column]).isoformat()
+        result['archived'] = True
+        return result
+        
+    def get_stats(self):
+        """Return archive statistics"""
+        stats = dict(self.stats)
+        with self.lock:
+            stats['blocks'] = len(self.records)
+            stats['events'] = sum(record.count for record in self.records)
+            stats['bytes'] = sum(record.length for record in self.records)
+        return stats
+        
+    def close(self):
+        """Close the open block file"""
+        with self.lock:
+            if self.write_file is not None:
+                self.write_file.close()
+                self.write_file = None
+                
+def create_log_archive(config):
+    """Factory function to create the log archive (None when disabled)"""
+    archive_config = config['database'].get('archive', {})
+    if not archive_config.get('enabled', False):
+        return None
+    return LogArchive(archive_config)
\ No newline at end of file
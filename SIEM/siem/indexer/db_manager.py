@@ -5,14 +5,22 @@ Handles indexing of parsed logs into the database
 
 import threading
 import queue
-from datetime import datetime
-from contextlib import contextmanager
+import time
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.logger import setup_logger
-from indexer.models import init_database, get_session, LogEntry, Alert
+from indexer.sqlite_backend import create_sqlite_backend
+from indexer.memory_backend import create_memory_backend
+from indexer.segment_backend import create_segment_backend
+
+# Storage backends by database.type
+STORAGE_BACKENDS = {
+    'sqlite': create_sqlite_backend,
+    'memory': create_memory_backend,
+    'segment': create_segment_backend
+}
 
 class DatabaseManager:
     """Manages database operations for log indexing"""
@@ -33,30 +41,32 @@ class DatabaseManager:
         self.running = False
         self.worker_thread = None
         
-        # Initialize database
-        db_path = config['database']['path']
-        self.engine = init_database(db_path)
-        self.logger.info(f"Database initialized at {db_path}")
+        # Where logs, templates and alerts are kept (see indexer/storage.py)
+        backend = config['database'].get('type', 'sqlite')
+        if backend not in STORAGE_BACKENDS:
+            raise ValueError(f"Unknown database type '{backend}' (expected one of {', '.join(STORAGE_BACKENDS)})")
+        self.storage = STORAGE_BACKENDS[backend](config)
+        
+        # Batches grow and shrink between min_size and max_size with the load
+        batch_config = config['database'].get('batch', {})
+        self.min_batch_size = batch_config.get('min_size', 1)
+        self.max_batch_size = batch_config.get('max_size', 2000)
+        self.flush_interval = batch_config.get('flush_interval', 0.5)
+        self.batch_size = self.min_batch_size
+        self.last_flush = 0.0
+        self.stats = {
+            'rows_indexed': 0,
+            'batches': 0
+        }
         
-    @contextmanager
-    def get_db_session(self):
-        """Context manager for database sessions"""
-        session = get_session(self.engine)
-        try:
-            yield session
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
-            
     def start(self):
         """Start the indexer worker thread"""
         self.running = True
         self.worker_thread = threading.Thread(target=self._index_messages)
         self.worker_thread.daemon = True
         self.worker_thread.start()
+        
+        self.storage.start()
         self.logger.info("Database indexer started")
         
     def stop(self):
@@ -64,119 +74,119 @@ class DatabaseManager:
         self.running = False
         if self.worker_thread:
             self.worker_thread.join(timeout=5)
+        self.storage.stop()
         self.logger.info("Database indexer stopped")
         
     def _index_messages(self):
-        """Main indexing loop"""
+        """
+        Main indexing loop
+        
+        Whatever is waiting in the queue is taken at once, up to the current
+        batch size. A partial batch is held for more rows for as long as the
+        previous flush took (at most flush_interval), so an idle indexer
+        writes almost immediately and a busy one writes fewer, larger batches.
+        """
         batch = []
-        batch_size = 10  # Process in batches for efficiency
+        deadline = None
         
         while self.running:
             try:
-                # Get message from queue with timeout
-                message = self.input_queue.get(timeout=1)
-                batch.append(message)
-                
-                # Process batch if it's full
-                if len(batch) >= batch_size:
-                    self._process_batch(batch)
-                    batch = []
+                timeout = 1 if deadline is None else deadline - time.monotonic()
+                if timeout > 0:
+                    self._add_to_batch(batch, self.input_queue.get(timeout=timeout))
+                    
+                # Drain what is already queued without waiting
+                while len(batch) < self.batch_size:
+                    self._add_to_batch(batch, self.input_queue.get_nowait())
                     
             except queue.Empty:
-                # Process any remaining messages in batch
-                if batch:
-                    self._process_batch(batch)
-                    batch = []
-                continue
+                pass
                 
             except Exception as e:
                 self.logger.error(f"Error in indexing loop: {e}")
                 
+            if not batch:
+                deadline = None
+                continue
+                
+            if deadline is None:
+                deadline = time.monotonic() + min(self.last_flush, self.flush_interval)
+                
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = None
+                
+        # Index what was collected before stop()
+        if batch:
+            self._flush(batch)
+            
+    def _add_to_batch(self, batch, message):
+        """Add a queued item to the batch"""
+        # The parser forwards whole batches when the collector is batched
+        if isinstance(message, list):
+            batch.extend(message)
+        else:
+            batch.append(message)
+            
+    def _flush(self, batch):
+        """Index a batch and adapt the batch size to how full it was"""
+        start = time.monotonic()
+        self._process_batch(batch)
+        self.last_flush = time.monotonic() - start
+        
+        if len(batch) >= self.batch_size:
+            self.batch_size = min(self.batch_size * 2, self.max_batch_size)
+        elif len(batch) * 2 < self.batch_size:
+            self.batch_size = max(self.batch_size // 2, self.min_batch_size)
+            
     def _process_batch(self, messages):
-        """Process a batch of messages"""
+        """
+        Insert a batch of parsed messages
+        
+        Args:
+            messages: List of parsed LogEvents; each gets the id of its own
+                row as db_id before it is sent to the rule engine
+        """
         try:
-            with self.get_db_session() as session:
+            self.storage.append_logs(messages)
+            
+            self.stats['rows_indexed'] += len(messages)
+            self.stats['batches'] += 1
+            
+            # Send to rule engine if configured
+            if self.alert_queue:
                 for message in messages:
-                    # Create log entry
-                    log_entry = self._create_log_entry(message)
-                    session.add(log_entry)
+                    self.alert_queue.put(message)
                     
-                # Commit the batch
-                session.commit()
-                
-                # Send to rule engine if configured
-                if self.alert_queue:
-                    for message in messages:
-                        # Add database ID to message
-                        message['db_id'] = log_entry.id
-                        self.alert_queue.put(message)
-                        
-                self.logger.debug(f"Indexed batch of {len(messages)} messages")
-                
+            self.logger.debug(f"Indexed batch of {len(messages)} messages")
+            
         except Exception as e:
             self.logger.error(f"Error processing batch: {e}")
             
-    def _create_log_entry(self, message):
-        """Create a LogEntry object from parsed message"""
-        # Parse timestamps
-        parsed_at = None
-        if 'parsed_at' in message:
-            try:
-                parsed_at = datetime.fromisoformat(message['parsed_at'])
-            except:
-                pass
-                
-        received_at = None
-        if 'received_at' in message:
-            try:
-                received_at = datetime.fromisoformat(message['received_at'])
-            except:
-                pass
+    def get_stats(self):
+        """Return indexing statistics"""
+        stats = dict(self.stats)
+        stats['batch_size'] = self.batch_size
+        stats.update(self.storage.get_stats())
+        return stats
         
-        # Create log entry
-        log_entry = LogEntry(
-            raw_message=message.get('raw_message', ''),
-            message=message.get('message', ''),
-            source_ip=message.get('source_ip'),
-            source_port=message.get('source_port'),
-            hostname=message.get('hostname'),
-            priority=message.get('priority'),
-            facility=message.get('facility'),
-            severity=message.get('severity'),
-            severity_name=message.get('severity_name'),
-            process=message.get('process'),
-            pid=message.get('pid'),
-            appname=message.get('appname'),
-            timestamp=message.get('timestamp'),
-            received_at=received_at,
-            parsed_at=parsed_at,
-            pattern_matched=message.get('pattern_matched')
-        )
+    def submit_alert(self, alert_data):
+        """
+        Save an alert without waiting for it to be written
         
-        return log_entry
+        Args:
+            alert_data: Alert dictionary
+            
+        Returns:
+            Future resolving to the alert id (None if it could not be saved)
+        """
+        return self.storage.submit_alert(alert_data)
         
     def save_alert(self, alert_data):
-        """Save an alert to the database"""
-        try:
-            with self.get_db_session() as session:
-                alert = Alert(
-                    rule_id=alert_data['rule_id'],
-                    rule_name=alert_data['rule_name'],
-                    severity=alert_data['severity'],
-                    description=alert_data['description'],
-                    log_entry_id=alert_data.get('log_entry_id'),
-                    source_ip=alert_data.get('source_ip'),
-                    destination_ip=alert_data.get('destination_ip')
-                )
-                session.add(alert)
-                session.commit()
-                self.logger.info(f"Alert saved: {alert_data['rule_name']}")
-                return alert.id
-                
-        except Exception as e:
-            self.logger.error(f"Error saving alert: {e}")
-            return None
-            
+        """Save an alert and return its id"""
+        return self.storage.save_alert(alert_data)
+        
 def create_db_manager(config, input_queue, alert_queue=None):
     """Factory function to create a database manager"""
     return DatabaseManager(config, input_queue, alert_queue) 
\ No newline at end of file
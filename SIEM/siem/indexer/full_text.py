@@ -0,0 +1,77 @@
+"""
+Full-Text Module
+SQLite FTS5 index over log messages for /api/search
+"""
+
+import re
+from sqlalchemy import text, Column, Float, Integer, MetaData, Table, Text
+
+# External-content FTS5 table: the text stays in log_entries and only the
+# index is stored. raw_message contains message, so one column covers both.
+LOG_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS log_fts "
+    "USING fts5(raw_message, content='log_entries', content_rowid='id')"
+)
+
+# Core handle for inserts and queries; not part of Base.metadata, so
+# create_all never tries to create it as a plain table
+LogFTS = Table(
+    'log_fts', MetaData(),
+    Column('rowid', Integer, primary_key=True),
+    Column('raw_message', Text),
+    Column('rank', Float)  # bm25, lower is better
+)
+
+# A double-quoted phrase, or a bare word (optionally ending in * for a prefix)
+QUERY_TERM = re.compile(r'"([^"]*)"?|(\S+)')
+
+def init_full_text(engine):
+    """
+    Create the log_fts index, building it from existing rows the first time
+    
+    Returns:
+        True if the index was created
+    """
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'log_fts'")).first():
+            return False
+        conn.execute(text(LOG_FTS_DDL))
+        conn.execute(text("INSERT INTO log_fts (log_fts) VALUES ('rebuild')"))
+        return True
+        
+def build_match_query(query):
+    """
+    Translate a search box query into an FTS5 MATCH expression
+    
+    'failed "invalid user" adm*' becomes '"failed" "invalid user" "adm"*':
+    every term must match, quoted phrases match consecutive tokens and a
+    trailing * matches a prefix. Terms are always quoted, so FTS5 operators
+    and punctuation in the input are searched for rather than parsed.
+    
+    Args:
+        query: User query string
+        
+    Returns:
+        MATCH expression, or '' if the query has no terms
+    """
+    terms = []
+    for phrase, word in QUERY_TERM.findall(query):
+        prefix = False
+        if not phrase:
+            prefix = word.endswith('*')
+            phrase = word.rstrip('*')
+        if phrase.strip():
+            terms.append('"' + phrase.replace('"', '""') + '"' + ('*' if prefix else ''))
+    return ' '.join(terms)
+    
+def delete_from_full_text(conn, condition, params):
+    """
+    Remove log_entries rows matching a WHERE clause from log_fts
+    
+    External-content tables need the indexed text to delete an entry, so
+    this must run before the rows themselves are deleted.
+    """
+    conn.execute(text(
+        "INSERT INTO log_fts (log_fts, rowid, raw_message) "
+        f"SELECT 'delete', id, raw_message FROM log_entries WHERE {condition}"
+    ), params)
\ No newline at end of file
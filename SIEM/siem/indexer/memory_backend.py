@@ -0,0 +1,289 @@
+"""
+Memory Backend Module
+Keeps the most recent logs and alerts in fixed-size in-memory rings
+"""
+
+import threading
+from collections import OrderedDict, Counter
+from datetime import datetime
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger
+from indexer.storage import StorageBackend, to_datetime, stored_pid, log_filter
+from indexer.archive import to_iso
+from indexer.rollups import rollup_value
+
+# Stored log timestamps, kept as fixed-width ISO strings (see archive.to_iso)
+TIME_COLUMNS = ('event_time', 'received_at', 'parsed_at', 'indexed_at')
+
+class MemoryBackend(StorageBackend):
+    """
+    Storage for collectors without a disk
+    
+    Logs go to a ring of capacity slots: log id n lives in slot
+    (n - 1) % capacity, so once the ring is full each new log overwrites
+    the oldest one. Alerts are kept up to alert_capacity, oldest dropped
+    first. Queries scan the ring, newest first by id (arrival order), and
+    search matches a case-insensitive substring of message or raw_message.
+    Nothing survives a restart.
+    """
+    
+    def __init__(self, config):
+        """
+        Initialize the rings
+        
+        Args:
+            config: Configuration dictionary
+        """
+        memory_config = config['database'].get('memory', {})
+        self.capacity = memory_config.get('capacity', 100000)
+        self.alert_capacity = memory_config.get('alert_capacity', 10000)
+        self.logger = setup_logger(__name__)
+        self.lock = threading.Lock()
+        
+        self.ring = [None] * self.capacity
+        self.next_id = 1
+        self.templates = {}
+        self.alerts = OrderedDict()
+        self.next_alert_id = 1
+        
+        self.stats = {
+            'logs_evicted': 0,
+            'alerts_evicted': 0
+        }
+        self.logger.info(f"In-memory storage for the last {self.capacity} logs and {self.alert_capacity} alerts")
+        
+    def get_stats(self):
+        """Return ring statistics"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['logs_stored'] = min(self.next_id - 1, self.capacity)
+            stats['alerts_stored'] = len(self.alerts)
+        return stats
+        
+    def append_logs(self, messages):
+        """Store a batch of parsed messages, overwriting the oldest logs once the ring is full"""
+        indexed_at = to_iso(datetime.utcnow())
+        with self.lock:
+            for message in messages:
+                row = self._log_entry_row(message, self.next_id, indexed_at)
+                slot = (self.next_id - 1) % self.capacity
+                if self.ring[slot] is not None:
+                    self.stats['logs_evicted'] += 1
+                self.ring[slot] = row
+                message.db_id = self.next_id
+                self.next_id += 1
+            self._update_templates(messages)
+            
+    def _log_entry_row(self, message, log_id, indexed_at):
+        """Build the stored row for a parsed LogEvent, in LogEntry.to_dict() key order"""
+        return {
+            'id': log_id,
+            'raw_message': message.raw_message or '',
+            'message': message.message or '',
+            'source_ip': message.source_ip,
+            'source_port': message.source_port,
+            'hostname': message.hostname,
+            'priority': message.priority,
+            'facility': message.facility,
+            'severity': message.severity,
+            'severity_name': message.severity_name,
+            'process': message.process,
+            'pid': stored_pid(message.pid),
+            'appname': message.appname,
+            'structured_data': message.structured_data,
+            'timestamp': message.timestamp,
+            'event_time': to_iso(to_datetime(message.event_time)),
+            'received_at': to_iso(to_datetime(message.received_at) or datetime.utcnow()),
+            'parsed_at': to_iso(to_datetime(message.parsed_at)),
+            'indexed_at': indexed_at,
+            'pattern_matched': message.pattern_matched,
+            'repeat_count': message.repeat_count or 1,
+            'template_id': message.template_id,
+            'template_params': message.template_params,
+            'fields': message.fields
+        }
+        
+    def _update_templates(self, messages):
+        """Add count and first/last seen of the templates in a batch"""
+        for message in messages:
+            template_id = message.template_id
+            if template_id is None:
+                continue
+            seen = to_datetime(message.received_at)
+            template = self.templates.get(template_id)
+            if template is None:
+                self.templates[template_id] = {
+                    'template_id': template_id,
+                    'template': message.template,
+                    'count': message.repeat_count or 1,
+                    'first_seen': seen,
+                    'last_seen': seen
+                }
+            else:
+                template['count'] += message.repeat_count or 1
+                template['last_seen'] = seen
+                
+    def _newest_rows(self):
+        """Snapshot of the stored rows, newest first"""
+        with self.lock:
+            first = max(self.next_id - self.capacity, 1)
+            return [self.ring[(log_id - 1) % self.capacity] for log_id in range(self.next_id - 1, first - 1, -1)]
+            
+    def _in_range(self, rows, start, end):
+        """Rows received in start..end"""
+        start_iso = to_iso(start) if start else None
+        end_iso = to_iso(end) if end else None
+        for row in rows:
+            if start_iso and row['received_at'] < start_iso:
+                continue
+            if end_iso and row['received_at'] > end_iso:
+                continue
+            yield row
+            
+    def _to_dict(self, row):
+        """Stored row -> LogEntry.to_dict() form"""
+        result = dict(row)
+        for column in TIME_COLUMNS:
+            if result[column]:
+                result[column] = datetime.fromisoformat(result[column]).isoformat()
+        return result
+        
+    def scan_logs(self, start=None, end=None):
+        """Iterate over stored logs received in start..end, oldest first"""
+        for row in self._in_range(reversed(self._newest_rows()), start, end):
+            yield self._to_dict(row)
+            
+    def query_logs(self, offset=0, limit=100, start=None, end=None, severity=None, source_ip=None,
+                   template_id=None, event_start=None, event_end=None, sd_params=(), archive=None):
+        """Page through stored logs (archive is ignored: there is none)"""
+        match = log_filter(severity, source_ip, template_id, event_start, event_end, sd_params)
+        total = 0
+        logs = []
+        for row in self._in_range(self._newest_rows(), start, end):
+            if match is not None and not match(row):
+                continue
+            if offset <= total < offset + limit:
+                logs.append(self._to_dict(row))
+            total += 1
+        return total, logs
+        
+    def search_logs(self, query, limit=100, order='time'):
+        """Case-insensitive substring search of message and raw_message, newest first"""
+        needle = (query or '').lower()
+        logs = []
+        for row in self._newest_rows():
+            if len(logs) >= limit:
+                break
+            if needle in row['message'].lower() or needle in row['raw_message'].lower():
+                logs.append(self._to_dict(row))
+        return logs, 'time'
+        
+    def count_logs(self, since):
+        """Count stored logs"""
+        rows = self._newest_rows()
+        severity_dist = {i: 0 for i in range(8)}
+        logs_since = 0
+        for row in self._in_range(rows, since, None):
+            logs_since += 1
+            if row['severity'] in severity_dist:
+                severity_dist[row['severity']] += 1
+        return len(rows), logs_since, severity_dist
+        
+    def top_values(self, dimension, since, limit=10):
+        """Most frequent values of a dimension among stored logs"""
+        counts = Counter(rollup_value(row[dimension]) for row in self._in_range(self._newest_rows(), since, None))
+        top = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(value if value != '' else None, count) for value, count in top]
+        
+    def get_templates(self, offset=0, limit=100):
+        """Learned message templates, most frequent first"""
+        with self.lock:
+            templates = sorted(self.templates.values(), key=lambda template: template['count'], reverse=True)
+        return len(templates), [
+            dict(template,
+                 first_seen=template['first_seen'].isoformat() if template['first_seen'] else None,
+                 last_seen=template['last_seen'].isoformat() if template['last_seen'] else None)
+            for template in templates[offset:offset + limit]
+        ]
+        
+    def save_alert(self, alert_data):
+        """Store an alert and return its id, dropping the oldest alert once alert_capacity are kept"""
+        try:
+            # rule_id is required, as in the alerts table
+            if alert_data['rule_id'] is None:
+                raise ValueError("alert has no rule_id")
+            with self.lock:
+                alert_id = self.next_alert_id
+                self.next_alert_id += 1
+                self.alerts[alert_id] = {
+                    'id': alert_id,
+                    'rule_id': alert_data['rule_id'],
+                    'rule_name': alert_data['rule_name'],
+                    'severity': alert_data['severity'],
+                    'description': alert_data['description'],
+                    'log_entry_id': alert_data.get('log_entry_id'),
+                    'created_at': datetime.utcnow(),
+                    'acknowledged': False,
+                    'acknowledged_by': None,
+                    'acknowledged_at': None,
+                    'source_ip': alert_data.get('source_ip'),
+                    'destination_ip': alert_data.get('destination_ip')
+                }
+                if len(self.alerts) > self.alert_capacity:
+                    self.alerts.popitem(last=False)
+                    self.stats['alerts_evicted'] += 1
+            self.logger.info(f"Alert saved: {alert_data['rule_name']}")
+            return alert_id
+            
+        except Exception as e:
+            self.logger.error(f"Error saving alert: {e}")
+            return None
+            
+    def get_alerts(self, offset=0, limit=50, acknowledged=None, severity=None):
+        """Page through stored alerts, newest first"""
+        with self.lock:
+            alerts = [
+                alert for alert in reversed(self.alerts.values())
+                if (acknowledged is None or alert['acknowledged'] == acknowledged)
+                and (not severity or alert['severity'] == severity)
+            ]
+        return len(alerts), [self._alert_dict(alert) for alert in alerts[offset:offset + limit]]
+        
+    def acknowledge_alert(self, alert_id, acknowledged_by):
+        """Mark an alert acknowledged"""
+        with self.lock:
+            alert = self.alerts.get(alert_id)
+            if alert is None:
+                return None
+            alert['acknowledged'] = True
+            alert['acknowledged_by'] = acknowledged_by
+            alert['acknowledged_at'] = datetime.utcnow()
+            return self._alert_dict(alert)
+            
+    def _alert_dict(self, alert):
+        """Stored alert -> Alert.to_dict() form"""
+        result = dict(alert)
+        for column in ('created_at', 'acknowledged_at'):
+            if result[column]:
+                result[column] = result[column].isoformat()
+        return result
+        
+    def delete_alert(self, alert_id):
+        """Delete an alert"""
+        with self.lock:
+            return self.alerts.pop(alert_id, None) is not None
+            
+    def count_alerts(self, since):
+        """Count stored alerts"""
+        with self.lock:
+            alerts = list(self.alerts.values())
+        alerts_since = sum(1 for alert in alerts if alert['created_at'] >= since)
+        unack_alerts = sum(1 for alert in alerts if not alert['acknowledged'])
+        return len(alerts), alerts_since, unack_alerts
+        
+def create_memory_backend(config):
+    """Factory function to create the in-memory backend"""
+    return MemoryBackend(config)
\ No newline at end of file
@@ -3,10 +3,11 @@ Database Models for SIEM
 Defines the structure for storing log data
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Float, Index
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, DateTime, Text, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
+import json
 
 Base = declarative_base()
 
@@ -35,15 +36,25 @@ class LogEntry(Base):
     process = Column(String(255))
     pid = Column(Integer)
     appname = Column(String(255))
+    structured_data = Column(Text)  # RFC 5424 STRUCTURED-DATA; selected params are indexed in LogSDParam
     
     # Timestamps
     timestamp = Column(String(50))  # Original timestamp from log
+    event_time = Column(DateTime)  # timestamp normalized to UTC
     received_at = Column(DateTime, default=datetime.utcnow)
     parsed_at = Column(DateTime)
     indexed_at = Column(DateTime, default=datetime.utcnow)
     
     # Parsing metadata
     pattern_matched = Column(String(50))
+    repeat_count = Column(Integer, default=1)  # Identical messages collapsed into this row
+    
+    # Learned message template (see LogTemplate)
+    template_id = Column(Integer)
+    template_params = Column(Text)  # JSON list of the values at the template's <*> positions
+    
+    # Typed fields from the program's extractor (processors/extractors.py)
+    fields = Column(Text)  # JSON object
     
     # Create indexes for common queries
     __table_args__ = (
@@ -52,6 +63,11 @@ class LogEntry(Base):
         Index('idx_hostname', 'hostname'),
         Index('idx_received_at', 'received_at'),
         Index('idx_indexed_at', 'indexed_at'),
+        Index('idx_template_id', 'template_id'),
+        Index('idx_event_time', 'event_time'),
+        # Ids are never reused, so alerts keep pointing at the right row after
+        # retention, and shard files can start their ids at a per-shard base
+        {'sqlite_autoincrement': True},
     )
     
     def to_dict(self):
@@ -70,12 +86,77 @@ class LogEntry(Base):
             'process': self.process,
             'pid': self.pid,
             'appname': self.appname,
+            'structured_data': self.structured_data,
             'timestamp': self.timestamp,
+            'event_time': self.event_time.isoformat() if self.event_time else None,
             'received_at': self.received_at.isoformat() if self.received_at else None,
             'parsed_at': self.parsed_at.isoformat() if self.parsed_at else None,
             'indexed_at': self.indexed_at.isoformat() if self.indexed_at else None,
-            'pattern_matched': self.pattern_matched
+            'pattern_matched': self.pattern_matched,
+            'repeat_count': self.repeat_count,
+            'template_id': self.template_id,
+            'template_params': json.loads(self.template_params) if self.template_params else None,
+            'fields': json.loads(self.fields) if self.fields else None
+        }
+        
+class LogTemplate(Base):
+    """Model for message templates learned by the parser"""
+    __tablename__ = 'log_templates'
+    
+    template_id = Column(Integer, primary_key=True, autoincrement=False)
+    template = Column(Text, nullable=False)
+    count = Column(Integer, default=0)
+    first_seen = Column(DateTime)
+    last_seen = Column(DateTime)
+    
+    # Create indexes
+    __table_args__ = (
+        Index('idx_template_last_seen', 'last_seen'),
+    )
+    
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            'template_id': self.template_id,
+            'template': self.template,
+            'count': self.count,
+            'first_seen': self.first_seen.isoformat() if self.first_seen else None,
+            'last_seen': self.last_seen.isoformat() if self.last_seen else None
         }
+        
+class LogRollup(Base):
+    """Model for per-minute log counts, maintained by the indexer for dashboards"""
+    __tablename__ = 'log_rollups'
+    
+    # Primary key order lets a dimension's time range be read as one range scan
+    dimension = Column(String(20), primary_key=True)  # 'severity', 'source_ip', 'hostname' or 'process'
+    minute = Column(DateTime, primary_key=True)  # received_at truncated to the minute
+    value = Column(String(255), primary_key=True)  # '' for logs without one
+    count = Column(Integer, default=0)
+    
+    # Rows are stored in primary key order, with no separate rowid b-tree
+    __table_args__ = (
+        {'sqlite_with_rowid': False},
+    )
+
+class LogSDParam(Base):
+    """Model for indexed RFC 5424 structured-data params (e.g. [origin ip=...])"""
+    __tablename__ = 'log_sd_params'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    log_entry_id = Column(Integer, nullable=False)
+    sd_id = Column(String(64), nullable=False)
+    name = Column(String(64), nullable=False)
+    value = Column(String(255))
+    
+    # Create indexes
+    __table_args__ = (
+        Index('idx_sd_param_value', 'sd_id', 'name', 'value'),
+        Index('idx_sd_param_log_entry', 'log_entry_id'),
+    )
+    
+# Tables written to time-partitioned shard files (indexer/shards.py)
+SHARD_TABLES = [LogEntry.__table__, LogSDParam.__table__]
 
 class Alert(Base):
     """Model for storing security alerts generated by rules"""
@@ -126,11 +207,76 @@ class Alert(Base):
             'destination_ip': self.destination_ip
         }
 
-def init_database(db_path):
-    """Initialize database and create tables"""
+# PRAGMAs applied to every new SQLite connection, by database.sqlite.profile
+SQLITE_PROFILES = {
+    # SQLite's own settings: rollback journal, fsync on every commit, readers block the writer
+    'default': {},
+    # WAL lets API readers run alongside the indexer; synchronous=NORMAL only
+    # fsyncs at checkpoints, so a power loss can lose the last commits but not corrupt the file
+    'tuned': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 268435456,  # 256 MiB
+        'cache_size': -65536,  # negative = KiB, i.e. 64 MiB
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000  # ms
+    }
+}
+
+def get_sqlite_pragmas(sqlite_config):
+    """
+    Resolve the PRAGMAs for a database.sqlite configuration
+    
+    Args:
+        sqlite_config: dict with a 'profile' name and optional 'pragmas' overrides
+        
+    Returns:
+        Dictionary of pragma name -> value
+    """
+    profile = sqlite_config.get('profile', 'default')
+    if profile not in SQLITE_PROFILES:
+        raise ValueError(f"Unknown SQLite profile {profile!r}, expected one of {sorted(SQLITE_PROFILES)}")
+    pragmas = dict(SQLITE_PROFILES[profile])
+    pragmas.update(sqlite_config.get('pragmas') or {})
+    return pragmas
+    
+def init_database(db_path, pragmas=None, tables=None):
+    """
+    Initialize database and create tables
+    
+    Args:
+        db_path: SQLite database file
+        pragmas: Optional pragma name -> value applied on every connection
+        tables: Tables to create (default: all)
+    """
     engine = create_engine(f'sqlite:///{db_path}', echo=False)
-    Base.metadata.create_all(engine)
+    
+    if pragmas:
+        @event.listens_for(engine, 'connect')
+        def apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+            cursor.close()
+            
+    Base.metadata.create_all(engine, tables=tables)
+    upgrade_schema(engine, tables)
     return engine
+    
+def upgrade_schema(engine, tables=None):
+    """Add columns and indexes introduced after a database was created"""
+    inspector = inspect(engine)
+    
+    with engine.begin() as conn:
+        for table in tables or Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                    
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
 
 def get_session(engine):
     """Get database session"""
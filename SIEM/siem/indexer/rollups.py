@@ -0,0 +1,121 @@
+"""
+Rollups Module
+Per-minute log counts by severity, source_ip, hostname and process for the stats endpoints
+"""
+
+from datetime import datetime
+from sqlalchemy import cast, func, select, String
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indexer.models import LogEntry, LogRollup
+
+# log_entries columns counted per minute
+ROLLUP_DIMENSIONS = ('severity', 'source_ip', 'hostname', 'process')
+
+# received_at truncated to the minute, in SQLAlchemy's SQLite datetime format
+MINUTE_SQL = '%Y-%m-%d %H:%M:00.000000'
+
+def to_minute(value):
+    """Truncate a datetime to the minute"""
+    return value.replace(second=0, microsecond=0)
+    
+def rollup_value(value):
+    """Stored form of a dimension value"""
+    return '' if value is None else str(value)[:255]
+    
+def count_rows(rows, now=None):
+    """
+    Count log_entries rows per (dimension, minute, value)
+    
+    Args:
+        rows: log_entries row dicts
+        now: Minute of rows without a received_at (default: utcnow)
+        
+    Returns:
+        Dictionary of (dimension, minute, value) -> count
+    """
+    counts = {}
+    for row in rows:
+        received_at = row['received_at'] or now or datetime.utcnow()
+        minute = to_minute(received_at)
+        for dimension in ROLLUP_DIMENSIONS:
+            key = (dimension, minute, rollup_value(row[dimension]))
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+    
+def add_rollups(conn, counts):
+    """
+    Add counts to log_rollups
+    
+    Args:
+        conn: Session or connection to the main database
+        counts: Dictionary of (dimension, minute, value) -> count
+    """
+    if not counts:
+        return
+    stmt = sqlite_insert(LogRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LogRollup.dimension, LogRollup.minute, LogRollup.value],
+        set_={'count': LogRollup.count + stmt.excluded.count}
+    )
+    # executemany, so a large batch never hits SQLite's bound-variable limit
+    conn.execute(stmt, [
+        {'dimension': dimension, 'minute': minute, 'value': value, 'count': count}
+        for (dimension, minute, value), count in counts.items()
+    ])
+    
+def count_log_entries(conn, since):
+    """
+    Count the log_entries rows of one database received at or after since
+    
+    Used to fill log_rollups for rows indexed before it existed.
+    
+    Args:
+        conn: Session or connection to a database holding log_entries
+        since: Optional datetime (default: every row)
+        
+    Returns:
+        Dictionary of (dimension, minute, value) -> count
+    """
+    table = LogEntry.__table__
+    minute = func.strftime(MINUTE_SQL, table.c.received_at)
+    counts = {}
+    for dimension in ROLLUP_DIMENSIONS:
+        value = func.coalesce(func.substr(cast(table.c[dimension], String), 1, 255), '')
+        query = select(minute, value, func.count())\
+            .where(table.c.received_at.isnot(None))\
+            .group_by(minute, value)
+        if since is not None:
+            query = query.where(table.c.received_at >= since)
+        for minute_text, dimension_value, count in conn.execute(query):
+            counts[(dimension, datetime.fromisoformat(minute_text), dimension_value)] = count
+    return counts
+    
+def prune_rollups(conn, before):
+    """Delete rollup minutes older than before"""
+    conn.execute(LogRollup.__table__.delete().where(LogRollup.minute < to_minute(before)))
+    
+def rollup_breakdown(session, dimension, since=None, limit=None):
+    """
+    Log counts per value of a dimension, largest first
+    
+    Args:
+        session: Session on the main database
+        dimension: One of ROLLUP_DIMENSIONS
+        since: Optional datetime; counts start at its minute
+        limit: Optional maximum number of values
+        
+    Returns:
+        List of (value, count); value is None for logs without one
+    """
+    total = func.sum(LogRollup.count)
+    query = session.query(LogRollup.value, total).filter(LogRollup.dimension == dimension)
+    if since is not None:
+        query = query.filter(LogRollup.minute >= to_minute(since))
+    query = query.group_by(LogRollup.value).order_by(total.desc(), LogRollup.value)
+    if limit is not None:
+        query = query.limit(limit)
+    return [(value if value != '' else None, count) for value, count in query.all()]
\ No newline at end of file
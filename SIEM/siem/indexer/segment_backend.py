@@ -0,0 +1,131 @@
+"""
+Segment Backend Module
+Stores logs in append-only segment files, with templates and alerts in SQLite
+"""
+
+import threading
+from datetime import datetime
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indexer.storage import stored_pid, log_filter
+from indexer.sqlite_backend import SQLiteBackend
+from indexer.segment_store import create_segment_store, to_log_dict
+
+class SegmentBackend(SQLiteBackend):
+    """
+    SQLiteBackend with log rows in a SegmentLogStore instead of log_entries
+    
+    Ingest appends records to a segment file with no SQL on the log path;
+    templates, rollups and alerts stay in the main database. full_text,
+    shards and archive do not apply to segments (retention is
+    segments.retention_days), search is a substring scan, and structured
+    data filters read the stored structured_data rather than an index.
+    """
+    
+    def __init__(self, config):
+        """
+        Initialize the database and the segment store
+        
+        Args:
+            config: Configuration dictionary
+        """
+        # These options index or move log_entries rows, which stay empty
+        database = dict(config['database'], full_text={'enabled': False}, shards={'enabled': False}, archive={'enabled': False})
+        super().__init__(dict(config, database=database))
+        self.segments = create_segment_store(config)
+        self.sd_index = None
+        self.retention_thread = None
+        self.retention_wakeup = threading.Event()
+        
+    def start(self):
+        """Start the alert writer and segment retention threads"""
+        super().start()
+        self.retention_wakeup.clear()
+        self.retention_thread = threading.Thread(target=self._retention_loop)
+        self.retention_thread.daemon = True
+        self.retention_thread.start()
+        
+    def stop(self):
+        """Stop the background threads and close the open segment"""
+        super().stop()
+        self.retention_wakeup.set()
+        if self.retention_thread:
+            self.retention_thread.join(timeout=5)
+        self.segments.close()
+        
+    def _retention_loop(self):
+        """Apply segment retention every segments.check_interval seconds"""
+        while self.running:
+            try:
+                self.segments.apply_retention()
+            except Exception as e:
+                self.logger.error(f"Error applying segment retention: {e}")
+            self.retention_wakeup.wait(self.segments.check_interval)
+        
+    def get_stats(self):
+        """Return segment and alert writer statistics"""
+        stats = super().get_stats()
+        stats['segments'] = self.segments.get_stats()
+        return stats
+        
+    def append_logs(self, messages):
+        """Append a batch to the current segment, then count its templates and rollups"""
+        rows = [self._log_entry_row(message) for message in messages]
+        for row in rows:
+            row['pid'] = stored_pid(row['pid'])
+            if row['received_at'] is None:
+                row['received_at'] = datetime.utcnow()
+                
+        for message, db_id in zip(messages, self.segments.append(rows)):
+            message.db_id = db_id
+            
+        with self.get_db_session() as session:
+            self._update_templates(session, messages)
+            if self.rollups:
+                self._update_rollups(session, rows)
+                
+    def scan_logs(self, start=None, end=None):
+        """Iterate over logs received in start..end, oldest first"""
+        for row in self.segments.scan(start, end):
+            yield to_log_dict(row)
+            
+    def query_logs(self, offset=0, limit=100, start=None, end=None, severity=None, source_ip=None,
+                   template_id=None, event_start=None, event_end=None, sd_params=(), archive=None):
+        """Page through logs, newest first by id (archive is ignored: there is none)"""
+        match = log_filter(severity, source_ip, template_id, event_start, event_end, sd_params)
+        total, rows = self.segments.query(start, end, match, offset, limit)
+        return total, [to_log_dict(row) for row in rows]
+        
+    def search_logs(self, query, limit=100, order='time'):
+        """Case-insensitive substring search of message and raw_message, newest first"""
+        needle = (query or '').lower()
+        logs = []
+        for row in self.segments.scan(newest_first=True):
+            if len(logs) >= limit:
+                break
+            if needle in row['message'].lower() or needle in row['raw_message'].lower():
+                logs.append(to_log_dict(row))
+        return logs, 'time'
+        
+    def _count_total(self):
+        """Number of records in the segments, from their indexes"""
+        return self.segments.get_stats()['records']
+        
+    def count_logs(self, since):
+        """Count logs from the rollups, or by scanning the segments without them"""
+        if self.rollups:
+            return super().count_logs(since)
+            
+        severity_dist = {i: 0 for i in range(8)}
+        logs_since = 0
+        for row in self.segments.scan(since):
+            logs_since += 1
+            if row['severity'] in severity_dist:
+                severity_dist[row['severity']] += 1
+        return self._count_total(), logs_since, severity_dist
+        
+def create_segment_backend(config):
+    """Factory function to create the segment backend"""
+    return SegmentBackend(config)
\ No newline at end of file
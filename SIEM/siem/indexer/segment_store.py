@@ -0,0 +1,491 @@
+"""
+Segment Store Module
+Append-only log segments with a sparse received_at index, read through mmap
+"""
+
+import os
+import mmap
+import json
+import struct
+import threading
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import datetime, timedelta
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger
+from indexer.models import LogEntry
+from indexer.archive import to_micros, to_iso, JSON_COLUMNS
+
+# Record header: payload length, log id, received_at (us since the epoch)
+RECORD_HEADER = struct.Struct('>IQq')
+
+# Sparse index entry, one per index_interval records: block offset, record
+# count, first log id, min/max received_at (us since the epoch)
+INDEX_ENTRY = struct.Struct('>QIQqq')
+Block = namedtuple('Block', 'offset count first_id min_time max_time')
+
+SEGMENT_PREFIX = 'segment-'
+SEGMENT_SUFFIX = '.log'
+INDEX_SUFFIX = '.idx'
+
+# Next log id, written before segments are deleted so ids never restart
+NEXT_ID_FILE = 'next_id'
+
+# log_entries columns stored in a record's JSON payload (the id is in the header)
+STORED_COLUMNS = [column.name for column in LogEntry.__table__.columns if column.name != 'id']
+INDEXED_AT = STORED_COLUMNS.index('indexed_at')
+
+class Segment:
+    """One segment file and its sparse index"""
+    
+    def __init__(self, number, path):
+        self.number = number
+        self.path = path
+        self.size = 0
+        self.blocks = []  # Complete blocks, oldest first
+        self.prefix_max = []  # max_time of blocks[0..i], for binary search
+        self.tail = None  # Block being filled, or None
+        self.mapping = None
+        self.mapped_size = 0
+        
+    def add_block(self, block):
+        """Append a complete block to the index"""
+        self.blocks.append(block)
+        self.prefix_max.append(max(block.max_time, self.prefix_max[-1]) if self.prefix_max else block.max_time)
+        
+    def all_blocks(self):
+        """Complete blocks plus the partial tail block"""
+        return self.blocks + [self.tail] if self.tail is not None else list(self.blocks)
+        
+    def time_range(self):
+        """(min, max) received_at of the segment, or None if it is empty"""
+        blocks = self.all_blocks()
+        if not blocks:
+            return None
+        return min(block.min_time for block in blocks), max(block.max_time for block in blocks)
+        
+class SegmentLogStore:
+    """
+    Log storage in append-only segment files
+    
+    Each log is one length-prefixed record (header plus the row as a JSON
+    list) appended to the current segment, which is sealed once it reaches
+    segment_size. Every index_interval records form a block whose offset,
+    first id and received_at range go to the segment's sparse .idx file.
+    Reads map segments with mmap: a time range is located by binary search
+    over the running maximum of block end times, then blocks are scanned
+    sequentially, skipping those outside the range. Records arrive out of
+    received_at order by up to the pipeline's latency, so results are
+    ordered by id (arrival), newest first.
+    """
+    
+    def __init__(self, config):
+        """
+        Initialize the store, recovering existing segments
+        
+        Args:
+            config: segments configuration dictionary
+        """
+        self.directory = config.get('directory', 'segments')
+        self.segment_size = config.get('segment_size', 64 * 1024 * 1024)
+        self.index_interval = config.get('index_interval', 256)
+        self.retention = timedelta(days=config.get('retention_days', 0))
+        self.segment_age = timedelta(hours=config.get('segment_hours', 24))
+        self.check_interval = config.get('check_interval', 300)
+        self.logger = setup_logger(__name__)
+        
+        self.lock = threading.Lock()
+        self.segments = []
+        self.write_file = None
+        self.index_file = None
+        self.next_id = 1
+        
+        self.stats = {
+            'records_written': 0,
+            'segments_deleted': 0
+        }
+        
+        os.makedirs(self.directory, exist_ok=True)
+        self._recover()
+        
+    def _segment_path(self, number):
+        """Path of a segment file"""
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{number:010d}{SEGMENT_SUFFIX}")
+        
+    def _index_path(self, segment):
+        """Path of a segment's sparse index"""
+        return segment.path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+        
+    def _recover(self):
+        """Load segment indexes, rescanning the last segment written"""
+        numbers = sorted(
+            int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) for name in os.listdir(self.directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        for number in numbers:
+            segment = Segment(number, self._segment_path(number))
+            segment.size = os.path.getsize(segment.path)
+            self.segments.append(segment)
+            
+        # Sealed segments wrote their last block to the index before the next one started
+        for segment in self.segments[:-1]:
+            if not os.path.exists(self._index_path(segment)):
+                self._rescan(segment, sealed=True)
+                continue
+            with open(self._index_path(segment), 'rb') as f:
+                data = f.read()
+            for fields in INDEX_ENTRY.iter_unpack(data[:len(data) - len(data) % INDEX_ENTRY.size]):
+                segment.add_block(Block(*fields))
+                
+        if self.segments:
+            self._rescan(self.segments[-1])
+            self._open_for_append(self.segments[-1])
+            
+        last = next((segment for segment in reversed(self.segments) if segment.all_blocks()), None)
+        if last is not None:
+            block = last.all_blocks()[-1]
+            self.next_id = block.first_id + block.count
+            
+        # Retention may have deleted every segment that held records
+        next_id_path = os.path.join(self.directory, NEXT_ID_FILE)
+        if os.path.exists(next_id_path):
+            with open(next_id_path) as f:
+                self.next_id = max(self.next_id, int(f.read().strip() or 1))
+        records = sum(block.count for segment in self.segments for block in segment.all_blocks())
+        self.logger.info(f"Segment store at {self.directory}: {len(self.segments)} segments, {records} records")
+        
+    def _rescan(self, segment, sealed=False):
+        """
+        Rebuild a segment's index from its records, dropping a torn last record
+        
+        Args:
+            segment: Segment to rescan
+            sealed: Also index the last partial block (no more records will follow)
+        """
+        offset = 0
+        with open(segment.path, 'rb') as f:
+            while True:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                length, log_id, received_us = RECORD_HEADER.unpack(header)
+                if offset + RECORD_HEADER.size + length > segment.size:
+                    break
+                f.seek(length, os.SEEK_CUR)
+                self._index_record(segment, offset, log_id, received_us, write=False)
+                offset += RECORD_HEADER.size + length
+                
+        if offset < segment.size:
+            self.logger.warning(f"Truncating partial record at end of {segment.path}")
+            os.truncate(segment.path, offset)
+            segment.size = offset
+        if sealed:
+            self._seal_block(segment, write=False)
+            
+        # The index is rewritten to match the complete blocks found
+        with open(self._index_path(segment), 'wb') as index:
+            for block in segment.blocks:
+                index.write(INDEX_ENTRY.pack(*block))
+                
+    def _open_for_append(self, segment):
+        """Make segment the one new records go to"""
+        self.write_file = open(segment.path, 'ab')
+        self.index_file = open(self._index_path(segment), 'ab')
+        
+    def _index_record(self, segment, offset, log_id, received_us, write=True):
+        """Add a record to the tail block, completing the block every index_interval records"""
+        tail = segment.tail
+        if tail is None:
+            tail = Block(offset, 1, log_id, received_us, received_us)
+        else:
+            tail = tail._replace(
+                count=tail.count + 1,
+                min_time=min(tail.min_time, received_us),
+                max_time=max(tail.max_time, received_us)
+            )
+        segment.tail = tail
+        if tail.count >= self.index_interval:
+            self._seal_block(segment, write)
+            
+    def _seal_block(self, segment, write=True):
+        """Move the tail block to the index"""
+        if segment.tail is None:
+            return
+        segment.add_block(segment.tail)
+        if write:
+            self.index_file.write(INDEX_ENTRY.pack(*segment.tail))
+        segment.tail = None
+        
+    def _roll_segment(self, now=None):
+        """Seal the current segment and start the next one (lock held)"""
+        if self.segments:
+            current = self.segments[-1]
+            if self.write_file is None:
+                self._open_for_append(current)
+            self._seal_block(current)
+            self.write_file.close()
+            self.index_file.close()
+            number = current.number + 1
+        else:
+            number = 0
+            
+        segment = Segment(number, self._segment_path(number))
+        self.segments.append(segment)
+        self._open_for_append(segment)
+        self._apply_retention(now)
+        
+    def append(self, rows):
+        """
+        Append log rows
+        
+        Args:
+            rows: log_entries row dicts without ids (datetimes are stored as
+                ISO strings; received_at must be set)
+                
+        Returns:
+            List of the ids given to the rows
+        """
+        indexed_at = to_iso(datetime.utcnow())
+        ids = []
+        with self.lock:
+            if self.write_file is None and self.segments:
+                self._open_for_append(self.segments[-1])
+                
+            for row in rows:
+                values = [row.get(column) for column in STORED_COLUMNS]
+                values[INDEXED_AT] = indexed_at
+                payload = json.dumps(
+                    [to_iso(value) if isinstance(value, datetime) else value for value in values],
+                    separators=(',', ':')
+                ).encode()
+                
+                # A record never spans segments; an oversized one gets a segment of its own
+                segment = self.segments[-1] if self.segments else None
+                if segment is None or (segment.size and segment.size + RECORD_HEADER.size + len(payload) > self.segment_size):
+                    self._roll_segment()
+                    segment = self.segments[-1]
+                    
+                log_id = self.next_id
+                received_us = to_micros(row['received_at'])
+                self.write_file.write(RECORD_HEADER.pack(len(payload), log_id, received_us))
+                self.write_file.write(payload)
+                self._index_record(segment, segment.size, log_id, received_us)
+                segment.size += RECORD_HEADER.size + len(payload)
+                self.next_id += 1
+                ids.append(log_id)
+                
+            # Readers map the file, so records must reach the OS before they are indexed
+            self.write_file.flush()
+            self.index_file.flush()
+            self.stats['records_written'] += len(ids)
+        return ids
+        
+    def apply_retention(self, now=None):
+        """
+        Seal the current segment once its oldest record is segment_hours old,
+        then delete expired segments
+        
+        Run every check_interval seconds, so retention_days also holds for a
+        segment that never reaches segment_size.
+        
+        Args:
+            now: Naive UTC datetime (default: utcnow)
+        """
+        if not self.retention:
+            return
+        now = now or datetime.utcnow()
+        with self.lock:
+            time_range = self.segments[-1].time_range() if self.segments else None
+            if time_range is not None and time_range[0] < to_micros(now - self.segment_age):
+                self._roll_segment(now)
+            else:
+                self._apply_retention(now)
+                
+    def _apply_retention(self, now=None):
+        """Delete sealed segments whose newest record is older than retention_days (lock held)"""
+        if not self.retention:
+            return
+        cutoff = to_micros((now or datetime.utcnow()) - self.retention)
+        while len(self.segments) > 1:
+            segment = self.segments[0]
+            time_range = segment.time_range()
+            if time_range is not None and time_range[1] >= cutoff:
+                break
+                
+            # A mapped file cannot be removed on Windows
+            if segment.mapping is not None:
+                segment.mapping.close()
+                segment.mapping = None
+            try:
+                self._save_next_id()
+                # The index goes first: a segment without one is still readable
+                for path in (self._index_path(segment), segment.path):
+                    if os.path.exists(path):
+                        os.remove(path)
+            except OSError as e:
+                # An open handle or permissions; retried on the next check
+                self.logger.error(f"Error deleting segment {segment.path}: {e}")
+                break
+            self.segments.pop(0)
+            self.stats['segments_deleted'] += 1
+            self.logger.info(f"Deleted expired segment {segment.path}")
+            
+    def _save_next_id(self):
+        """Persist next_id, replacing the file atomically (lock held)"""
+        path = os.path.join(self.directory, NEXT_ID_FILE)
+        with open(path + '.tmp', 'w') as f:
+            f.write(str(self.next_id))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+            
+    def _snapshot(self):
+        """(segment, mapping, sealed block count, tail block) of every segment with records, oldest first"""
+        snapshot = []
+        with self.lock:
+            for segment in self.segments:
+                if not segment.size:
+                    continue
+                if segment.mapping is None or segment.mapped_size < segment.size:
+                    # Appends only grow the file, so older mappings stay valid for their readers
+                    with open(segment.path, 'rb') as f:
+                        segment.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    segment.mapped_size = segment.size
+                snapshot.append((segment, segment.mapping, len(segment.blocks), segment.tail))
+        return snapshot
+        
+    def _blocks_in_range(self, segment, sealed, tail, start_us, end_us):
+        """Blocks of a segment that may hold records in start_us..end_us, oldest first"""
+        first = bisect_left(segment.prefix_max, start_us, 0, sealed) if start_us is not None else 0
+        blocks = segment.blocks[first:sealed]
+        if tail is not None:
+            blocks.append(tail)
+        return [
+            block for block in blocks
+            if (start_us is None or block.max_time >= start_us) and (end_us is None or block.min_time <= end_us)
+        ]
+        
+    def _read_block(self, mapping, block):
+        """(id, received_at us, payload) of a block's records, oldest first"""
+        records = []
+        offset = block.offset
+        try:
+            for _ in range(block.count):
+                length, log_id, received_us = RECORD_HEADER.unpack_from(mapping, offset)
+                offset += RECORD_HEADER.size
+                records.append((log_id, received_us, mapping[offset:offset + length]))
+                offset += length
+        except ValueError:
+            # Retention closed the mapping: the segment has expired meanwhile
+            return []
+        return records
+        
+    def _decode(self, log_id, payload):
+        """Stored row dict of a record (ISO timestamps, JSON columns as text)"""
+        row = {'id': log_id}
+        row.update(zip(STORED_COLUMNS, json.loads(payload)))
+        return row
+        
+    def scan(self, start=None, end=None, newest_first=False):
+        """
+        Iterate over stored rows received in start..end
+        
+        Args:
+            start: Optional naive UTC datetime, inclusive
+            end: Optional naive UTC datetime, inclusive
+            newest_first: Newest id first instead of oldest
+        """
+        start_us = to_micros(start) if start else None
+        end_us = to_micros(end) if end else None
+        snapshot = self._snapshot()
+        if newest_first:
+            snapshot.reverse()
+            
+        for segment, mapping, sealed, tail in snapshot:
+            blocks = self._blocks_in_range(segment, sealed, tail, start_us, end_us)
+            if newest_first:
+                blocks.reverse()
+            for block in blocks:
+                records = self._read_block(mapping, block)
+                if newest_first:
+                    records.reverse()
+                for log_id, received_us, payload in records:
+                    if (start_us is None or received_us >= start_us) and (end_us is None or received_us <= end_us):
+                        yield self._decode(log_id, payload)
+                        
+    def query(self, start=None, end=None, match=None, offset=0, limit=100):
+        """
+        Page through stored rows, newest first
+        
+        Args:
+            start: Optional naive UTC datetime, inclusive
+            end: Optional naive UTC datetime, inclusive
+            match: Optional predicate on a stored row dict
+            offset: Matching rows to skip
+            limit: Maximum rows to return
+            
+        Returns:
+            (matching row count, list of stored row dicts)
+        """
+        start_us = to_micros(start) if start else None
+        end_us = to_micros(end) if end else None
+        
+        total = 0
+        page = []
+        for segment, mapping, sealed, tail in reversed(self._snapshot()):
+            for block in reversed(self._blocks_in_range(segment, sealed, tail, start_us, end_us)):
+                inside = (start_us is None or block.min_time >= start_us) and (end_us is None or block.max_time <= end_us)
+                # Whole blocks outside the page are counted from the index alone
+                if inside and match is None and (total + block.count <= offset or len(page) >= limit):
+                    total += block.count
+                    continue
+                    
+                for log_id, received_us, payload in reversed(self._read_block(mapping, block)):
+                    if start_us is not None and received_us < start_us:
+                        continue
+                    if end_us is not None and received_us > end_us:
+                        continue
+                    row = None
+                    if match is not None:
+                        row = self._decode(log_id, payload)
+                        if not match(row):
+                            continue
+                    if offset <= total < offset + limit:
+                        page.append(row or self._decode(log_id, payload))
+                    total += 1
+        return total, page
+        
+    def get_stats(self):
+        """Return segment statistics"""
+        stats = dict(self.stats)
+        with self.lock:
+            stats['segments'] = len(self.segments)
+            stats['bytes'] = sum(segment.size for segment in self.segments)
+            stats['records'] = sum(block.count for segment in self.segments for block in segment.all_blocks())
+        return stats
+        
+    def close(self):
+        """Close the open segment and index files"""
+        with self.lock:
+            if self.write_file is not None:
+                self.write_file.close()
+                self.index_file.close()
+                self.write_file = None
+                self.index_file = None
+                
+def to_log_dict(row):
+    """Stored row -> LogEntry.to_dict() form"""
+    result = dict(row)
+    for column in JSON_COLUMNS:
+        if result.get(column):
+            result[column] = json.loads(result[column])
+    for column in ('event_time', 'received_at', 'parsed_at', 'indexed_at'):
+        if result.get(column):
+            result[column] = datetime.fromisoformat(result[column]).isoformat()
+    return result
+    
+def create_segment_store(config):
+    """Factory function to create the segment store"""
+    return SegmentLogStore(config['database'].get('segments', {}))
\ No newline at end of file
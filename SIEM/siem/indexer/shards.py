@@ -0,0 +1,216 @@
+"""
+Shard Manager Module
+Time-partitioned SQLite files for the log tables, with file-level retention
+"""
+
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import text
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger
+from indexer.models import init_database, SHARD_TABLES
+from indexer.full_text import init_full_text
+
+EPOCH = datetime(1970, 1, 1)
+
+# logs-2024-06-05.db for daily shards, logs-2024-06-05T13.db for shorter ones
+SHARD_FILE = re.compile(r'^logs-(\d{4}-\d{2}-\d{2}(?:T\d{2})?)\.db$')
+
+# Log entry ids in a shard start at shard_number << ID_SHIFT, so ids stay
+# unique across files and id >> ID_SHIFT is the shard number
+ID_SHIFT = 32
+
+class ShardManager:
+    """
+    Routes log rows to one SQLite file per interval of received_at
+    
+    Shard n covers received_at in [EPOCH + n * interval, EPOCH + (n + 1) * interval).
+    Shards are created by the indexer on first write and only opened, never
+    created, by readers.
+    """
+    
+    def __init__(self, config, pragmas=None, archive=None, full_text=False):
+        """
+        Initialize the shard manager
+        
+        Args:
+            config: shards configuration dictionary
+            pragmas: SQLite pragmas applied to every shard connection
+            archive: Optional LogArchive that expired shards are copied to
+                before their files are deleted
+            full_text: Give every shard a log_fts full-text index
+        """
+        self.directory = config.get('directory', 'shards')
+        self.interval = timedelta(hours=config.get('interval_hours', 24))
+        self.retention = timedelta(days=config.get('retention_days', 0))
+        self.pragmas = pragmas
+        self.archive = archive
+        self.full_text = full_text
+        self.logger = setup_logger(__name__)
+        self.name_format = '%Y-%m-%d' if self.interval % timedelta(days=1) == timedelta(0) else '%Y-%m-%dT%H'
+        
+        # shard number -> engine; the indexer and API threads share it
+        self.engines = {}
+        self.lock = threading.Lock()
+        self.retention_lock = threading.Lock()
+        self.stats = {
+            'shards_created': 0,
+            'shards_dropped': 0
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        
+    def shard_number(self, received_at):
+        """Shard number of a naive UTC datetime"""
+        return (received_at - EPOCH) // self.interval
+        
+    def shard_start(self, number):
+        """First received_at covered by a shard"""
+        return EPOCH + number * self.interval
+        
+    def shard_path(self, number):
+        """File holding a shard"""
+        return os.path.join(self.directory, f"logs-{self.shard_start(number).strftime(self.name_format)}.db")
+        
+    def list_shards(self):
+        """
+        Shard numbers present on disk
+        
+        Returns:
+            Sorted list of shard numbers
+        """
+        numbers = []
+        for name in os.listdir(self.directory):
+            match = SHARD_FILE.match(name)
+            if match:
+                stamp = match.group(1)
+                start = datetime.strptime(stamp, '%Y-%m-%dT%H' if 'T' in stamp else '%Y-%m-%d')
+                numbers.append(self.shard_number(start))
+        return sorted(numbers)
+        
+    def get_engine(self, number, create=False):
+        """
+        Engine of a shard
+        
+        Args:
+            number: Shard number
+            create: Create the shard file if it does not exist
+            
+        Returns:
+            Engine, or None if the shard does not exist and create is False
+        """
+        with self.lock:
+            engine = self.engines.get(number)
+            if engine is not None:
+                return engine
+                
+            path = self.shard_path(number)
+            exists = os.path.exists(path)
+            if not exists and not create:
+                return None
+                
+            engine = init_database(path, self.pragmas, SHARD_TABLES)
+            if self.full_text:
+                init_full_text(engine)
+            if not exists:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("INSERT INTO sqlite_sequence (name, seq) VALUES ('log_entries', :seq)"),
+                        {'seq': number << ID_SHIFT}
+                    )
+                self.stats['shards_created'] += 1
+                self.logger.info(f"Created shard {path}")
+                
+            self.engines[number] = engine
+            return engine
+            
+    def engines_for_range(self, start=None, end=None):
+        """
+        Engines of the existing shards overlapping received_at start..end
+        
+        Args:
+            start: Optional naive UTC datetime
+            end: Optional naive UTC datetime
+            
+        Returns:
+            List of engines, newest shard first
+        """
+        first = self.shard_number(start) if start else None
+        last = self.shard_number(end) if end else None
+        engines = []
+        for number in reversed(self.list_shards()):
+            if (first is not None and number < first) or (last is not None and number > last):
+                continue
+            engine = self.get_engine(number)
+            if engine is not None:
+                engines.append(engine)
+        return engines
+        
+    def apply_retention(self, now=None):
+        """
+        Delete shard files that ended more than retention_days ago
+        
+        With an archive, a shard's rows are archived before its file is
+        deleted.
+        
+        Args:
+            now: Naive UTC datetime (default: utcnow)
+            
+        Returns:
+            List of deleted shard numbers
+        """
+        if not self.retention:
+            return []
+            
+        cutoff = self.shard_number((now or datetime.utcnow()) - self.retention)
+        dropped = []
+        with self.retention_lock:
+            for number in self.list_shards():
+                # A shard is kept while any part of it is inside the retention window
+                if number >= cutoff:
+                    break
+                    
+                if self.archive is not None:
+                    with self.get_engine(number).connect() as conn:
+                        archived, _ = self.archive.archive_from(
+                            conn, id_range=(number << ID_SHIFT, (number + 1) << ID_SHIFT)
+                        )
+                    self.logger.info(f"Archived {archived} events from shard {self.shard_path(number)}")
+                    
+                with self.lock:
+                    engine = self.engines.pop(number, None)
+                if engine is not None:
+                    engine.dispose()
+                path = self.shard_path(number)
+                try:
+                    for suffix in ('', '-wal', '-shm'):
+                        if os.path.exists(path + suffix):
+                            os.remove(path + suffix)
+                except OSError as e:
+                    # An open handle (Windows) or permissions; retried next time
+                    self.logger.error(f"Error dropping shard {path}: {e}")
+                    continue
+                dropped.append(number)
+                self.logger.info(f"Dropped shard {path}")
+                
+        self.stats['shards_dropped'] += len(dropped)
+        return dropped
+        
+    def get_stats(self):
+        """Return shard statistics"""
+        stats = dict(self.stats)
+        shards = self.list_shards()
+        stats['shards'] = len(shards)
+        stats['bytes'] = sum(os.path.getsize(self.shard_path(number)) for number in shards)
+        return stats
+        
+def create_shard_manager(config, pragmas=None, archive=None):
+    """Factory function to create a shard manager (None when disabled)"""
+    shard_config = config['database'].get('shards', {})
+    if not shard_config.get('enabled', False):
+        return None
+    full_text = config['database'].get('full_text', {}).get('enabled', False)
+    return ShardManager(shard_config, pragmas, archive, full_text)
\ No newline at end of file
@@ -0,0 +1,687 @@
+"""
+SQLite Backend Module
+Stores logs, templates and alerts in SQLite through the ORM models
+"""
+
+import threading
+import json
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+from sqlalchemy import select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger
+from indexer.models import init_database, get_sqlite_pragmas, get_session, LogEntry, LogTemplate, LogSDParam, LogRollup, Alert
+from indexer.storage import StorageBackend, to_datetime, log_filter
+from indexer.shards import create_shard_manager
+from indexer.archive import create_log_archive, ARCHIVED_IDS
+from indexer.full_text import init_full_text, delete_from_full_text, build_match_query, LogFTS
+from indexer.rollups import count_rows, add_rollups, count_log_entries, prune_rollups, rollup_breakdown
+from indexer.alert_writer import create_alert_writer
+from processors.structured_data import get_sd_params, split_param_key
+
+class SQLiteBackend(StorageBackend):
+    """SQLite storage, optionally with shards, an archive, full-text search, rollups and an alert writer"""
+    
+    def __init__(self, config):
+        """
+        Initialize the database
+        
+        Args:
+            config: Configuration dictionary
+        """
+        self.config = config
+        self.logger = setup_logger(__name__)
+        self.running = False
+        
+        # Initialize database
+        db_path = config['database']['path']
+        sqlite_config = config['database'].get('sqlite', {})
+        pragmas = get_sqlite_pragmas(sqlite_config)
+        self.engine = init_database(db_path, pragmas)
+        self.logger.info(f"Database initialized at {db_path} (SQLite profile {sqlite_config.get('profile', 'default')})")
+        
+        # Optional FTS5 index for /api/search, written in the same transaction as the rows
+        self.full_text = config['database'].get('full_text', {}).get('enabled', False)
+        if self.full_text and init_full_text(self.engine):
+            self.logger.info("Built full-text index log_fts")
+            
+        # Optional cold storage for logs past the hot window
+        self.archive = create_log_archive(config)
+        self.archive_thread = None
+        self.archive_wakeup = threading.Event()
+        
+        # Optional per-interval shard files for the log tables
+        self.shards = create_shard_manager(config, pragmas, self.archive)
+        self.newest_shard = None
+        
+        # Optional per-minute counts for the stats endpoints, updated with each batch
+        rollup_config = config['database'].get('rollups', {})
+        self.rollups = rollup_config.get('enabled', False)
+        self.rollup_retention = timedelta(days=rollup_config.get('retention_days', 30))
+        self.rollups_pruned = None
+        if self.rollups:
+            self._fill_rollups()
+            
+        # Optional group-commit writer for rule engine alerts
+        self.alert_writer = create_alert_writer(config, self.engine)
+        
+        # One multi-row INSERT per batch; RETURNING gives each row's id in parameter order
+        log_entries = LogEntry.__table__
+        self.insert_log_entries = log_entries.insert().returning(log_entries.c.id, sort_by_parameter_order=True)
+        
+        # Structured-data params copied to log_sd_params ('sd_id.name')
+        self.sd_index = {
+            split_param_key(key)
+            for key in config['database'].get('structured_data', {}).get('index_params', [])
+        }
+        
+    @contextmanager
+    def get_db_session(self):
+        """Context manager for database sessions"""
+        session = get_session(self.engine)
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+            
+    @contextmanager
+    def log_sessions(self, start=None, end=None):
+        """
+        Read sessions for the log tables covering received_at start..end
+        
+        Args:
+            start: Optional naive UTC datetime
+            end: Optional naive UTC datetime
+            
+        Yields:
+            List of sessions, newest shard first (the main database when
+            sharding is disabled)
+        """
+        if self.shards is None:
+            engines = [self.engine]
+        else:
+            engines = self.shards.engines_for_range(start, end)
+        sessions = [get_session(engine) for engine in engines]
+        try:
+            yield sessions
+        finally:
+            for session in sessions:
+                session.close()
+                
+    def start(self):
+        """Start the alert writer and archive threads"""
+        self.running = True
+        if self.alert_writer is not None:
+            self.alert_writer.start()
+        if self.archive is not None:
+            self.archive_wakeup.clear()
+            self.archive_thread = threading.Thread(target=self._archive_loop)
+            self.archive_thread.daemon = True
+            self.archive_thread.start()
+            
+    def stop(self):
+        """Stop the background threads once queued alerts are saved"""
+        self.running = False
+        self.archive_wakeup.set()
+        if self.alert_writer is not None:
+            self.alert_writer.stop()
+        if self.archive_thread:
+            self.archive_thread.join(timeout=5)
+        if self.archive is not None:
+            self.archive.close()
+            
+    def get_stats(self):
+        """Return shard, archive and alert writer statistics"""
+        stats = {}
+        if self.shards is not None:
+            stats['shards'] = self.shards.get_stats()
+        if self.archive is not None:
+            stats['archive'] = self.archive.get_stats()
+        if self.alert_writer is not None:
+            stats['alert_writer'] = self.alert_writer.get_stats()
+        return stats
+        
+    def _archive_loop(self):
+        """Move logs past the hot window to the archive every check_interval seconds"""
+        while self.running:
+            try:
+                self.archive_old_logs()
+            except Exception as e:
+                self.logger.error(f"Error archiving logs: {e}")
+            self.archive_wakeup.wait(self.archive.check_interval)
+            
+    def archive_old_logs(self, now=None):
+        """
+        Archive and remove logs older than the hot window
+        
+        With shards, expired shard files are archived and deleted (the hot
+        window is shards.retention_days). Otherwise rows of the main database
+        older than archive.hot_days are archived and deleted.
+        
+        Args:
+            now: Naive UTC datetime (default: utcnow)
+            
+        Returns:
+            Number of rows archived from the main database
+        """
+        if self.shards is not None:
+            self.shards.apply_retention(now)
+            return 0
+            
+        cutoff = (now or datetime.utcnow()) - self.archive.hot_window
+        log_entries = LogEntry.__table__
+        with self.engine.begin() as conn:
+            # Exactly the rows written to the archive are deleted: ids and
+            # received_at are not in the same order, so no id watermark
+            ARCHIVED_IDS.create(conn)
+            archived, _ = self.archive.archive_from(conn, log_entries.c.received_at < cutoff, id_table=ARCHIVED_IDS)
+            if archived:
+                old = select(ARCHIVED_IDS.c.id)
+                sd_params = LogSDParam.__table__
+                conn.execute(sd_params.delete().where(sd_params.c.log_entry_id.in_(old)))
+                if self.full_text:
+                    delete_from_full_text(conn, "id IN (SELECT id FROM archived_ids)", {})
+                conn.execute(log_entries.delete().where(log_entries.c.id.in_(old)))
+            ARCHIVED_IDS.drop(conn)
+            
+        if not archived:
+            return 0
+            
+        self.logger.info(f"Archived {archived} log entries received before {cutoff.isoformat()}")
+        return archived
+        
+    def append_logs(self, messages):
+        """
+        Insert a batch of parsed messages
+        
+        Args:
+            messages: List of parsed LogEvents; each gets the id of its own
+                row as db_id
+        """
+        rows = [self._log_entry_row(message) for message in messages]
+        
+        if self.shards is None:
+            with self.get_db_session() as session:
+                self._insert_logs(session, messages, rows)
+                self._update_templates(session, messages)
+                if self.rollups:
+                    self._update_rollups(session, rows)
+                    
+                # Commit the batch
+                session.commit()
+        else:
+            self._insert_sharded(messages, rows)
+            with self.get_db_session() as session:
+                self._update_templates(session, messages)
+                if self.rollups:
+                    self._update_rollups(session, rows)
+                    
+    def _insert_logs(self, session, messages, rows):
+        """Insert log rows and set each message's db_id"""
+        ids = session.scalars(self.insert_log_entries, rows).all()
+        for message, db_id in zip(messages, ids):
+            message.db_id = db_id
+            
+        if self.full_text:
+            session.execute(LogFTS.insert(), [
+                {'rowid': db_id, 'raw_message': row['raw_message']} for db_id, row in zip(ids, rows)
+            ])
+        if self.sd_index:
+            self._index_sd_params(session, messages)
+            
+    def _insert_sharded(self, messages, rows):
+        """Insert log rows into the shard of their received_at"""
+        groups = {}
+        for message, row in zip(messages, rows):
+            received_at = row['received_at']
+            if received_at is None:
+                received_at = row['received_at'] = datetime.utcnow()
+            group = groups.setdefault(self.shards.shard_number(received_at), ([], []))
+            group[0].append(message)
+            group[1].append(row)
+            
+        for number, (shard_messages, shard_rows) in groups.items():
+            # Old shards are dropped whenever a newer one is first written;
+            # with an archive, the archive thread does it off the ingest path
+            if self.newest_shard is None or number > self.newest_shard:
+                self.newest_shard = number
+                if self.archive is None:
+                    self.shards.apply_retention()
+                    
+            session = get_session(self.shards.get_engine(number, create=True))
+            try:
+                self._insert_logs(session, shard_messages, shard_rows)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+                
+    def _log_entry_row(self, message):
+        """Build the log_entries row for a parsed LogEvent"""
+        # Convert pipeline timestamps
+        parsed_at = to_datetime(message.parsed_at)
+        received_at = to_datetime(message.received_at)
+        params = message.template_params
+        fields = message.fields
+        
+        # Every row has the same keys, as executemany requires
+        return {
+            'raw_message': message.raw_message or '',
+            'message': message.message or '',
+            'source_ip': message.source_ip,
+            'source_port': message.source_port,
+            'hostname': message.hostname,
+            'priority': message.priority,
+            'facility': message.facility,
+            'severity': message.severity,
+            'severity_name': message.severity_name,
+            'process': message.process,
+            'pid': message.pid,
+            'appname': message.appname,
+            'structured_data': message.structured_data,
+            'timestamp': message.timestamp,
+            'event_time': to_datetime(message.event_time),
+            'received_at': received_at,
+            'parsed_at': parsed_at,
+            'pattern_matched': message.pattern_matched,
+            'repeat_count': message.repeat_count or 1,
+            'template_id': message.template_id,
+            'template_params': json.dumps(params) if params is not None else None,
+            'fields': json.dumps(fields) if fields is not None else None
+        }
+        
+    def _index_sd_params(self, session, messages):
+        """Store the configured structured-data params of an inserted batch in log_sd_params"""
+        rows = []
+        for message in messages:
+            structured_data = message.structured_data
+            if not structured_data or structured_data == '-':
+                continue
+            for sd_id, name, value in get_sd_params(message):
+                if (sd_id, name) in self.sd_index:
+                    rows.append({'log_entry_id': message.db_id, 'sd_id': sd_id, 'name': name, 'value': value[:255]})
+                    
+        if rows:
+            session.execute(LogSDParam.__table__.insert(), rows)
+            
+    def _update_templates(self, session, messages):
+        """Upsert count and first/last seen of the templates in a batch"""
+        templates = {}
+        for message in messages:
+            template_id = message.template_id
+            if template_id is None:
+                continue
+            seen = to_datetime(message.received_at)
+            row = templates.get(template_id)
+            if row is None:
+                templates[template_id] = {
+                    'template_id': template_id,
+                    'template': message.template,
+                    'count': message.repeat_count or 1,
+                    'first_seen': seen,
+                    'last_seen': seen
+                }
+            else:
+                row['count'] += message.repeat_count or 1
+                row['last_seen'] = seen
+                
+        if not templates:
+            return
+            
+        stmt = sqlite_insert(LogTemplate).values(list(templates.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LogTemplate.template_id],
+            set_={
+                'count': LogTemplate.count + stmt.excluded.count,
+                'last_seen': stmt.excluded.last_seen
+            }
+        )
+        session.execute(stmt)
+        
+    def _update_rollups(self, session, rows):
+        """Add a batch to the per-minute rollups, pruning expired minutes once an hour"""
+        now = datetime.utcnow()
+        add_rollups(session, count_rows(rows, now))
+        
+        if self.rollup_retention and (self.rollups_pruned is None or now - self.rollups_pruned >= timedelta(hours=1)):
+            prune_rollups(session, now - self.rollup_retention)
+            self.rollups_pruned = now
+            
+    def _fill_rollups(self):
+        """Count log entries indexed before the rollups were enabled"""
+        with self.get_db_session() as session:
+            if session.query(LogRollup.minute).first() is not None:
+                return
+                
+        since = datetime.utcnow() - self.rollup_retention if self.rollup_retention else None
+        counts = {}
+        with self.log_sessions(since) as sessions:
+            for session in sessions:
+                for key, count in count_log_entries(session, since).items():
+                    counts[key] = counts.get(key, 0) + count
+                    
+        if counts:
+            with self.get_db_session() as session:
+                add_rollups(session, counts)
+            filled = sum(count for (dimension, _, _), count in counts.items() if dimension == 'severity')
+            self.logger.info(f"Filled log_rollups from {filled} existing log entries")
+            
+    def scan_logs(self, start=None, end=None):
+        """Iterate over hot logs received in start..end, oldest first"""
+        with self.log_sessions(start, end) as sessions:
+            # Shards come newest first and hold disjoint received_at ranges
+            for session in reversed(sessions):
+                query = session.query(LogEntry)
+                if start:
+                    query = query.filter(LogEntry.received_at >= start)
+                if end:
+                    query = query.filter(LogEntry.received_at <= end)
+                for log in query.order_by(LogEntry.received_at, LogEntry.id).yield_per(1000):
+                    yield log.to_dict()
+                    
+    def query_logs(self, offset=0, limit=100, start=None, end=None, severity=None, source_ip=None,
+                   template_id=None, event_start=None, event_end=None, sd_params=(), archive=None):
+        """Page through hot logs, then archived ones (see StorageBackend.query_logs)"""
+        def build_query(session):
+            query = session.query(LogEntry)
+            
+            # Apply filters
+            if severity is not None:
+                query = query.filter(LogEntry.severity == severity)
+            if source_ip:
+                query = query.filter(LogEntry.source_ip == source_ip)
+            if template_id is not None:
+                query = query.filter(LogEntry.template_id == template_id)
+            if start:
+                query = query.filter(LogEntry.received_at >= start)
+            if end:
+                query = query.filter(LogEntry.received_at <= end)
+            if event_start:
+                query = query.filter(LogEntry.event_time >= event_start)
+            if event_end:
+                query = query.filter(LogEntry.event_time <= event_end)
+            for sd_id, name, value in sd_params:
+                matching = session.query(LogSDParam.log_entry_id).filter(
+                    LogSDParam.sd_id == sd_id,
+                    LogSDParam.name == name,
+                    LogSDParam.value == value
+                )
+                query = query.filter(LogEntry.id.in_(matching))
+            return query
+            
+        # Only the shards overlapping start..end are opened
+        with self.log_sessions(start, end) as sessions:
+            queries = [build_query(session) for session in sessions]
+            
+            # Get total count
+            counts = [query.count() for query in queries]
+            
+            logs = [log.to_dict() for log in self._newest_first(queries, counts, offset, limit)]
+            total = sum(counts)
+            
+        # Archived rows are older than every hot row, so they follow them
+        if self.archive is not None and self._reaches_archive(start, archive):
+            match = log_filter(severity, source_ip, template_id, event_start, event_end, sd_params)
+            archived_total, archived_logs = self.archive.query(
+                start, end, match, max(offset - total, 0), limit - len(logs)
+            )
+            logs.extend(archived_logs)
+            total += archived_total
+            
+        return total, logs
+        
+    def _newest_first(self, queries, counts, offset, limit):
+        """
+        Page through log queries ordered by received_at, newest first
+        
+        Args:
+            queries: One query per log session, newest shard first. Shards
+                hold disjoint received_at ranges, so their results concatenate
+            counts: Row count of each query, or None to skip nothing
+            offset: Rows to skip
+            limit: Maximum rows to return
+            
+        Returns:
+            List of LogEntry objects
+        """
+        logs = []
+        for i, query in enumerate(queries):
+            if len(logs) >= limit:
+                break
+            if counts is not None and offset >= counts[i]:
+                offset -= counts[i]
+                continue
+            logs.extend(query.order_by(LogEntry.received_at.desc())
+                             .offset(offset)
+                             .limit(limit - len(logs))
+                             .all())
+            offset = 0
+        return logs
+        
+    def _reaches_archive(self, start, archive):
+        """True if a log query should also read the archive"""
+        if archive is not None:
+            return archive
+        newest = self.archive.newest_time()
+        return start is not None and newest is not None and start <= newest
+        
+    def search_logs(self, query, limit=100, order='time'):
+        """
+        Search hot logs
+        
+        With the full-text index, the query is a list of terms that must all
+        match ("quoted phrases" and prefix* terms are supported) and results
+        can be ordered by bm25 rank. Without it, the query is a substring of
+        message or raw_message and results are newest first.
+        """
+        match = build_match_query(query) if self.full_text else None
+        
+        with self.log_sessions() as sessions:
+            queries = []
+            for session in sessions:
+                log_query = session.query(LogEntry)
+                
+                if match:
+                    log_query = log_query.join(LogFTS, LogFTS.c.rowid == LogEntry.id)\
+                                         .filter(text('log_fts MATCH :match').bindparams(match=match))
+                elif query:
+                    # Search in message and raw_message
+                    log_query = log_query.filter(
+                        (LogEntry.message.contains(query)) |
+                        (LogEntry.raw_message.contains(query))
+                    )
+                queries.append(log_query)
+                
+            # Get results
+            if match and order == 'rank':
+                # bm25 statistics are per shard, so merged ranks are approximate
+                ranked = []
+                for log_query in queries:
+                    ranked.extend(log_query.add_columns(LogFTS.c.rank).order_by(LogFTS.c.rank).limit(limit).all())
+                ranked.sort(key=lambda result: result[1])
+                results = [log for log, _ in ranked[:limit]]
+            elif match:
+                # Newest by received_at (ids do not follow arrival order with
+                # several workers or a replay); only the matching ids are
+                # sorted, then the newest rows are loaded
+                newest_ids = [
+                    log_query.with_entities(LogEntry.id).order_by(LogEntry.received_at.desc()).limit(limit)
+                    for log_query in queries
+                ]
+                queries = [
+                    session.query(LogEntry).filter(LogEntry.id.in_(ids.scalar_subquery()))
+                    for session, ids in zip(sessions, newest_ids)
+                ]
+                results = self._newest_first(queries, None, 0, limit)
+            else:
+                results = self._newest_first(queries, None, 0, limit)
+                
+            return [log.to_dict() for log in results], order if match else 'time'
+            
+    def count_logs(self, since):
+        """
+        Count logs for the overview
+        
+        The total counts the stored log entries. With rollups, the counts
+        since come from the per-minute rollups (the window starts at the
+        minute of since); without them, log_entries is counted. Rollups are
+        pruned after rollups.retention_days, so they cannot give the total.
+        """
+        if self.rollups:
+            total_logs = self._count_total()
+            with self.get_db_session() as session:
+                severity_dist = {i: 0 for i in range(8)}
+                logs_since = 0
+                for value, count in rollup_breakdown(session, 'severity', since):
+                    logs_since += count
+                    if value is not None and int(value) in severity_dist:
+                        severity_dist[int(value)] = count
+            return total_logs, logs_since, severity_dist
+            
+        total_logs = self._count_total()
+        with self.log_sessions(since) as sessions:
+            logs_since = sum(
+                session.query(LogEntry).filter(LogEntry.received_at >= since).count()
+                for session in sessions
+            )
+            
+            # Severity distribution
+            severity_dist = {}
+            for i in range(8):
+                severity_dist[i] = sum(
+                    session.query(LogEntry)
+                               .filter(LogEntry.severity == i)
+                               .filter(LogEntry.received_at >= since)
+                               .count()
+                    for session in sessions
+                )
+        return total_logs, logs_since, severity_dist
+        
+    def _count_total(self):
+        """Number of log entries in the main database or the shards"""
+        with self.log_sessions() as sessions:
+            return sum(session.query(LogEntry).count() for session in sessions)
+            
+    def top_values(self, dimension, since, limit=10):
+        """Most frequent values of a dimension from the rollups (None without rollups)"""
+        if not self.rollups:
+            return None
+        with self.get_db_session() as session:
+            return rollup_breakdown(session, dimension, since, limit)
+            
+    def get_templates(self, offset=0, limit=100):
+        """Learned message templates, most frequent first"""
+        with self.get_db_session() as session:
+            query = session.query(LogTemplate)
+            total = query.count()
+            
+            templates = query.order_by(LogTemplate.count.desc())\
+                             .offset(offset)\
+                             .limit(limit)\
+                             .all()
+            return total, [template.to_dict() for template in templates]
+            
+    def submit_alert(self, alert_data):
+        """
+        Save an alert without waiting for it to be written
+        
+        With the alert writer, alerts are committed in batches on its
+        thread; without it, the alert is saved before this returns.
+        """
+        if self.alert_writer is not None:
+            return self.alert_writer.submit(alert_data)
+        return super().submit_alert(alert_data)
+        
+    def save_alert(self, alert_data):
+        """Save an alert to the database and return its id"""
+        if self.alert_writer is not None:
+            return self.alert_writer.save(alert_data)
+            
+        try:
+            with self.get_db_session() as session:
+                alert = Alert(
+                    rule_id=alert_data['rule_id'],
+                    rule_name=alert_data['rule_name'],
+                    severity=alert_data['severity'],
+                    description=alert_data['description'],
+                    log_entry_id=alert_data.get('log_entry_id'),
+                    source_ip=alert_data.get('source_ip'),
+                    destination_ip=alert_data.get('destination_ip')
+                )
+                session.add(alert)
+                session.commit()
+                self.logger.info(f"Alert saved: {alert_data['rule_name']}")
+                return alert.id
+                
+        except Exception as e:
+            self.logger.error(f"Error saving alert: {e}")
+            return None
+            
+    def get_alerts(self, offset=0, limit=50, acknowledged=None, severity=None):
+        """Page through alerts, newest first"""
+        with self.get_db_session() as session:
+            query = session.query(Alert)
+            
+            # Apply filters
+            if acknowledged is not None:
+                query = query.filter(Alert.acknowledged == (1 if acknowledged else 0))
+            if severity:
+                query = query.filter(Alert.severity == severity)
+                
+            # Get total count
+            total = query.count()
+            
+            # Apply pagination
+            alerts = query.order_by(Alert.created_at.desc())\
+                         .offset(offset)\
+                         .limit(limit)\
+                         .all()
+            return total, [alert.to_dict() for alert in alerts]
+            
+    def acknowledge_alert(self, alert_id, acknowledged_by):
+        """Mark an alert acknowledged"""
+        with self.get_db_session() as session:
+            alert = session.query(Alert).filter(Alert.id == alert_id).first()
+            if not alert:
+                return None
+                
+            alert.acknowledged = 1
+            alert.acknowledged_by = acknowledged_by
+            alert.acknowledged_at = datetime.utcnow()
+            
+            session.commit()
+            return alert.to_dict()
+            
+    def delete_alert(self, alert_id):
+        """Delete an alert"""
+        with self.get_db_session() as session:
+            return session.query(Alert).filter(Alert.id == alert_id).delete() > 0
+            
+    def count_alerts(self, since):
+        """Count alerts for the overview"""
+        with self.get_db_session() as session:
+            # Total alerts
+            total_alerts = session.query(Alert).count()
+            alerts_since = session.query(Alert)\
+                                  .filter(Alert.created_at >= since)\
+                                  .count()
+                                  
+            # Unacknowledged alerts
+            unack_alerts = session.query(Alert)\
+                                 .filter(Alert.acknowledged == 0)\
+                                 .count()
+            return total_alerts, alerts_since, unack_alerts
+            
+def create_sqlite_backend(config):
+    """Factory function to create the SQLite backend"""
+    return SQLiteBackend(config)
\ No newline at end of file
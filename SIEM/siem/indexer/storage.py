@@ -0,0 +1,223 @@
+"""
+Storage Backend Module
+Interface between the indexer/API and where logs, templates and alerts are stored
+"""
+
+from concurrent.futures import Future
+from datetime import datetime
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from indexer.archive import to_iso
+from processors.structured_data import parse_structured_data
+
+class StorageBackend:
+    """
+    Storage used by DatabaseManager, the rule engine and the API
+    
+    Logs come back as dictionaries in LogEntry.to_dict() form, newest
+    first unless noted. Implementations: SQLiteBackend
+    (indexer/sqlite_backend.py), MemoryBackend (indexer/memory_backend.py)
+    and SegmentBackend (indexer/segment_backend.py), selected by
+    database.type.
+    """
+    
+    # (sd_id, name) pairs query_logs can filter on, or None for any param
+    sd_index = None
+    
+    def start(self):
+        """Start background work (archiving, alert writing)"""
+        
+    def stop(self):
+        """Stop background work and flush what is pending"""
+        
+    def get_stats(self):
+        """Return backend statistics"""
+        return {}
+        
+    # Logs
+    
+    def append_logs(self, messages):
+        """
+        Store a batch of parsed messages and count their templates
+        
+        Args:
+            messages: List of parsed LogEvents; each gets the id of its own
+                row as db_id. Raises if the batch could not be stored.
+        """
+        raise NotImplementedError
+        
+    def scan_logs(self, start=None, end=None):
+        """
+        Iterate over stored logs received in start..end, oldest first
+        
+        Args:
+            start: Optional naive UTC datetime, inclusive
+            end: Optional naive UTC datetime, inclusive
+        """
+        raise NotImplementedError
+        
+    def query_logs(self, offset=0, limit=100, start=None, end=None, severity=None, source_ip=None,
+                   template_id=None, event_start=None, event_end=None, sd_params=(), archive=None):
+        """
+        Page through logs matching every given filter
+        
+        Args:
+            offset: Matching logs to skip
+            limit: Maximum logs to return
+            start, end: Optional received_at bounds (naive UTC datetimes)
+            severity, source_ip, template_id: Optional exact matches
+            event_start, event_end: Optional event_time bounds
+            sd_params: (sd_id, name, value) structured-data params to match
+            archive: True/False to force reading archived logs, None to
+                read them only when start reaches back into the archive
+                
+        Returns:
+            (matching log count, list of log dicts)
+        """
+        raise NotImplementedError
+        
+    def search_logs(self, query, limit=100, order='time'):
+        """
+        Search log messages
+        
+        Args:
+            query: Search text
+            limit: Maximum logs to return
+            order: 'time' (newest first) or 'rank' (best match first, where supported)
+            
+        Returns:
+            (list of log dicts, order actually used)
+        """
+        raise NotImplementedError
+        
+    def count_logs(self, since):
+        """
+        Count stored logs
+        
+        Returns:
+            (total logs, logs received since, severity 0-7 -> logs received since)
+        """
+        raise NotImplementedError
+        
+    def top_values(self, dimension, since, limit=10):
+        """
+        Most frequent values of severity, source_ip, hostname or process
+        
+        Returns:
+            List of (value as a string or None, count), or None if this
+            backend is not configured to count them
+        """
+        raise NotImplementedError
+        
+    def get_templates(self, offset=0, limit=100):
+        """
+        Learned message templates, most frequent first
+        
+        Returns:
+            (template count, list of template dicts)
+        """
+        raise NotImplementedError
+        
+    # Alerts
+    
+    def save_alert(self, alert_data):
+        """Save an alert and return its id (None if it could not be saved)"""
+        raise NotImplementedError
+        
+    def submit_alert(self, alert_data):
+        """
+        Save an alert without waiting for it to be written
+        
+        Returns:
+            Future resolving to the alert id (None if it could not be saved)
+        """
+        future = Future()
+        future.set_result(self.save_alert(alert_data))
+        return future
+        
+    def get_alerts(self, offset=0, limit=50, acknowledged=None, severity=None):
+        """
+        Page through alerts, newest first
+        
+        Args:
+            offset: Alerts to skip
+            limit: Maximum alerts to return
+            acknowledged: Optional True/False filter
+            severity: Optional severity name filter
+            
+        Returns:
+            (matching alert count, list of alert dicts)
+        """
+        raise NotImplementedError
+        
+    def acknowledge_alert(self, alert_id, acknowledged_by):
+        """Mark an alert acknowledged; return its dict, or None if there is no such alert"""
+        raise NotImplementedError
+        
+    def delete_alert(self, alert_id):
+        """Delete an alert; return False if there is no such alert"""
+        raise NotImplementedError
+        
+    def count_alerts(self, since):
+        """
+        Count alerts
+        
+        Returns:
+            (total alerts, alerts created since, unacknowledged alerts)
+        """
+        raise NotImplementedError
+        
+def to_datetime(value):
+    """
+    Convert a pipeline timestamp to a naive UTC datetime
+    
+    Args:
+        value: Integer nanoseconds since the epoch (or a legacy ISO string)
+        
+    Returns:
+        datetime or None
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return datetime.utcfromtimestamp(value / 1e9)
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+        
+def stored_pid(pid):
+    """A parsed pid as the log_entries INTEGER column keeps it (digits become an int)"""
+    return int(pid) if isinstance(pid, str) and pid.isdigit() else pid
+    
+def log_filter(severity=None, source_ip=None, template_id=None, event_start=None, event_end=None, sd_params=()):
+    """
+    Predicate applying query_logs filters to stored row dicts
+    
+    Stored rows hold fixed-width ISO timestamps (see archive.to_iso), as
+    archived blocks and the memory backend keep them.
+    
+    Returns:
+        Function of a row dict, or None if there are no filters
+    """
+    conditions = []
+    if severity is not None:
+        conditions.append(lambda row: row['severity'] == severity)
+    if source_ip:
+        conditions.append(lambda row: row['source_ip'] == source_ip)
+    if template_id is not None:
+        conditions.append(lambda row: row['template_id'] == template_id)
+    if event_start:
+        event_start = to_iso(event_start)
+        conditions.append(lambda row: row['event_time'] is not None and row['event_time'] >= event_start)
+    if event_end:
+        event_end = to_iso(event_end)
+        conditions.append(lambda row: row['event_time'] is not None and row['event_time'] <= event_end)
+    for param in sd_params:
+        conditions.append(lambda row, param=param: param in parse_structured_data(row['structured_data']))
+        
+    if not conditions:
+        return None
+    return lambda row: all(condition(row) for condition in conditions)
\ No newline at end of file
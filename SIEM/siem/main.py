@@ -8,6 +8,7 @@ import signal
 import sys
 import threading
 import queue
+import multiprocessing
 import yaml
 import time
 from pathlib import Path
@@ -16,7 +17,10 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent))
 
 from collectors.syslog_collector import create_collector
+from collectors.ingest_pool import create_ingest_pool, reuse_port_supported
+from collectors.spill_queue import create_spill_queue
 from processors.log_parser import create_parser
+from processors.parser_pool import create_parser_pool
 from indexer.db_manager import create_db_manager
 from rule_engine.rule_manager import create_rule_manager
 from api.platform_api import create_api
@@ -33,17 +37,45 @@ class SIEMOrchestrator:
         # Load configuration
         self.config = self._load_config(config_path)
         
-        # Create message queues
-        self.collector_to_parser = queue.Queue(maxsize=10000)
-        self.parser_to_indexer = queue.Queue(maxsize=10000)
+        # Number of SO_REUSEPORT collector+parser processes
+        self.ingest_workers = self.config['syslog'].get('workers', 1)
+        if self.ingest_workers > 1 and not reuse_port_supported():
+            self.logger.warning("SO_REUSEPORT not supported on this platform, using a single collector")
+            self.ingest_workers = 1
+            
+        # Number of parser processes (ingest workers already parse in-process)
+        self.parser_workers = self.config.get('parser', {}).get('workers', 1)
+        if self.ingest_workers > 1:
+            self.parser_workers = 1
+            
+        # Create message queues (ingest workers keep their own collector_to_parser)
+        if self.ingest_workers > 1:
+            self.collector_to_parser = None
+        elif self.config.get('spill', {}).get('enabled', False):
+            # Overflow to a disk journal instead of blocking the collector
+            self.collector_to_parser = create_spill_queue(self.config, maxsize=10000)
+        else:
+            self.collector_to_parser = queue.Queue(maxsize=10000)
+        if self.ingest_workers > 1 or self.parser_workers > 1:
+            # Parsed batches arrive from worker processes
+            self.parser_to_indexer = multiprocessing.Queue(maxsize=10000)
+        else:
+            self.parser_to_indexer = queue.Queue(maxsize=10000)
         self.indexer_to_rules = queue.Queue(maxsize=10000)
         
         # Initialize components
         self.logger.info("Initializing SIEM components...")
         
         # Create components
-        self.collector = create_collector(self.config, self.collector_to_parser)
-        self.parser = create_parser(self.config, self.collector_to_parser, self.parser_to_indexer)
+        if self.ingest_workers > 1:
+            self.collector = create_ingest_pool(self.config, self.parser_to_indexer)
+            self.parser = None
+        elif self.parser_workers > 1:
+            self.collector = create_collector(self.config, self.collector_to_parser)
+            self.parser = create_parser_pool(self.config, self.collector_to_parser, self.parser_to_indexer)
+        else:
+            self.collector = create_collector(self.config, self.collector_to_parser)
+            self.parser = create_parser(self.config, self.collector_to_parser, self.parser_to_indexer)
         self.db_manager = create_db_manager(self.config, self.parser_to_indexer, self.indexer_to_rules)
         self.rule_manager = create_rule_manager(self.config, self.indexer_to_rules, self.db_manager)
         self.api = create_api(self.config, self.db_manager)
@@ -84,8 +116,9 @@ class SIEMOrchestrator:
             # Start rule engine
             self.rule_manager.start()
             
-            # Start parser
-            self.parser.start()
+            # Start parser (runs inside the ingest workers in multi-process mode)
+            if self.parser:
+                self.parser.start()
             
             # Start API in a separate thread
             api_thread = threading.Thread(target=self.api.start)
@@ -114,7 +147,8 @@ class SIEMOrchestrator:
             pass
             
         try:
-            self.parser.stop()
+            if self.parser:
+                self.parser.stop()
         except:
             pass
             
@@ -128,6 +162,12 @@ class SIEMOrchestrator:
         except:
             pass
             
+        try:
+            if hasattr(self.collector_to_parser, 'close'):
+                self.collector_to_parser.close()
+        except:
+            pass
+            
         self.logger.info("SIEM system stopped.")
 
 def main():
@@ -0,0 +1,140 @@
+"""
+Deduplicator Module
+Collapses repeated identical messages into one event with a repeat count
+"""
+
+import time
+from collections import OrderedDict
+
+class PendingRepeat:
+    """Tracks one (source_ip, message) pair inside the dedup window"""
+    
+    __slots__ = ('first_seen', 'count', 'last_event')
+    
+    def __init__(self, first_seen):
+        self.first_seen = first_seen
+        self.count = 0
+        self.last_event = None
+        
+class MessageDeduplicator:
+    """
+    Suppresses identical (source_ip, message) pairs within a short window
+    
+    The first occurrence is emitted immediately with repeat_count 1. Copies
+    seen inside the window are held back and, once the window closes, emitted
+    as a single event carrying repeat_count N (like syslogd's "last message
+    repeated N times").
+    
+    The window is measured on the events' received_at, so a replay collapses
+    the same lines as live ingestion did, however fast it runs. Between
+    events the clock advances with the wall clock from the newest received_at.
+    """
+    
+    def __init__(self, config):
+        """
+        Initialize the deduplicator
+        
+        Args:
+            config: dedup configuration dictionary
+        """
+        self.window = int(config.get('window', 5.0) * 1e9)
+        self.max_entries = config.get('max_entries', 10000)
+        self.pending = OrderedDict()
+        
+        # Newest received_at seen, and the monotonic time it was seen at
+        self.clock = None
+        self.clock_at = None
+        self.stats = {
+            'suppressed': 0,
+            'summaries': 0
+        }
+        
+    def process(self, event):
+        """
+        Run one parsed event through the deduplicator
+        
+        Args:
+            event: Parsed LogEvent
+            
+        Returns:
+            List of events to forward (possibly empty)
+        """
+        now = event.received_at
+        if self.clock is None or now >= self.clock:
+            self.clock = now
+            self.clock_at = time.monotonic_ns()
+            
+        key = (event.source_ip, event.message)
+        entry = self.pending.get(key)
+        
+        if entry is not None and now - entry.first_seen < self.window:
+            entry.count += 1
+            entry.last_event = event
+            self.stats['suppressed'] += 1
+            return []
+            
+        output = []
+        if entry is not None:
+            del self.pending[key]
+            if entry.count:
+                output.append(self._summary(entry))
+                
+        self.pending[key] = PendingRepeat(now)
+        event.repeat_count = 1
+        output.append(event)
+        
+        # Bound memory: close the oldest windows early
+        while len(self.pending) > self.max_entries:
+            _, oldest = self.pending.popitem(last=False)
+            if oldest.count:
+                output.append(self._summary(oldest))
+                
+        return output
+        
+    def flush_expired(self, now=None):
+        """
+        Emit summaries for windows that have closed
+        
+        Args:
+            now: Optional received_at clock in nanoseconds (default: the
+                newest received_at plus the time elapsed since it was seen)
+                
+        Returns:
+            List of summary events
+        """
+        if now is None:
+            if self.clock is None:
+                return []
+            now = self.clock + time.monotonic_ns() - self.clock_at
+        output = []
+        
+        # Entries are ordered by first_seen, so stop at the first open window
+        while self.pending:
+            key, entry = next(iter(self.pending.items()))
+            if now - entry.first_seen < self.window:
+                break
+            del self.pending[key]
+            if entry.count:
+                output.append(self._summary(entry))
+                
+        return output
+        
+    def flush_all(self):
+        """Emit summaries for every pending window"""
+        output = [self._summary(entry) for entry in self.pending.values() if entry.count]
+        self.pending.clear()
+        return output
+        
+    def _summary(self, entry):
+        """Build the collapsed event for a closed window"""
+        event = entry.last_event
+        event.repeat_count = entry.count
+        self.stats['summaries'] += 1
+        return event
+        
+def create_deduplicator(config):
+    """Factory function to create a deduplicator (None when disabled)"""
+    dedup_config = config.get('parser', {}).get('dedup', {})
+    if not dedup_config.get('enabled', False):
+        return None
+    return MessageDeduplicator(dedup_config)
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Event Time Module
+Normalizes syslog header timestamps to integer epoch nanoseconds
+"""
+
+import calendar
+import re
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+MONTHS = {name: index for index, name in enumerate(calendar.month_abbr) if name}
+
+YEAR_NS = 365 * 86400 * 10**9
+
+# Seconds fraction of an ISO 8601 time (RFC 5424 allows 1 to 6 digits)
+ISO_FRACTION = re.compile(r'\.(\d+)')
+
+class EventTimeNormalizer:
+    """
+    Converts header timestamps to epoch nanoseconds
+    
+    RFC 3164 timestamps ('Jun  5 20:55:00') carry no year or zone. The year
+    is taken from the receive time; a result more than max_future ahead of
+    it belongs to the previous year (December lines read in January, or
+    replayed archives) and one almost a year behind it to the next year
+    (a sender clock that has already rolled over). The zone is the
+    configured sender timezone. RFC 5424 timestamps are ISO 8601 with
+    their own offset.
+    
+    Thousands of lines share the same second, so results are memoized by
+    timestamp string in a bounded dict.
+    """
+    
+    def __init__(self, config):
+        """
+        Initialize the normalizer
+        
+        Args:
+            config: event_time configuration dictionary
+        """
+        tz_name = config.get('timezone', 'UTC')
+        self.tz = None if tz_name == 'UTC' else ZoneInfo(tz_name)
+        self.max_future = int(config.get('max_future', 86400)) * 10**9
+        self.max_cache = config.get('max_cache', 4096)
+        self.cache = {}
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'invalid': 0
+        }
+        
+    def normalize(self, timestamp, received_at):
+        """
+        Convert a header timestamp to epoch nanoseconds
+        
+        Args:
+            timestamp: Timestamp text from the syslog header
+            received_at: Receive time in epoch nanoseconds (year reference)
+            
+        Returns:
+            Integer nanoseconds since the epoch, or None if unparseable
+        """
+        if not timestamp:
+            return None
+            
+        cached = self.cache.get(timestamp)
+        if cached is not None:
+            # An inferred year is only reused while received_at keeps it in
+            # the window; ISO timestamps carry their own year
+            if -YEAR_NS + self.max_future < cached - received_at <= self.max_future or timestamp[0].isdigit():
+                self.stats['hits'] += 1
+                return cached
+                
+        self.stats['misses'] += 1
+        if timestamp[:1].isdigit():
+            value = self._parse_iso(timestamp)
+        else:
+            value = self._parse_bsd(timestamp, received_at)
+            
+        if value is None:
+            self.stats['invalid'] += 1
+            return None
+            
+        if len(self.cache) >= self.max_cache:
+            self.cache.clear()
+        self.cache[timestamp] = value
+        return value
+        
+    def get_stats(self):
+        """Return cache counters"""
+        return dict(self.stats)
+        
+    def _parse_bsd(self, timestamp, received_at):
+        """Parse 'Mmm dd hh:mm:ss', inferring the year from received_at"""
+        try:
+            month_name, day, clock = timestamp.split()
+            hour, minute, second = clock.split(':')
+            fields = (MONTHS[month_name.capitalize()], int(day), int(hour), int(minute), int(second))
+        except (KeyError, ValueError):
+            return None
+            
+        year = datetime.fromtimestamp(received_at / 1e9, timezone.utc).year
+        value = self._epoch(year, *fields)
+        
+        if value is None or value - received_at > self.max_future:
+            value = self._epoch(year - 1, *fields)
+        elif received_at - value > YEAR_NS - self.max_future:
+            value = self._epoch(year + 1, *fields) or value
+        return value
+        
+    def _epoch(self, year, month, day, hour, minute, second):
+        """Epoch nanoseconds of a wall-clock time in the sender timezone"""
+        try:
+            if self.tz is None:
+                # timegm does not validate, so let datetime reject Feb 30
+                datetime(year, month, day, hour, minute, second)
+                return calendar.timegm((year, month, day, hour, minute, second)) * 10**9
+            return int(datetime(year, month, day, hour, minute, second, tzinfo=self.tz).timestamp()) * 10**9
+        except ValueError:
+            return None
+            
+    def _parse_iso(self, timestamp):
+        """Parse an RFC 5424 / ISO 8601 timestamp (naive values are taken as sender time)"""
+        # Before Python 3.11, fromisoformat rejects a 'Z' suffix and
+        # fractions that are not 3 or 6 digits
+        if timestamp.endswith(('Z', 'z')):
+            timestamp = timestamp[:-1] + '+00:00'
+        timestamp = ISO_FRACTION.sub(lambda match: '.' + match.group(1)[:6].ljust(6, '0'), timestamp, count=1)
+        try:
+            value = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return None
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=self.tz or timezone.utc)
+            
+        # Keep microsecond precision without going through a float
+        delta = value - datetime(1970, 1, 1, tzinfo=timezone.utc)
+        return (delta.days * 86400 + delta.seconds) * 10**9 + delta.microseconds * 1000
+        
+def create_event_time_normalizer(config):
+    """Factory function to create an event time normalizer"""
+    return EventTimeNormalizer(config.get('parser', {}).get('event_time', {}))
\ No newline at end of file
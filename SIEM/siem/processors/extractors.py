@@ -0,0 +1,175 @@
+"""
+Field Extractors Module
+Pulls typed fields out of high-volume message families once, at parse time
+"""
+
+import importlib
+import re
+
+# program name -> function(message) returning a fields dict or None
+EXTRACTORS = {}
+
+def register_extractor(*programs):
+    """
+    Decorator registering a field extractor for one or more program names
+    
+    The function receives the message text (without the syslog header) and
+    returns a dict of typed fields, or None if it does not recognise the
+    message. Plugin modules listed in parser.extractors.modules register
+    their extractors the same way.
+    """
+    def decorator(func):
+        for program in programs:
+            EXTRACTORS[program] = func
+        return func
+    return decorator
+    
+SSHD_AUTH = re.compile(
+    r'^(?P<result>Failed|Accepted) (?P<method>[\w-]+) for (?P<invalid>invalid user )?(?P<user>\S*) '
+    r'from (?P<src_ip>\S+) port (?P<src_port>\d+)'
+)
+SSHD_INVALID_USER = re.compile(r'^Invalid user (?P<user>\S*) from (?P<src_ip>\S+)(?: port (?P<src_port>\d+))?')
+
+@register_extractor('sshd')
+def extract_sshd(message):
+    """Authentication results and invalid users"""
+    match = SSHD_AUTH.match(message)
+    if match:
+        return {
+            'event': 'auth_failure' if match.group('result') == 'Failed' else 'auth_success',
+            'method': match.group('method'),
+            'user': match.group('user'),
+            'invalid_user': match.group('invalid') is not None,
+            'src_ip': match.group('src_ip'),
+            'src_port': int(match.group('src_port'))
+        }
+        
+    match = SSHD_INVALID_USER.match(message)
+    if match:
+        src_port = match.group('src_port')
+        return {
+            'event': 'invalid_user',
+            'user': match.group('user'),
+            'src_ip': match.group('src_ip'),
+            'src_port': int(src_port) if src_port else None
+        }
+    return None
+    
+@register_extractor('sudo')
+def extract_sudo(message):
+    """'user : [reason ; ]TTY=.. ; PWD=.. ; USER=.. ; COMMAND=..' lines"""
+    user, separator, rest = message.partition(' : ')
+    if not separator or 'COMMAND=' not in rest:
+        return None
+        
+    # COMMAND is last and may itself contain ' ; '
+    head, _, command = rest.partition('COMMAND=')
+    fields = {'event': 'sudo_command', 'user': user.strip()}
+    for item in head.split(' ; '):
+        key, equals, value = item.strip().partition('=')
+        if equals:
+            # USER is the account the command runs as
+            fields['target_user' if key == 'USER' else key.lower()] = value
+        elif key:
+            # e.g. 'user NOT in sudoers', '3 incorrect password attempts'
+            fields['event'] = 'sudo_denied'
+            fields['reason'] = key
+    fields['command'] = command
+    return fields
+    
+SYSTEMD_EXIT = re.compile(r'^(?P<unit>\S+\.\w+): Main process exited, code=(?P<code>\w+), status=(?P<status>\S+)')
+SYSTEMD_FAILED = re.compile(r"^(?P<unit>\S+\.\w+): Failed with result '(?P<result>[^']+)'")
+
+@register_extractor('systemd')
+def extract_systemd(message):
+    """Unit exits and failures"""
+    match = SYSTEMD_EXIT.match(message)
+    if match:
+        return {
+            'event': 'unit_exited',
+            'unit': match.group('unit'),
+            'code': match.group('code'),
+            'status': match.group('status').rstrip('.,')
+        }
+        
+    match = SYSTEMD_FAILED.match(message)
+    if match:
+        return {'event': 'unit_failed', 'unit': match.group('unit'), 'result': match.group('result')}
+    return None
+    
+AUDIT_HEADER = re.compile(r'^type=(?P<type>\S+) msg=audit\([\d.]+:(?P<serial>\d+)\):\s*')
+AUDIT_FIELD = re.compile(r'(\w+)=("[^"]*"|\S+)')
+
+@register_extractor('audit', 'auditd')
+def extract_audit(message):
+    """Kernel audit records: 'type=X msg=audit(time:serial): key=value ...'"""
+    match = AUDIT_HEADER.match(message)
+    if not match:
+        return None
+        
+    fields = {
+        'event': 'audit',
+        'audit_type': match.group('type'),
+        'audit_serial': int(match.group('serial'))
+    }
+    for key, value in AUDIT_FIELD.findall(message, match.end()):
+        if value[0] == '"':
+            value = value[1:-1]
+        elif value.isdecimal():
+            value = int(value)
+        fields.setdefault(key, value)
+    return fields
+    
+class FieldExtractor:
+    """Dispatches parsed messages to the extractor registered for their program"""
+    
+    def __init__(self, config):
+        """
+        Initialize the field extractor
+        
+        Args:
+            config: extractors configuration dictionary
+        """
+        # Plugin modules register further extractors on import
+        for module_name in config.get('modules', []):
+            importlib.import_module(module_name)
+            
+        programs = config.get('programs') or list(EXTRACTORS)
+        self.extractors = {program: EXTRACTORS[program] for program in programs if program in EXTRACTORS}
+        self.stats = {
+            'extracted': 0,
+            'unrecognised': 0
+        }
+        
+    def extract(self, parsed):
+        """
+        Extract fields for a parsed message
+        
+        Args:
+            parsed: Parsed LogEvent
+            
+        Returns:
+            Fields dictionary, or None if no extractor applies
+        """
+        program = parsed.process or parsed.appname or parsed.tag
+        extractor = self.extractors.get(program)
+        if extractor is None:
+            return None
+            
+        fields = extractor(parsed.message)
+        if fields is None:
+            self.stats['unrecognised'] += 1
+        else:
+            self.stats['extracted'] += 1
+        return fields
+        
+    def get_stats(self):
+        """Return extraction counters"""
+        return dict(self.stats)
+        
+def create_field_extractor(config):
+    """Factory function to create a field extractor (None when disabled)"""
+    extractor_config = config.get('parser', {}).get('extractors', {})
+    if not extractor_config.get('enabled', False):
+        return None
+    return FieldExtractor(extractor_config)
\ No newline at end of file
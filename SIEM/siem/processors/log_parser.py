@@ -1,17 +1,25 @@
 """
 Log Parser Module
-Processes raw syslog messages using regex patterns
+Processes raw syslog messages with a tokenizer and regex fallback
 """
 
 import re
+import string
 import threading
 import queue
-from datetime import datetime
+import time
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.logger import setup_logger
+from utils.log_event import LogEvent
+from processors.deduplicator import create_deduplicator
+from processors.syslog_tokenizer import tokenize_syslog
+from processors.template_miner import create_template_miner
+from processors.event_time import create_event_time_normalizer
+from processors.structured_data import SD_ELEMENTS
+from processors.extractors import create_field_extractor
 
 class LogParser:
     """Parses syslog messages using regex patterns"""
@@ -40,11 +48,27 @@ class LogParser:
             r'(?P<appname>\S+)\s+'
             r'(?P<procid>\S+)\s+'
             r'(?P<msgid>\S+)\s+'
-            r'(?P<structured_data>\S+)\s*'
+            # SD-ELEMENTs may contain spaces; anything else is one token as before
+            r'(?P<structured_data>' + SD_ELEMENTS + r'(?=\s|$)|\S+)\s*'
             r'(?P<message>.*)$'
         )
     }
     
+    # Candidate pattern groups for _match_message (kept in PATTERNS order)
+    ALL_FORMATS = tuple(PATTERNS)
+    MONTH_FORMATS = ('standard', 'rfc3164')
+    NUMERIC_FORMATS = ('rfc3164', 'rfc5424')
+    RFC3164_ONLY = ('rfc3164',)
+    RFC5424_ONLY = ('rfc5424',)
+    
+    # First character after <PRI> -> candidate patterns. Non-ASCII
+    # characters are not listed and fall back to ALL_FORMATS.
+    DISPATCH = dict.fromkeys(map(chr, range(128)), ())
+    DISPATCH.update(dict.fromkeys(string.ascii_letters, MONTH_FORMATS))
+    DISPATCH.update(dict.fromkeys(string.digits, RFC5424_ONLY))
+    DISPATCH['_'] = RFC3164_ONLY
+    DISPATCH[''] = ()
+    
     def __init__(self, config, input_queue, output_queue):
         """
         Initialize the log parser
@@ -60,6 +84,30 @@ class LogParser:
         self.logger = setup_logger(__name__)
         self.running = False
         self.worker_thread = None
+        self.encoding = config.get('syslog', {}).get('encoding', 'utf-8')
+        
+        # Last pattern that matched per source_ip (see _match_message)
+        self.format_hints = {}
+        self.max_format_hints = config.get('parser', {}).get('max_format_hints', 65536)
+        
+        # The regexes still beat the tokenizer on BSD headers under CPython
+        self.tokenize_bsd = config.get('parser', {}).get('tokenize_bsd', False)
+        
+        # Optional collapsing of repeated identical messages
+        self.deduplicator = create_deduplicator(config)
+        
+        # Header timestamp -> epoch nanoseconds (memoized per second)
+        self.event_time = create_event_time_normalizer(config)
+        
+        # Replay stamps historical lines with their header time instead of
+        # the time they were read (see FileReplayer)
+        self.received_at_from_event = False
+        
+        # Optional online template mining
+        self.template_miner = create_template_miner(config)
+        
+        # Optional per-program field extraction (sshd, sudo, ...)
+        self.field_extractor = create_field_extractor(config)
         
     def start(self):
         """Start the parser worker thread"""
@@ -74,21 +122,47 @@ class LogParser:
         self.running = False
         if self.worker_thread:
             self.worker_thread.join(timeout=5)
+            
+        # Forward repeat summaries still held by the deduplicator
+        summaries = self.flush()
+        if summaries and self.output_queue is not None:
+            self.output_queue.put(summaries)
+            
         self.logger.info("Log parser stopped")
         
+    def flush(self):
+        """Return every pending repeat summary (used on shutdown and by replay)"""
+        if not self.deduplicator:
+            return []
+        return self.deduplicator.flush_all()
+        
     def _process_messages(self):
         """Main processing loop"""
         while self.running:
             try:
+                # Emit summaries for dedup windows that have closed
+                if self.deduplicator:
+                    summaries = self.deduplicator.flush_expired()
+                    if summaries:
+                        self.output_queue.put(summaries)
+                        
                 # Get message from queue with timeout
                 message = self.input_queue.get(timeout=1)
                 
+                # Batched collectors hand over a list of messages per put
+                if isinstance(message, list):
+                    parsed_batch = self._parse_batch(message)
+                    if parsed_batch:
+                        self.output_queue.put(parsed_batch)
+                    continue
+                    
                 # Parse the message
                 parsed = self._parse_message(message)
                 
                 if parsed:
                     # Send to indexer
-                    self.output_queue.put(parsed)
+                    for event in self._deduplicate(parsed):
+                        self.output_queue.put(event)
                     self.logger.debug(f"Successfully parsed message from {message['source_ip']}")
                 else:
                     self.logger.warning(f"Failed to parse message: {message['raw_message'][:100]}...")
@@ -100,51 +174,166 @@ class LogParser:
             except Exception as e:
                 self.logger.error(f"Error processing message: {e}")
                 
+    def _parse_batch(self, messages):
+        """
+        Parse a batch of messages
+        
+        Args:
+            messages: List of RawEvents from collector
+            
+        Returns:
+            List of parsed LogEvents
+        """
+        parsed_batch = []
+        for message in messages:
+            try:
+                parsed = self._parse_message(message)
+            except Exception as e:
+                self.logger.error(f"Error processing message: {e}")
+                continue
+                
+            if parsed:
+                parsed_batch.extend(self._deduplicate(parsed))
+            else:
+                self.logger.warning(f"Failed to parse message: {message['raw_message'][:100]}...")
+                
+        if self.deduplicator:
+            parsed_batch.extend(self.deduplicator.flush_expired())
+            
+        return parsed_batch
+        
+    def _deduplicate(self, parsed):
+        """Pass a parsed message through the deduplicator, if enabled"""
+        if not self.deduplicator:
+            return [parsed]
+        return self.deduplicator.process(parsed)
+        
     def _parse_message(self, message):
         """
-        Parse a single message using regex patterns
+        Parse a single message
         
         Args:
-            message: Raw message dictionary from collector
+            message: RawEvent from collector
             
         Returns:
-            Parsed message dictionary or None if parsing fails
+            Parsed LogEvent
         """
-        raw_msg = message['raw_message']
+        raw_msg = message.raw_message
         
-        # Try each pattern
-        for pattern_name, pattern in self.PATTERNS.items():
-            match = pattern.match(raw_msg)
-            if match:
-                parsed = match.groupdict()
+        # Collectors hand over undecoded bytes; decode exactly once here
+        if not isinstance(raw_msg, str):
+            raw_msg = str(raw_msg, self.encoding, 'ignore')
+            
+        event = LogEvent(raw_msg, message.source_ip, message.source_port, message.received_at, message.collector_type, message.sampled)
+        event.parsed_at = time.time_ns()
+        
+        pattern_name, parsed = self._match_message(raw_msg, event.source_ip)
+        if parsed:
+            event.update(parsed)
+            
+            # Calculate facility and severity from priority
+            priority = event.priority = int(parsed['priority'])
+            event.facility = priority >> 3
+            event.severity = priority & 0x07
+            event.severity_name = self._get_severity_name(event.severity)
+            
+            # Add metadata
+            event.pattern_matched = pattern_name
+            event.event_time = self.event_time.normalize(parsed.get('timestamp'), event.received_at)
+            if self.received_at_from_event and event.event_time is not None:
+                event.received_at = event.event_time
+            
+            self._add_template(event)
+            
+            # Typed fields for rules, extracted once per message
+            if self.field_extractor:
+                event.fields = self.field_extractor.extract(event)
+            return event
+            
+        # If no pattern matched, keep the whole line as the message
+        event.pattern_matched = 'none'
+        event.message = raw_msg
+        
+        self._add_template(event)
+        return event
+        
+    def _add_template(self, parsed):
+        """Attach template_id, template and template_params, if mining is enabled"""
+        if self.template_miner:
+            parsed.template_id, parsed.template, parsed.template_params = self.template_miner.add(parsed.message)
+            
+    def _match_message(self, raw_msg, source_ip=None):
+        """
+        Split a message into the fields of the first pattern that matches
+        
+        Well-formed RFC 5424 lines (and BSD lines with parser.tokenize_bsd)
+        go through the hand-written tokenizer; the regexes are only run for
+        lines it declines. For sources known to send BSD headers the
+        pattern that last matched is tried first, and its match is accepted
+        only when no pattern earlier in PATTERNS order could also match.
+        Otherwise the character after <PRI> decides which patterns are
+        worth trying: a month name rules out rfc5424, a version digit rules
+        out the month-based formats, and anything else rules out all three.
+        Either way the result is the same as trying every pattern in turn.
+        
+        Args:
+            raw_msg: Decoded syslog line
+            source_ip: Sender address used for the per-source format hint
+            
+        Returns:
+            (pattern name, fields dict), or (None, None) if nothing matches
+        """
+        hint = self.format_hints.get(source_ip)
+        if hint is None or hint == 'rfc5424' or self.tokenize_bsd:
+            result = tokenize_syslog(raw_msg, self.tokenize_bsd)
+            if result is not None:
+                if source_ip is not None and hint != result[0]:
+                    self._remember_format(source_ip, result[0])
+                return result
+        else:
+            match = self.PATTERNS[hint].match(raw_msg)
+            if match and self._hint_is_conclusive(hint, raw_msg, match):
+                return hint, match.groupdict()
                 
-                # Calculate facility and severity from priority
-                if 'priority' in parsed:
-                    priority = int(parsed['priority'])
-                    parsed['facility'] = priority >> 3
-                    parsed['severity'] = priority & 0x07
-                    parsed['severity_name'] = self._get_severity_name(parsed['severity'])
-                    
-                # Add metadata
-                parsed['pattern_matched'] = pattern_name
-                parsed['source_ip'] = message['source_ip']
-                parsed['source_port'] = message['source_port']
-                parsed['received_at'] = message['received_at']
-                parsed['parsed_at'] = datetime.utcnow().isoformat()
-                parsed['raw_message'] = raw_msg
+        end = raw_msg.find('>')
+        if end < 2 or raw_msg[0] != '<':
+            return None, None
+            
+        candidates = self.DISPATCH.get(raw_msg[end + 1:end + 2], self.ALL_FORMATS)
+        
+        if candidates is self.MONTH_FORMATS:
+            # 'standard' additionally needs "process[pid]:"
+            if ']:' not in raw_msg:
+                candidates = self.RFC3164_ONLY
+        elif candidates is self.RFC5424_ONLY:
+            # rfc3164 can only apply if three word characters follow ("\w{3}")
+            second = raw_msg[end + 2:end + 3]
+            if second != ' ' and (second.isalnum() or second == '_'):
+                candidates = self.NUMERIC_FORMATS
                 
-                return parsed
+        for pattern_name in candidates:
+            match = self.PATTERNS[pattern_name].match(raw_msg)
+            if match:
+                if source_ip is not None and hint != pattern_name:
+                    self._remember_format(source_ip, pattern_name)
+                return pattern_name, match.groupdict()
                 
-        # If no pattern matched, return basic parsed data
-        return {
-            'raw_message': raw_msg,
-            'source_ip': message['source_ip'],
-            'source_port': message['source_port'],
-            'received_at': message['received_at'],
-            'parsed_at': datetime.utcnow().isoformat(),
-            'pattern_matched': 'none',
-            'message': raw_msg
-        }
+        return None, None
+        
+    def _remember_format(self, source_ip, pattern_name):
+        """Record the format a source last sent (bounded by max_format_hints)"""
+        if len(self.format_hints) >= self.max_format_hints:
+            self.format_hints.clear()
+        self.format_hints[source_ip] = pattern_name
+        
+    def _hint_is_conclusive(self, hint, raw_msg, match):
+        """Return True if no pattern ahead of the hinted one could match raw_msg"""
+        if hint == 'standard':
+            return True
+        if hint == 'rfc3164':
+            return ']:' not in raw_msg
+        # rfc5424: a 1-2 digit version leaves no room for rfc3164's \w{3}
+        return len(match.group('version')) < 3
         
     def _get_severity_name(self, severity):
         """Convert numeric severity to name"""
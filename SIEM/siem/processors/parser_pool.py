@@ -0,0 +1,179 @@
+"""
+Parser Pool Module
+Runs LogParser in several processes, sharded by source_ip so each host stays in order
+"""
+
+import multiprocessing
+import queue
+import signal
+import threading
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import setup_logger
+from processors.log_parser import create_parser
+
+def _run_parser_worker(config, worker_id, input_queue, output_queue):
+    """
+    Worker process entry point
+    
+    Args:
+        config: Configuration dictionary
+        worker_id: Index of this worker
+        input_queue: multiprocessing.Queue of raw message batches (None = stop)
+        output_queue: multiprocessing.Queue shared with the indexer
+    """
+    # The parent process owns shutdown handling
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    logger = setup_logger(f"{__name__}.worker{worker_id}")
+    parser = create_parser(config, None, None)
+    logger.info(f"Parser worker {worker_id} started (pid {os.getpid()})")
+    
+    while True:
+        try:
+            batch = input_queue.get(timeout=1)
+        except queue.Empty:
+            # Close dedup windows even when the source goes quiet
+            if parser.deduplicator:
+                summaries = parser.deduplicator.flush_expired()
+                if summaries:
+                    output_queue.put(summaries)
+            continue
+            
+        if batch is None:
+            break
+            
+        parsed = parser._parse_batch(batch)
+        if parsed:
+            output_queue.put(parsed)
+            
+    summaries = parser.flush()
+    if summaries:
+        output_queue.put(summaries)
+        
+class ParserPool:
+    """Drop-in replacement for LogParser that parses in N worker processes"""
+    
+    def __init__(self, config, input_queue, output_queue):
+        """
+        Initialize the parser pool
+        
+        Args:
+            config: Configuration dictionary
+            input_queue: Queue to receive raw messages from collector
+            output_queue: multiprocessing.Queue to send parsed batches to indexer
+        """
+        self.config = config
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.logger = setup_logger(__name__)
+        self.running = False
+        self.dispatch_thread = None
+        self.workers = []
+        self.worker_queues = []
+        
+        parser_config = config.get('parser', {})
+        self.num_workers = parser_config.get('workers', 1)
+        self.batch_size = parser_config.get('ipc_batch_size', 500)
+        self.flush_interval = parser_config.get('ipc_flush_interval', 0.05)
+        self.worker_queue_size = parser_config.get('ipc_queue_size', 64)
+        
+        self.stats = {
+            'messages_dispatched': 0,
+            'batches_dispatched': 0
+        }
+        
+    def start(self):
+        """Start the worker processes and the dispatcher thread"""
+        self.running = True
+        
+        for worker_id in range(self.num_workers):
+            worker_queue = multiprocessing.Queue(maxsize=self.worker_queue_size)
+            process = multiprocessing.Process(
+                target=_run_parser_worker,
+                args=(self.config, worker_id, worker_queue, self.output_queue),
+                name=f"siem-parser-{worker_id}"
+            )
+            process.daemon = True
+            process.start()
+            self.worker_queues.append(worker_queue)
+            self.workers.append(process)
+            
+        self.dispatch_thread = threading.Thread(target=self._dispatch)
+        self.dispatch_thread.daemon = True
+        self.dispatch_thread.start()
+        self.logger.info(f"Parser pool started with {self.num_workers} workers")
+        
+    def stop(self):
+        """Drain pending batches, then stop the workers"""
+        self.running = False
+        if self.dispatch_thread:
+            self.dispatch_thread.join(timeout=5)
+            
+        # Workers flush their dedup summaries before exiting
+        for worker_queue in self.worker_queues:
+            worker_queue.put(None)
+        for process in self.workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                
+        self.workers = []
+        self.worker_queues = []
+        self.logger.info("Parser pool stopped")
+        
+    def get_stats(self):
+        """Return dispatcher counters"""
+        return dict(self.stats)
+        
+    def _shard(self, source_ip):
+        """Map a source to a worker; hash() only needs to agree within this process"""
+        return hash(source_ip) % self.num_workers
+        
+    def _dispatch(self):
+        """Split incoming messages into per-worker batches"""
+        pending = [[] for _ in range(self.num_workers)]
+        last_flush = time.monotonic()
+        
+        while self.running:
+            try:
+                item = self.input_queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None
+                
+            if item is not None:
+                # Batched collectors hand over a list of messages per put
+                messages = item if isinstance(item, list) else [item]
+                for message in messages:
+                    shard = self._shard(message['source_ip'])
+                    batch = pending[shard]
+                    batch.append(message)
+                    if len(batch) >= self.batch_size:
+                        self._send(shard, batch)
+                        pending[shard] = []
+                        
+            # Don't let a quiet shard hold messages back for long
+            now = time.monotonic()
+            if now - last_flush >= self.flush_interval:
+                for shard, batch in enumerate(pending):
+                    if batch:
+                        self._send(shard, batch)
+                        pending[shard] = []
+                last_flush = now
+                
+        for shard, batch in enumerate(pending):
+            if batch:
+                self._send(shard, batch)
+                
+    def _send(self, shard, batch):
+        """Hand one batch to a worker (blocks while its queue is full)"""
+        self.worker_queues[shard].put(batch)
+        self.stats['messages_dispatched'] += len(batch)
+        self.stats['batches_dispatched'] += 1
+        
+def create_parser_pool(config, input_queue, output_queue):
+    """Factory function to create a parser pool"""
+    return ParserPool(config, input_queue, output_queue)
\ No newline at end of file
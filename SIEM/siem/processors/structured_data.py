@@ -0,0 +1,60 @@
+"""
+Structured Data Module
+Parses RFC 5424 STRUCTURED-DATA into (sd_id, name, value) params on demand
+"""
+
+import re
+
+# One or more SD-ELEMENTs: '[' SD-ID *(SP PARAM-NAME '="' PARAM-VALUE '"') ']'
+# where PARAM-VALUE may contain spaces, ']' and the escapes \" \\ \]
+SD_ELEMENTS = r'(?:\[(?:[^\]"]|"(?:[^"\\]|\\.)*")*\])+'
+
+SD_ELEMENT = re.compile(r'\[([^\s\]"=]+)((?:[^\]"]|"(?:[^"\\]|\\.)*")*)\]')
+SD_PARAM = re.compile(r'([^\s\]"=]+)="((?:[^"\\]|\\.)*)"')
+SD_ESCAPE = re.compile(r'\\(["\\\]])')
+
+def parse_structured_data(text):
+    """
+    Split a STRUCTURED-DATA field into its params
+    
+    Args:
+        text: structured_data field of an rfc5424 message ('-' if none)
+        
+    Returns:
+        List of (sd_id, name, value) tuples in message order. A name can
+        repeat (e.g. several [origin ip=...]); malformed elements are skipped.
+    """
+    if not text or text == '-':
+        return []
+        
+    params = []
+    for element in SD_ELEMENT.finditer(text):
+        sd_id = element.group(1)
+        for param in SD_PARAM.finditer(element.group(2)):
+            value = param.group(2)
+            if '\\' in value:
+                value = SD_ESCAPE.sub(r'\1', value)
+            params.append((sd_id, param.group(1), value))
+    return params
+    
+def get_sd_params(message):
+    """
+    Params of a parsed message, parsed on first use and kept on the message
+    
+    Args:
+        message: Parsed LogEvent
+        
+    Returns:
+        List of (sd_id, name, value) tuples
+    """
+    params = message.get('sd_params')
+    if params is None:
+        params = message['sd_params'] = parse_structured_data(message.get('structured_data'))
+    return params
+    
+def split_param_key(key):
+    """Split 'sd_id.name' (e.g. 'origin.ip') into (sd_id, name)"""
+    sd_id, _, name = key.rpartition('.')
+    if not sd_id or not name:
+        raise ValueError(f"structured data param must be 'sd_id.name', got {key!r}")
+    return sd_id, name
\ No newline at end of file
@@ -0,0 +1,159 @@
+"""
+Syslog Tokenizer Module
+Split/index based parsing of RFC 3164 and RFC 5424 headers without regexes
+"""
+
+import string
+
+ASCII_LETTERS = frozenset(string.ascii_letters)
+ASCII_DIGITS = frozenset(string.digits)
+
+def tokenize_syslog(raw_msg, bsd=True):
+    """
+    Tokenize a syslog line into the same fields LogParser.PATTERNS would give
+    
+    The result is only returned when it is certain to equal what trying the
+    patterns in order would produce (same winning pattern, same groups).
+    Anything unusual - newlines, tabs or non-ASCII text in the header,
+    three-digit days, and so on - returns None so the caller can fall
+    back to the regexes.
+    
+    Args:
+        raw_msg: Decoded syslog line
+        bsd: Also tokenize 'Mmm dd hh:mm:ss' (standard/rfc3164) headers
+        
+    Returns:
+        (pattern name, fields dict), or None if the regexes must decide
+    """
+    end = raw_msg.find('>')
+    if end < 2 or raw_msg[0] != '<' or '\n' in raw_msg:
+        return None
+        
+    priority = raw_msg[1:end]
+    if not priority.isdecimal():
+        return None
+        
+    first = raw_msg[end + 1:end + 2]
+    if bsd and first in ASCII_LETTERS:
+        return _tokenize_bsd(raw_msg, end, priority)
+    if first in ASCII_DIGITS:
+        return _tokenize_rfc5424(raw_msg, end, priority)
+    return None
+    
+def _tokenize_bsd(raw_msg, end, priority):
+    """Tokenize a '<PRI>Mmm dd hh:mm:ss host ...' line (standard or rfc3164)"""
+    # str.split() treats whitespace runs exactly like the patterns' \s+
+    parts = raw_msg.split(None, 4)
+    if len(parts) < 5:
+        return None
+        
+    head, day, clock, hostname, rest = parts
+    
+    # head is "<PRI>Mmm"
+    if len(head) != end + 4 or not head.isascii() or not head[end + 1:].isalpha():
+        return None
+    # 'standard' accepts any day width but rfc3164 only 1-2 digits
+    if len(day) > 2 or not day.isdecimal():
+        return None
+    if len(clock) != 8 or clock[2::3] != '::' or not clock.replace(':', '', 2).isdecimal():
+        return None
+        
+    # Keep the original spacing, as the regex group does
+    timestamp = raw_msg[end + 1:raw_msg.find(clock, end + 5) + 8]
+    
+    # 'standard': process[pid]: message
+    bracket = rest.find('[')
+    if bracket == 0:
+        # The regex could still match with whitespace as the process name
+        return None
+    if bracket > 0:
+        close = rest.find(']:', bracket)
+        pid = rest[bracket + 1:close]
+        if close > bracket + 1 and pid.isdecimal() and rest[close + 2:close + 3].isspace():
+            message = rest[close + 3:]
+            if message:
+                return 'standard', {
+                    'priority': priority,
+                    'timestamp': timestamp,
+                    'hostname': hostname,
+                    'process': rest[:bracket],
+                    'pid': pid,
+                    'message': message
+                }
+                
+    # 'rfc3164': tag: message
+    colon = rest.find(':')
+    tag = rest[:colon]
+    if colon < 1 or ' ' in tag or not tag.isprintable():
+        return None
+        
+    return 'rfc3164', {
+        'priority': priority,
+        'timestamp': timestamp,
+        'hostname': hostname,
+        'tag': tag,
+        'message': rest[colon + 1:].lstrip()
+    }
+    
+def _tokenize_rfc5424(raw_msg, end, priority):
+    """Tokenize a '<PRI>VERSION TIMESTAMP HOST APP PROCID MSGID SD MSG' line"""
+    parts = raw_msg.split(None, 6)
+    if len(parts) < 7:
+        return None
+        
+    # A version of three or more digits could also satisfy rfc3164's \w{3}
+    version = parts[0][end + 1:]
+    if len(version) > 2 or not version.isdecimal():
+        return None
+        
+    rest = parts[6]
+    if rest[0] == '[':
+        # SD-ELEMENTs can contain spaces inside their quoted values
+        sd_end = _structured_data_end(rest)
+        if sd_end < 0:
+            return None
+        structured_data = rest[:sd_end]
+        message = rest[sd_end:].lstrip()
+    else:
+        sd_parts = rest.split(None, 1)
+        structured_data = sd_parts[0]
+        message = sd_parts[1] if len(sd_parts) == 2 else ''
+        
+    return 'rfc5424', {
+        'priority': priority,
+        'version': version,
+        'timestamp': parts[1],
+        'hostname': parts[2],
+        'appname': parts[3],
+        'procid': parts[4],
+        'msgid': parts[5],
+        'structured_data': structured_data,
+        'message': message
+    }
+    
+def _structured_data_end(rest):
+    """
+    Index just past the SD-ELEMENTs that start rest
+    
+    Returns -1 when the regex must decide: unterminated elements or values,
+    escapes inside a value, or elements not followed by whitespace.
+    """
+    i = 0
+    while rest.startswith('[', i):
+        while True:
+            close = rest.find(']', i)
+            quote = rest.find('"', i)
+            if close < 0:
+                return -1
+            if quote < 0 or close < quote:
+                i = close + 1
+                break
+            # Skip the quoted value, where ']' does not end the element
+            value_end = rest.find('"', quote + 1)
+            if value_end < 0 or '\\' in rest[quote + 1:value_end]:
+                return -1
+            i = value_end + 1
+            
+    if i < len(rest) and not rest[i].isspace():
+        return -1
+    return i
\ No newline at end of file
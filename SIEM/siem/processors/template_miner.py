@@ -0,0 +1,170 @@
+"""
+Template Miner Module
+Learns message templates online with a fixed-depth parse tree (Drain)
+"""
+
+import hashlib
+from collections import OrderedDict
+
+WILDCARD = '<*>'
+
+class LogCluster:
+    """One learned template and the leaf it lives in"""
+    
+    __slots__ = ('tokens', 'template', 'template_id', 'size', 'leaf')
+    
+    def __init__(self, tokens, leaf):
+        self.tokens = tokens
+        self.size = 0
+        self.leaf = leaf
+        self.template = None
+        self.template_id = None
+        self.update_template_id()
+        
+    def update_template_id(self):
+        """Recompute the template string and its id after the tokens change"""
+        self.template = ' '.join(self.tokens)
+        # 48 bits: identical in every process and still exact as a JSON number
+        digest = hashlib.blake2b(self.template.encode('utf-8'), digest_size=6).digest()
+        self.template_id = int.from_bytes(digest, 'big')
+        
+class TemplateMiner:
+    """
+    Online Drain template miner
+    
+    Messages are routed by token count, then by their first depth - 2
+    tokens (tokens containing digits, or beyond max_children, share a
+    wildcard branch). The leaf holds candidate clusters; the most similar
+    one above the similarity threshold absorbs the message and any
+    differing positions become <*>. Clusters are kept in an LRU bounded
+    by max_clusters.
+    """
+    
+    def __init__(self, config):
+        """
+        Initialize the template miner
+        
+        Args:
+            config: templates configuration dictionary
+        """
+        self.depth = max(3, config.get('depth', 4))
+        self.similarity = config.get('similarity', 0.4)
+        self.max_children = config.get('max_children', 100)
+        self.max_clusters = config.get('max_clusters', 1000)
+        
+        self.root = {}
+        self.clusters = OrderedDict()
+        self.stats = {
+            'messages': 0,
+            'clusters_created': 0,
+            'clusters_evicted': 0
+        }
+        
+    def add(self, message):
+        """
+        Assign a message to a template, learning a new one if needed
+        
+        Args:
+            message: Message text (without the syslog header)
+            
+        Returns:
+            (template_id, template, params) where params are the message
+            tokens at the template's <*> positions
+        """
+        tokens = message.split()
+        self.stats['messages'] += 1
+        
+        leaf = self._find_leaf(tokens)
+        cluster = self._best_match(leaf, tokens)
+        
+        if cluster is None:
+            cluster = LogCluster(tokens, leaf)
+            leaf.append(cluster)
+            self.stats['clusters_created'] += 1
+            self._evict(cluster)
+        else:
+            self._merge(cluster, tokens)
+            self.clusters.move_to_end(cluster)
+            
+        cluster.size += 1
+        params = [token for token, template_token in zip(tokens, cluster.tokens) if template_token == WILDCARD]
+        return cluster.template_id, cluster.template, params
+        
+    def get_stats(self):
+        """Return miner counters"""
+        stats = dict(self.stats)
+        stats['clusters'] = len(self.clusters)
+        return stats
+        
+    def _find_leaf(self, tokens):
+        """Walk (and grow) the parse tree down to the leaf for tokens"""
+        node = self.root.setdefault(len(tokens), {})
+        
+        for token in tokens[:self.depth - 2]:
+            if any(char.isdigit() for char in token):
+                token = WILDCARD
+            child = node.get(token)
+            if child is None:
+                if len(node) >= self.max_children:
+                    token = WILDCARD
+                child = node.setdefault(token, {})
+            node = child
+            
+        # A node past the last token level holds the cluster list
+        return node.setdefault(None, [])
+        
+    def _best_match(self, leaf, tokens):
+        """Return the most similar cluster in the leaf, or None"""
+        # Every cluster in the zero-token leaf has the empty template
+        if not tokens:
+            return leaf[0] if leaf else None
+            
+        best = None
+        best_score = (-1.0, -1)
+        length = len(tokens)
+        
+        for cluster in leaf:
+            same = 0
+            wildcards = 0
+            for token, template_token in zip(tokens, cluster.tokens):
+                if template_token == WILDCARD:
+                    wildcards += 1
+                elif token == template_token:
+                    same += 1
+            # <*> positions already accept any value, so they count as equal;
+            # on a tie the more specific template wins
+            score = ((same + wildcards) / length, -wildcards)
+            if score > best_score:
+                best, best_score = cluster, score
+                
+        if best is None or best_score[0] < self.similarity:
+            return None
+        return best
+        
+    def _merge(self, cluster, tokens):
+        """Turn the positions where tokens differ from the template into <*>"""
+        changed = False
+        merged = list(cluster.tokens)
+        for i, (token, template_token) in enumerate(zip(tokens, merged)):
+            if template_token != WILDCARD and token != template_token:
+                merged[i] = WILDCARD
+                changed = True
+                
+        if changed:
+            cluster.tokens = merged
+            cluster.update_template_id()
+            
+    def _evict(self, cluster):
+        """Register a new cluster and drop the least recently used beyond the bound"""
+        self.clusters[cluster] = None
+        while len(self.clusters) > self.max_clusters:
+            oldest, _ = self.clusters.popitem(last=False)
+            oldest.leaf.remove(oldest)
+            self.stats['clusters_evicted'] += 1
+            
+def create_template_miner(config):
+    """Factory function to create a template miner (None when disabled)"""
+    template_config = config.get('parser', {}).get('templates', {})
+    if not template_config.get('enabled', False):
+        return None
+    return TemplateMiner(template_config)
\ No newline at end of file
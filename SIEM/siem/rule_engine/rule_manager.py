@@ -14,6 +14,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.logger import setup_logger
+from processors.structured_data import get_sd_params, split_param_key
 
 class RuleManager:
     """Manages security rules and pattern matching"""
@@ -37,10 +38,15 @@ class RuleManager:
         # Rule storage
         self.rules = {}
         self.compiled_patterns = {}
+        self.sd_conditions = {}
+        self.field_conditions = {}
         
         # Event tracking for threshold-based rules
         self.event_tracker = defaultdict(lambda: deque(maxlen=1000))
         
+        # Without extractors no event carries fields
+        self.extractors_enabled = config.get('parser', {}).get('extractors', {}).get('enabled', False)
+        
         # Load rules
         self._load_rules()
         
@@ -77,6 +83,30 @@ class RuleManager:
                         pattern = conditions['process_pattern']
                         self.compiled_patterns[f"{rule_id}_process"] = re.compile(pattern, re.IGNORECASE)
                         
+                    # fields: {'event': 'auth_failure'} or a list of accepted values
+                    if 'fields' in conditions:
+                        self.field_conditions[rule_id] = [
+                            (name, frozenset(values if isinstance(values, list) else [values]))
+                            for name, values in conditions['fields'].items()
+                        ]
+                        
+                    # fallback_pattern: message regex for events without extracted fields
+                    if 'fallback_pattern' in conditions:
+                        pattern = conditions['fallback_pattern']
+                        self.compiled_patterns[f"{rule_id}_fallback"] = re.compile(pattern, re.IGNORECASE)
+                    elif 'fields' in conditions and not self.extractors_enabled:
+                        self.logger.warning(
+                            f"Rule {rule_id} matches on fields but parser.extractors is disabled "
+                            f"and it has no fallback_pattern, so it will never fire"
+                        )
+                        
+                    # structured_data: {'origin.ip': '10.0.0.5'} or a list of accepted values
+                    if 'structured_data' in conditions:
+                        self.sd_conditions[rule_id] = [
+                            (*split_param_key(key), frozenset(map(str, values if isinstance(values, list) else [values])))
+                            for key, values in conditions['structured_data'].items()
+                        ]
+                        
                     self.logger.debug(f"Loaded rule: {rule['name']}")
                     
         except Exception as e:
@@ -129,11 +159,24 @@ class RuleManager:
         """
         conditions = rule.get('conditions', {})
         
+        # Check extracted fields first; they avoid rescanning the text
+        if rule_id in self.field_conditions:
+            fields = log_entry.fields
+            if fields:
+                for name, values in self.field_conditions[rule_id]:
+                    if fields.get(name) not in values:
+                        return False
+            else:
+                # Extractors off, or a line no extractor handled
+                fallback = self.compiled_patterns.get(f"{rule_id}_fallback")
+                if fallback is None or not fallback.search(log_entry.message or log_entry.raw_message or ''):
+                    return False
+                    
         # Check message pattern
         if 'message_pattern' in conditions:
             pattern_key = f"{rule_id}_message"
             if pattern_key in self.compiled_patterns:
-                message = log_entry.get('message', '') or log_entry.get('raw_message', '')
+                message = log_entry.message or log_entry.raw_message or ''
                 if not self.compiled_patterns[pattern_key].search(message):
                     return False
                     
@@ -141,10 +184,17 @@ class RuleManager:
         if 'process_pattern' in conditions:
             pattern_key = f"{rule_id}_process"
             if pattern_key in self.compiled_patterns:
-                process = log_entry.get('process', '') or ''
+                process = log_entry.process or ''
                 if not self.compiled_patterns[pattern_key].search(process):
                     return False
                     
+        # Check structured-data params (only parsed for rules that use them)
+        if rule_id in self.sd_conditions:
+            params = get_sd_params(log_entry)
+            for sd_id, name, values in self.sd_conditions[rule_id]:
+                if not any(p_id == sd_id and p_name == name and value in values for p_id, p_name, value in params):
+                    return False
+                    
         # Check threshold-based rules
         if 'threshold' in conditions:
             return self._check_threshold_rule(rule_id, rule, log_entry)
@@ -159,23 +209,28 @@ class RuleManager:
         time_window = conditions.get('time_window', 3600)  # Default 1 hour
         group_by = conditions.get('group_by', 'source_ip')
         
-        # Get grouping key
-        group_key = log_entry.get(group_by, 'unknown')
+        # Get grouping key ('fields.src_ip' groups by an extracted field,
+        # or by the sender for events matched by fallback_pattern)
+        if group_by.startswith('fields.'):
+            group_key = (log_entry.fields or {}).get(group_by[7:]) or log_entry.get('source_ip', 'unknown')
+        else:
+            group_key = log_entry.get(group_by, 'unknown')
         tracker_key = f"{rule_id}_{group_key}"
         
-        # Add event to tracker
+        # Add event to tracker (collapsed duplicates count repeat_count times)
         now = datetime.utcnow()
-        self.event_tracker[tracker_key].append(now)
+        repeat_count = log_entry.repeat_count or 1
+        self.event_tracker[tracker_key].append((now, repeat_count))
         
         # Count events within time window
         cutoff_time = now - timedelta(seconds=time_window)
-        recent_events = [t for t in self.event_tracker[tracker_key] if t > cutoff_time]
+        recent_events = [(t, count) for t, count in self.event_tracker[tracker_key] if t > cutoff_time]
         
         # Update tracker with only recent events
         self.event_tracker[tracker_key] = deque(recent_events, maxlen=1000)
         
         # Check if threshold exceeded
-        if len(recent_events) >= threshold:
+        if sum(count for _, count in recent_events) >= threshold:
             # Clear tracker to avoid duplicate alerts
             self.event_tracker[tracker_key].clear()
             return True
@@ -195,18 +250,23 @@ class RuleManager:
                 'destination_ip': log_entry.get('destination_ip')
             }
             
-            # Save alert to database
-            alert_id = self.db_manager.save_alert(alert_data)
+            # Save alert to database; the alert writer commits it with others
+            # raised meanwhile, so don't wait here for its id
+            future = self.db_manager.submit_alert(alert_data)
+            source_ip = log_entry.get('source_ip', 'unknown')
+            future.add_done_callback(lambda saved: self._alert_saved(saved, rule, source_ip))
             
-            if alert_id:
-                self.logger.warning(
-                    f"ALERT: {rule['name']} - {rule.get('description', '')} "
-                    f"[Source: {log_entry.get('source_ip', 'unknown')}]"
-                )
-                
         except Exception as e:
             self.logger.error(f"Error generating alert: {e}")
             
+    def _alert_saved(self, future, rule, source_ip):
+        """Log an alert once it has been saved"""
+        if future.result():
+            self.logger.warning(
+                f"ALERT: {rule['name']} - {rule.get('description', '')} "
+                f"[Source: {source_ip}]"
+            )
+            
 def create_rule_manager(config, input_queue, db_manager):
     """Factory function to create a rule manager"""
     return RuleManager(config, input_queue, db_manager) 
\ No newline at end of file
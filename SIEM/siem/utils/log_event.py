@@ -0,0 +1,123 @@
+"""
+Log Event Module
+Compact records for events moving through the pipeline queues
+"""
+
+import sys
+
+# Fields set by the collectors (sampled: admitted over a rate limit)
+RAW_FIELDS = ('raw_message', 'source_ip', 'source_port', 'received_at', 'collector_type', 'sampled')
+
+# Every field a parsed event can carry, through the rule engine
+FIELDS = RAW_FIELDS + (
+    # Syslog header (LogParser.PATTERNS groups)
+    'priority', 'timestamp', 'hostname', 'process', 'pid', 'tag',
+    'version', 'appname', 'procid', 'msgid', 'structured_data', 'message',
+    # Parser
+    'facility', 'severity', 'severity_name', 'pattern_matched', 'parsed_at', 'event_time',
+    'template_id', 'template', 'template_params', 'fields', 'sd_params', 'repeat_count',
+    # Indexer
+    'db_id',
+)
+
+# Low-cardinality strings shared between events instead of copied per event
+INTERNED_FIELDS = frozenset(('hostname', 'process', 'tag', 'appname'))
+
+intern = sys.intern
+
+class RawEvent:
+    """One received line on its way from a collector to the parser"""
+    
+    __slots__ = RAW_FIELDS
+    
+    def __init__(self, raw_message, source_ip, source_port, received_at, collector_type, sampled=False):
+        self.raw_message = raw_message
+        self.source_ip = source_ip
+        self.source_port = source_port
+        self.received_at = received_at
+        self.collector_type = collector_type
+        self.sampled = sampled
+        
+    # Dict-style access for code written against message dicts
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+            
+    __setitem__ = object.__setattr__
+    
+    def get(self, name, default=None):
+        """Return a field, or default if it is None"""
+        value = getattr(self, name, None)
+        return default if value is None else value
+        
+    def __reduce__(self):
+        return RawEvent, (self.raw_message, self.source_ip, self.source_port, self.received_at, self.collector_type, self.sampled)
+        
+    def __repr__(self):
+        return f"RawEvent({self.raw_message!r}, {self.source_ip!r}, {self.source_port!r}, {self.received_at!r}, {self.collector_type!r}, {self.sampled!r})"
+        
+class LogEvent:
+    """
+    Slotted parsed event
+    
+    Every field starts as None, so the pipeline uses plain attribute access
+    (event.hostname). event['key'], event.get('key') and 'key' in event
+    keep working for code written against message dicts; 'in' is False for
+    fields that are None.
+    """
+    
+    __slots__ = FIELDS
+    
+    def __init__(self, raw_message, source_ip, source_port, received_at, collector_type, sampled=False):
+        self.raw_message = raw_message
+        self.source_ip = source_ip
+        self.source_port = source_port
+        self.received_at = received_at
+        self.collector_type = collector_type
+        self.sampled = sampled
+        # A chained assignment is far cheaper than __getattr__ on every unset read
+        self.priority = self.timestamp = self.hostname = self.process = self.pid = self.tag = None
+        self.version = self.appname = self.procid = self.msgid = self.structured_data = self.message = None
+        self.facility = self.severity = self.severity_name = self.pattern_matched = None
+        self.parsed_at = self.event_time = self.template_id = self.template = self.template_params = None
+        self.fields = self.sd_params = self.repeat_count = self.db_id = None
+        
+    def __getitem__(self, name):
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+            
+    __setitem__ = object.__setattr__
+    
+    def __contains__(self, name):
+        return getattr(self, name, None) is not None
+        
+    def get(self, name, default=None):
+        """Return a field, or default if it is None"""
+        value = getattr(self, name, None)
+        return default if value is None else value
+        
+    def update(self, fields):
+        """Set several fields from a dict, interning low-cardinality strings"""
+        for name, value in fields.items():
+            if name in INTERNED_FIELDS:
+                value = intern(value)
+            setattr(self, name, value)
+            
+    def to_dict(self):
+        """Return the fields that are set as a plain dict"""
+        return {name: value for name in FIELDS if (value := getattr(self, name)) is not None}
+        
+    def __getstate__(self):
+        # Positional state: no field names in every pickled event
+        return tuple(getattr(self, name) for name in FIELDS)
+        
+    def __setstate__(self, state):
+        for name, value in zip(FIELDS, state):
+            setattr(self, name, value)
+            
+    def __repr__(self):
+        return f"LogEvent({self.to_dict()!r})"
\ No newline at end of file